@@ -3,10 +3,19 @@ Social media platform clients
 """
 from .twitter import get_twitter_v1_client, get_twitter_v2_client
 from .reddit import get_reddit_client
+from .http import create_async_client, get_http_client, close_http_clients
+from .cloudinary import upload_image
+from .pool import ClientPool, client_pool
 
 __all__ = [
     "get_twitter_v1_client",
     "get_twitter_v2_client",
-    "get_reddit_client"
+    "get_reddit_client",
+    "create_async_client",
+    "get_http_client",
+    "close_http_clients",
+    "upload_image",
+    "ClientPool",
+    "client_pool"
 ]
 
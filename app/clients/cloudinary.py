@@ -0,0 +1,33 @@
+"""
+Cloudinary image hosting client
+"""
+import cloudinary.uploader
+from app.config import settings
+
+
+def upload_image(image_path: str) -> str:
+    """
+    Upload an image to Cloudinary and return its public HTTPS URL
+
+    Raises:
+        Exception: If Cloudinary is not configured or the upload returned no URL
+    """
+    from app.clients.simulated import is_simulated, simulated_cloudinary_upload
+
+    if is_simulated():
+        upload = simulated_cloudinary_upload
+    else:
+        if not all([settings.CLOUDINARY_CLOUD_NAME, settings.CLOUDINARY_API_KEY, settings.CLOUDINARY_API_SECRET]):
+            raise Exception("Cloudinary is not configured. Please set CLOUDINARY_* env vars.")
+        upload = cloudinary.uploader.upload
+
+    upload_result = upload(
+        image_path,
+        folder=settings.CLOUDINARY_FOLDER,
+        overwrite=True,
+        resource_type="image"
+    )
+    public_image_url = upload_result.get("secure_url")
+    if not public_image_url:
+        raise Exception("Failed to obtain secure_url from Cloudinary upload")
+    return public_image_url
@@ -0,0 +1,93 @@
+"""
+HTTP client factory and shared client registry for outbound API calls
+"""
+import asyncio
+import importlib.util
+import threading
+import weakref
+from typing import Dict
+import httpx
+from app.config import settings
+
+
+def create_async_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Create an httpx.AsyncClient for calling a provider API
+
+    With PROVIDER_BACKEND=simulated the client is wired to the local simulated
+    transport instead of the network.
+
+    Args:
+        **kwargs: httpx.AsyncClient arguments (timeout, limits, ...)
+    """
+    from app.clients.simulated import is_simulated, SimulatedTransport
+
+    if is_simulated():
+        kwargs.setdefault("transport", SimulatedTransport())
+    return httpx.AsyncClient(**kwargs)
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional h2 package (pip install 'httpx[http2]')"""
+    return settings.HTTP2_ENABLED and importlib.util.find_spec("h2") is not None
+
+
+def _client_options(name: str) -> dict:
+    """Pool settings for one named client"""
+    if name == "graph":
+        # Facebook / Instagram Graph API: few hosts, many small calls
+        max_connections = settings.GRAPH_MAX_CONNECTIONS
+        timeout = settings.GRAPH_TIMEOUT
+    elif name == "downloads":
+        # Generated images from the OpenAI and fal.ai CDNs
+        max_connections = settings.DOWNLOAD_MAX_CONNECTIONS
+        timeout = settings.AI_IMAGE_DOWNLOAD_TIMEOUT
+    else:
+        max_connections = settings.HTTP_MAX_CONNECTIONS
+        timeout = settings.GRAPH_TIMEOUT
+    return {
+        "http2": http2_available(),
+        "timeout": httpx.Timeout(timeout, connect=settings.HTTP_CONNECT_TIMEOUT),
+        "limits": httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=min(max_connections, settings.HTTP_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        )
+    }
+
+
+# Open clients per event loop: connections belong to the loop that opened them,
+# and the API, the bot, the scheduler and each publish worker run their own loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, httpx.AsyncClient]]" = weakref.WeakKeyDictionary()
+_clients_lock = threading.Lock()
+
+
+def get_http_client(name: str = "default") -> httpx.AsyncClient:
+    """
+    Get the shared, keep-alive pooled client for the running event loop
+
+    Don't close the returned client (or use it in `async with`); pass
+    per-request timeouts to the request instead. close_http_clients() closes
+    the loop's clients on shutdown.
+
+    Args:
+        name: "graph" (Facebook/Instagram), "downloads" (generated images) or "default"
+    """
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        http_client = clients.get(name)
+        if http_client is None or http_client.is_closed:
+            http_client = clients[name] = create_async_client(**_client_options(name))
+        return http_client
+
+
+async def close_http_clients() -> None:
+    """Close the shared clients of the running event loop (call on shutdown)"""
+    with _clients_lock:
+        clients = _clients.pop(asyncio.get_running_loop(), {})
+    for http_client in clients.values():
+        try:
+            await http_client.aclose()
+        except Exception as e:
+            print(f"⚠️  Error closing HTTP client: {e}")
@@ -0,0 +1,125 @@
+"""
+Authenticated client pool
+Keeps one constructed Twitter / Reddit client per credential set, so their HTTP sessions and tokens are reused
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+
+def credentials_fingerprint(*values) -> str:
+    """Digest identifying a credential set (the secrets themselves are not kept as keys)"""
+    return hashlib.sha256(json.dumps(values, default=str).encode("utf-8")).hexdigest()
+
+
+def _close(client: Any) -> None:
+    """Close the requests session behind a replaced client"""
+    session = getattr(client, "session", None)
+    if session is None:
+        # praw keeps its session on the requestor
+        requestor = getattr(getattr(client, "_core", None), "_requestor", None)
+        session = getattr(requestor, "_http", None)
+    try:
+        if session is not None:
+            session.close()
+    except Exception as e:
+        print(f"⚠️  Error closing client session: {e}")
+
+
+class ClientPool:
+    """
+    Thread-safe cache of platform credentials and one client per name
+
+    Credentials are loaded once and kept until credentials_service changes
+    them (in this process via invalidate(), in another process - the API and
+    the bot share the file - via the file's modification time). A client is
+    rebuilt only when the fingerprint of the credentials it is built from
+    changes.
+
+    The same instance is handed to the FastAPI loop, scheduler threads,
+    publish workers and the bot; tweepy and praw clients only hold a
+    requests session (and praw its OAuth token), both safe to share.
+    """
+
+    def __init__(self):
+        # platform -> (credentials file version, values)
+        self._credentials: Dict[str, Tuple[int, tuple]] = {}
+        # client name -> (platform, fingerprint, client)
+        self._clients: Dict[str, Tuple[str, str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def credentials(self, platform: str, load: Callable[[], tuple]) -> tuple:
+        """
+        Get a platform's credential values, calling load() only after they changed
+
+        Args:
+            platform: Platform name (as used by credentials_service)
+            load: Reads the values (stored credentials, falling back to env)
+        """
+        from app.services.credentials_service import credentials_version
+
+        version = credentials_version()
+        with self._lock:
+            cached = self._credentials.get(platform)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        values = tuple(load())
+        with self._lock:
+            self._credentials[platform] = (version, values)
+        return values
+
+    def get(self, name: str, platform: str, credentials: tuple, factory: Callable[[], Any]) -> Any:
+        """
+        Get the pooled client for name, building it with factory() if its credentials changed
+
+        Args:
+            name: Client name (e.g. "twitter_v1")
+            platform: Platform whose credentials the client is built from
+            credentials: The values factory builds the client from (as returned by credentials())
+            factory: Builds a new client; a None result is not pooled
+
+        Returns:
+            The pooled client, or None if factory returned None
+        """
+        # Taken from the caller's values, so an invalidate() since credentials() can't pair them with another set
+        fingerprint = credentials_fingerprint(*credentials)
+        with self._lock:
+            entry = self._clients.get(name)
+            if entry is not None and entry[1] == fingerprint:
+                return entry[2]
+
+            client = factory()
+            if client is None:
+                return None
+            self._clients[name] = (platform, fingerprint, client)
+
+        if entry is not None:
+            _close(entry[2])
+        return client
+
+    def invalidate(self, platform: str) -> None:
+        """Forget a platform's credentials and drop (and close) its clients"""
+        with self._lock:
+            self._credentials.pop(platform, None)
+            names = [name for name, entry in self._clients.items() if entry[0] == platform]
+            removed = [self._clients.pop(name) for name in names]
+        for entry in removed:
+            _close(entry[2])
+
+    def clear(self) -> None:
+        """Forget all credentials and drop (and close) every client"""
+        with self._lock:
+            self._credentials.clear()
+            removed = list(self._clients.values())
+            self._clients.clear()
+        for entry in removed:
+            _close(entry[2])
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+# Shared by app/clients/twitter.py and app/clients/reddit.py
+client_pool = ClientPool()
@@ -3,12 +3,12 @@ Reddit API client configuration
 """
 import praw
 from app.config import settings
+from app.clients.simulated import is_simulated, SimulatedReddit
+from app.clients.pool import client_pool
 
-def get_reddit_client() -> praw.Reddit | None:
-    """
-    Return authenticated PRAW Reddit client.
-    Returns None if credentials are not configured.
-    """
+
+def _load_reddit_credentials() -> tuple:
+    """(client_id, client_secret, username, password, user_agent) from storage, falling back to env"""
     # Lazy import to avoid circular dependency
     from app.services.credentials_service import get_platform_credentials
     
@@ -16,29 +16,48 @@ def get_reddit_client() -> praw.Reddit | None:
     credentials = get_platform_credentials("reddit")
     
     if credentials:
-        client_id = credentials.get("client_id")
-        client_secret = credentials.get("client_secret")
-        username = credentials.get("username")
-        password = credentials.get("password")
-        user_agent = credentials.get("user_agent", "SocialHub Bot v1.0")
-    else:
-        client_id = settings.REDDIT_CLIENT_ID
-        client_secret = settings.REDDIT_CLIENT_SECRET
-        username = settings.REDDIT_USERNAME
-        password = settings.REDDIT_PASSWORD
-        user_agent = settings.REDDIT_USER_AGENT
+        return (
+            credentials.get("client_id"),
+            credentials.get("client_secret"),
+            credentials.get("username"),
+            credentials.get("password"),
+            credentials.get("user_agent", "SocialHub Bot v1.0")
+        )
+    return (
+        settings.REDDIT_CLIENT_ID,
+        settings.REDDIT_CLIENT_SECRET,
+        settings.REDDIT_USERNAME,
+        settings.REDDIT_PASSWORD,
+        settings.REDDIT_USER_AGENT
+    )
+
+
+def get_reddit_client() -> praw.Reddit | None:
+    """
+    Return authenticated PRAW Reddit client.
+    The client is pooled and only rebuilt when the credentials change.
+    Returns None if credentials are not configured.
+    """
+    credentials = client_pool.credentials("reddit", _load_reddit_credentials)
+    client_id, client_secret, username, password, user_agent = credentials
     
     if not all([client_id, client_secret, username, password]):
         return None
     
-    try:
-        return praw.Reddit(
-            client_id=client_id,
-            client_secret=client_secret,
-            username=username,
-            password=password,
-            user_agent=user_agent
-        )
-    except Exception:
-        return None
-
+    if is_simulated():
+        return SimulatedReddit()
+    
+    def build():
+        try:
+            return praw.Reddit(
+                client_id=client_id,
+                client_secret=client_secret,
+                username=username,
+                password=password,
+                user_agent=user_agent
+            )
+        except Exception:
+            return None
+    
+    # Reusing the instance keeps its session and OAuth token between posts
+    return client_pool.get("reddit", "reddit", credentials, build)
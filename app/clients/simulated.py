@@ -0,0 +1,435 @@
+"""
+Simulated provider backend for offline load testing
+Deterministic local stand-ins for OpenAI, fal.ai, Cloudinary and the Facebook/Instagram
+Graph, Twitter and Reddit APIs, with configurable latency, error rates and rate limits
+"""
+import asyncio
+import hashlib
+import itertools
+import json
+import math
+import random
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import httpx
+from app.config import settings
+
+# Host that serves simulated image URLs (DALL-E, fal.ai and Cloudinary results)
+SIMULATED_HOST = "simulated.local"
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Log-normal latency (median and p95 in seconds) plus error and rate-limit probabilities"""
+
+    median: float
+    p95: float
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return 0.0
+        sigma = math.log(max(self.p95, self.median) / self.median) / 1.645
+        return rng.lognormvariate(math.log(self.median), sigma)
+
+
+# Rough production numbers for each upstream call
+DEFAULT_PROFILES = {
+    "openai-chat": LatencyProfile(median=1.5, p95=4.0, error_rate=0.01, rate_limit_rate=0.01),
+    "openai-images": LatencyProfile(median=12.0, p95=20.0, error_rate=0.02, rate_limit_rate=0.01),
+    "fal": LatencyProfile(median=4.0, p95=9.0, error_rate=0.02, rate_limit_rate=0.01),
+    "image-download": LatencyProfile(median=0.3, p95=0.8),
+    "cloudinary": LatencyProfile(median=0.8, p95=2.0, error_rate=0.005),
+    "facebook": LatencyProfile(median=0.7, p95=2.0, error_rate=0.01, rate_limit_rate=0.005),
+    "instagram": LatencyProfile(median=0.8, p95=2.5, error_rate=0.01, rate_limit_rate=0.005),
+    "twitter": LatencyProfile(median=0.5, p95=1.5, error_rate=0.01, rate_limit_rate=0.01),
+    "reddit": LatencyProfile(median=1.0, p95=3.0, error_rate=0.01, rate_limit_rate=0.005)
+}
+
+_WORDS = (
+    "fresh ideas for your feed today with a bold new look and simple steps that help "
+    "teams grow share and connect with people who care about what matters most"
+).split()
+
+
+def is_simulated() -> bool:
+    """Whether the app is configured to use the simulated providers"""
+    return settings.PROVIDER_BACKEND == "simulated"
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256("\x00".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def simulated_text(seed: str, length: int = 200) -> str:
+    """Deterministic filler text of roughly `length` characters"""
+    digest = bytes.fromhex(_digest(seed))
+    words = []
+    for byte in itertools.cycle(digest):
+        word = _WORDS[byte % len(_WORDS)]
+        if sum(len(w) + 1 for w in words) + len(word) > length:
+            break
+        words.append(word)
+    return " ".join(words).capitalize() + "."
+
+
+@lru_cache(maxsize=16)
+def _png(color: tuple, size: int = 1024) -> bytes:
+    """Solid-colour PNG, about the size of a generated image once decoded"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(color) * size
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * size, 6))
+        + chunk(b"IEND", b"")
+    )
+
+
+def simulated_image(seed: str) -> bytes:
+    """PNG bytes for a simulated image URL (one of 16 colours picked from the seed)"""
+    shade = int(_digest(seed)[:1], 16)
+    return _png((shade * 16, 255 - shade * 16, 128))
+
+
+def simulated_image_url(*seed) -> str:
+    return f"https://{SIMULATED_HOST}/images/{_digest(*seed)[:32]}.png"
+
+
+class SimulatedError(Exception):
+    """Error raised by the SDK stand-ins (Twitter, Reddit, fal.ai, Cloudinary)"""
+
+    def __init__(self, provider: str, status_code: int):
+        self.provider = provider
+        self.status_code = status_code
+        reason = "Too Many Requests" if status_code == 429 else "Internal Server Error"
+        super().__init__(f"{status_code} {reason} (simulated {provider})")
+
+
+class SimulatedBackend:
+    """
+    Latency, error and rate-limit draws for every simulated provider
+
+    Draws come from one seeded RNG, so a sequential run is reproducible.
+    latency_scale multiplies every latency (0 = instant); error_rate and
+    rate_limit_rate, when set, override every profile's rates.
+    """
+
+    def __init__(self, profiles: Dict[str, LatencyProfile] = None, latency_scale: float = 1.0, error_rate: Optional[float] = None, rate_limit_rate: Optional[float] = None, seed: int = 0):
+        self.profiles = {**DEFAULT_PROFILES, **(profiles or {})}
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_settings(cls) -> "SimulatedBackend":
+        """Build the backend from settings, with per-provider overrides from SIMULATED_PROVIDERS_FILE"""
+        profiles = {}
+        path = settings.SIMULATED_PROVIDERS_FILE
+        if path and path.exists():
+            with open(path, "r") as f:
+                overrides = json.load(f)
+            for provider, values in overrides.items():
+                base = DEFAULT_PROFILES.get(provider, LatencyProfile(median=0.5, p95=1.5))
+                profiles[provider] = LatencyProfile(**{**base.__dict__, **values})
+        return cls(
+            profiles,
+            latency_scale=settings.SIMULATED_LATENCY_SCALE,
+            error_rate=settings.SIMULATED_ERROR_RATE,
+            rate_limit_rate=settings.SIMULATED_RATE_LIMIT_RATE,
+            seed=settings.SIMULATED_SEED
+        )
+
+    def next_id(self) -> int:
+        with self._lock:
+            return next(self._ids)
+
+    def draw(self, provider: str) -> tuple:
+        """
+        Decide how the next call to a provider goes
+
+        Returns:
+            tuple: (latency in seconds, status code: 200, 429 or 500)
+        """
+        profile = self.profiles.get(provider) or LatencyProfile(median=0.5, p95=1.5)
+        error_rate = profile.error_rate if self.error_rate is None else self.error_rate
+        rate_limit_rate = profile.rate_limit_rate if self.rate_limit_rate is None else self.rate_limit_rate
+
+        with self._lock:
+            latency = profile.sample(self._rng) * self.latency_scale
+            roll = self._rng.random()
+            status = 429 if roll < rate_limit_rate else 500 if roll < rate_limit_rate + error_rate else 200
+            counters = self._counters.setdefault(provider, {"calls": 0, "errors": 0, "rate_limited": 0})
+            counters["calls"] += 1
+            counters["errors"] += status == 500
+            counters["rate_limited"] += status == 429
+        return latency, status
+
+    def call_sync(self, provider: str) -> None:
+        """Wait out a call to a synchronous SDK (tweepy, PRAW, Cloudinary), raising SimulatedError if it failed"""
+        latency, status = self.draw(provider)
+        time.sleep(latency)
+        if status != 200:
+            raise SimulatedError(provider, status)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {provider: dict(counters) for provider, counters in self._counters.items()}
+
+
+_backend: Optional[SimulatedBackend] = None
+
+
+def get_simulated_backend() -> SimulatedBackend:
+    """Get the process-wide simulated backend (built from settings on first use)"""
+    global _backend
+    if _backend is None:
+        _backend = SimulatedBackend.from_settings()
+    return _backend
+
+
+def _json_response(status_code: int, payload: dict, headers: dict = None) -> httpx.Response:
+    return httpx.Response(status_code, json=payload, headers=headers)
+
+
+class SimulatedTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport answering OpenAI, Graph API and simulated image requests locally
+
+    Used by the OpenAI SDK and create_async_client() in simulated mode, so the
+    real client code (retries, parsing, streaming) runs unchanged. Requests to
+    any other host get a 404 instead of touching the network.
+    """
+
+    def __init__(self, backend: SimulatedBackend = None):
+        self.backend = backend or get_simulated_backend()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        path = request.url.path
+        if host == "api.openai.com":
+            if path.endswith("/chat/completions"):
+                return await self._chat_completion(request)
+            if path.endswith("/images/generations"):
+                return await self._image_generation(request)
+        elif host == SIMULATED_HOST:
+            return await self._image_download(request)
+        elif host in (urlparse(settings.FACEBOOK_GRAPH_URL).hostname, urlparse(settings.INSTAGRAM_GRAPH_URL).hostname):
+            return await self._graph(request)
+        return _json_response(404, {"error": {"message": f"No simulated endpoint for {request.method} {request.url}"}})
+
+    async def _fail(self, latency: float, status: int, error_type: str) -> httpx.Response:
+        await asyncio.sleep(latency)
+        message = "Rate limit reached (simulated)" if status == 429 else "Upstream error (simulated)"
+        headers = {"retry-after": "1"} if status == 429 else None
+        return _json_response(status, {"error": {"message": message, "type": error_type, "code": status}}, headers)
+
+    async def _chat_completion(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content or b"{}")
+        latency, status = self.backend.draw("openai-chat")
+        if status != 200:
+            return await self._fail(latency, status, "rate_limit_exceeded" if status == 429 else "server_error")
+
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        seed = _digest(prompt, body.get("model"))
+        response_format = body.get("response_format") or {}
+        properties = response_format.get("json_schema", {}).get("schema", {}).get("properties")
+        if properties:
+            content = json.dumps({name: simulated_text(seed + name) for name in properties})
+        elif "content_prompt" in prompt:
+            content = json.dumps({"content_prompt": simulated_text(seed + "content", 300), "image_prompt": simulated_text(seed + "image", 300)})
+        else:
+            content = simulated_text(seed)
+
+        usage = {"prompt_tokens": len(prompt) // 4 + 1, "completion_tokens": len(content) // 4 + 1}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-sim-{self.backend.next_id()}"
+        created = int(time.time())
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return _json_response(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": body.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage
+            })
+
+        # Stream: first token after ~30% of the latency, the rest spread over the chunks
+        words = content.split(" ")
+        include_usage = (body.get("stream_options") or {}).get("include_usage")
+
+        async def events():
+            def event(choices, **extra) -> bytes:
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": body.get("model"), "choices": choices, **extra}
+                return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+            for index, word in enumerate(words):
+                await asyncio.sleep(latency * (0.3 if index == 0 else 0.7 / len(words)))
+                text = word if index == 0 else " " + word
+                yield event([{"index": 0, "delta": {"content": text}, "finish_reason": None}])
+            yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+            if include_usage:
+                yield event([], usage=usage)
+            yield b"data: [DONE]\n\n"
+
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events())
+
+    async def _image_generation(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content or b"{}")
+        latency, status = self.backend.draw("openai-images")
+        if status != 200:
+            return await self._fail(latency, status, "rate_limit_exceeded" if status == 429 else "server_error")
+        await asyncio.sleep(latency)
+        return _json_response(200, {
+            "created": int(time.time()),
+            "data": [{"url": simulated_image_url(body.get("prompt"), index), "revised_prompt": body.get("prompt")} for index in range(body.get("n", 1))]
+        })
+
+    async def _image_download(self, request: httpx.Request) -> httpx.Response:
+        latency, status = self.backend.draw("image-download")
+        if status != 200:
+            return await self._fail(latency, status, "server_error")
+        await asyncio.sleep(latency)
+        return httpx.Response(200, headers={"content-type": "image/png"}, content=simulated_image(request.url.path))
+
+    async def _graph(self, request: httpx.Request) -> httpx.Response:
+        """Facebook and Instagram Graph API endpoints used by the posting services"""
+        parts = request.url.path.strip("/").split("/")
+        fields = request.url.params.get("fields", "")
+        is_facebook = parts[-1] in ("me", "photos")
+        provider = "facebook" if is_facebook else "instagram"
+
+        latency, status = self.backend.draw(provider)
+        if status != 200:
+            # Graph API error code 4 is "application request limit reached"
+            await asyncio.sleep(latency)
+            return _json_response(status, {"error": {
+                "message": "Application request limit reached (simulated)" if status == 429 else "An unexpected error has occurred (simulated)",
+                "type": "OAuthException",
+                "code": 4 if status == 429 else 2
+            }})
+        await asyncio.sleep(latency)
+
+        object_id = f"sim_{self.backend.next_id()}"
+        if request.method == "GET" and parts[-1] == "me":
+            return _json_response(200, {"id": "sim_page", "name": "Simulated Page"})
+        if request.method == "POST" and parts[-1] == "photos":
+            return _json_response(200, {"id": object_id, "post_id": f"{parts[-2]}_{object_id}"})
+        if request.method == "POST" and parts[-1] in ("media", "media_publish"):
+            return _json_response(200, {"id": object_id})
+        if request.method == "GET" and fields == "status_code":
+            return _json_response(200, {"id": parts[-1], "status_code": "FINISHED"})
+        if request.method == "GET" and fields == "username":
+            return _json_response(200, {"id": parts[-1], "username": "simulated_account"})
+        return _json_response(404, {"error": {"message": f"No simulated Graph endpoint for {request.method} {request.url.path}", "code": 803}})
+
+
+class SimulatedFalHandle:
+    """Stand-in for fal_client.AsyncRequestHandle"""
+
+    def __init__(self, request_id: str, ready_at: float, status: int, result: dict):
+        self.request_id = request_id
+        self._ready_at = ready_at
+        self._status = status
+        self._result = result
+        self.cancelled = False
+
+    async def status(self, with_logs: bool = False):
+        import fal_client
+        if time.monotonic() < self._ready_at:
+            return fal_client.InProgress(logs=None)
+        return fal_client.Completed(logs=None, metrics={})
+
+    async def get(self) -> dict:
+        await asyncio.sleep(max(0.0, self._ready_at - time.monotonic()))
+        if self._status != 200:
+            raise SimulatedError("fal", self._status)
+        return self._result
+
+    async def cancel(self) -> None:
+        self.cancelled = True
+
+
+class SimulatedFalClient:
+    """Stand-in for fal_client.AsyncClient (queue submit / status / get / cancel)"""
+
+    def __init__(self, backend: SimulatedBackend = None):
+        self.backend = backend or get_simulated_backend()
+
+    async def submit(self, application: str, arguments: dict, **kwargs) -> SimulatedFalHandle:
+        latency, status = self.backend.draw("fal")
+        if status == 429:
+            raise SimulatedError("fal", status)
+        request_id = f"sim-{self.backend.next_id()}"
+        result = {
+            "images": [{"url": simulated_image_url(application, arguments.get("prompt")), "content_type": "image/png"}],
+            "description": ""
+        }
+        return SimulatedFalHandle(request_id, time.monotonic() + latency, status, result)
+
+
+class SimulatedTwitterAPI:
+    """Stand-in for tweepy.API (v1.1 media upload)"""
+
+    def __init__(self, backend: SimulatedBackend = None):
+        self.backend = backend or get_simulated_backend()
+
+    def media_upload(self, filename: str, **kwargs):
+        self.backend.call_sync("twitter")
+        return SimpleNamespace(media_id_string=str(10 ** 18 + self.backend.next_id()))
+
+
+class SimulatedTwitterClient:
+    """Stand-in for tweepy.Client (v2 create_tweet)"""
+
+    def __init__(self, backend: SimulatedBackend = None):
+        self.backend = backend or get_simulated_backend()
+
+    def create_tweet(self, text: str = None, media_ids: list = None, **kwargs):
+        self.backend.call_sync("twitter")
+        return SimpleNamespace(data={"id": str(10 ** 18 + self.backend.next_id()), "text": text})
+
+
+class SimulatedSubreddit:
+    def __init__(self, backend: SimulatedBackend, name: str):
+        self.backend = backend
+        self.display_name = name
+
+    def submit_image(self, title: str, image_path: str, **kwargs):
+        self.backend.call_sync("reddit")
+        submission_id = f"sim{self.backend.next_id():x}"
+        return SimpleNamespace(id=submission_id, title=title, url=f"https://www.reddit.com/r/{self.display_name}/comments/{submission_id}/")
+
+
+class SimulatedReddit:
+    """Stand-in for praw.Reddit"""
+
+    def __init__(self, backend: SimulatedBackend = None):
+        self.backend = backend or get_simulated_backend()
+
+    def subreddit(self, name: str) -> SimulatedSubreddit:
+        return SimulatedSubreddit(self.backend, name)
+
+
+def simulated_cloudinary_upload(image_path: str, **kwargs) -> dict:
+    """Stand-in for cloudinary.uploader.upload"""
+    backend = get_simulated_backend()
+    backend.call_sync("cloudinary")
+    return {"secure_url": simulated_image_url("cloudinary", image_path), "public_id": f"sim_{backend.next_id()}"}
@@ -3,12 +3,12 @@ Twitter API client configuration
 """
 import tweepy
 from app.config import settings
+from app.clients.simulated import is_simulated, SimulatedTwitterAPI, SimulatedTwitterClient
+from app.clients.pool import client_pool
 
-def get_twitter_v1_client() -> tweepy.API | None:
-    """
-    Return Tweepy API v1.1 client for media upload.
-    Returns None if credentials are not configured.
-    """
+
+def _load_twitter_credentials() -> tuple:
+    """(api_key, api_secret, access_token, access_token_secret) from storage, falling back to env"""
     # Lazy import to avoid circular dependency
     from app.services.credentials_service import get_platform_credentials
     
@@ -16,61 +16,72 @@ def get_twitter_v1_client() -> tweepy.API | None:
     credentials = get_platform_credentials("twitter")
     
     if credentials:
-        api_key = credentials.get("api_key")
-        api_secret = credentials.get("api_secret")
-        access_token = credentials.get("access_token")
-        access_token_secret = credentials.get("access_token_secret")
-    else:
-        api_key = settings.TWITTER_API_KEY
-        api_secret = settings.TWITTER_API_SECRET
-        access_token = settings.TWITTER_ACCESS_TOKEN
-        access_token_secret = settings.TWITTER_ACCESS_TOKEN_SECRET
-    
-    if not all([api_key, api_secret, access_token, access_token_secret]):
+        return (
+            credentials.get("api_key"),
+            credentials.get("api_secret"),
+            credentials.get("access_token"),
+            credentials.get("access_token_secret")
+        )
+    return (
+        settings.TWITTER_API_KEY,
+        settings.TWITTER_API_SECRET,
+        settings.TWITTER_ACCESS_TOKEN,
+        settings.TWITTER_ACCESS_TOKEN_SECRET
+    )
+
+
+def get_twitter_v1_client() -> tweepy.API | None:
+    """
+    Return Tweepy API v1.1 client for media upload.
+    The client is pooled and only rebuilt when the credentials change.
+    Returns None if credentials are not configured.
+    """
+    credentials = client_pool.credentials("twitter", _load_twitter_credentials)
+    if not all(credentials):
         return None
     
-    auth = tweepy.OAuth1UserHandler(
-        api_key,
-        api_secret,
-        access_token,
-        access_token_secret
-    )
-    return tweepy.API(auth)
+    if is_simulated():
+        return SimulatedTwitterAPI()
+    
+    api_key, api_secret, access_token, access_token_secret = credentials
+    
+    def build():
+        auth = tweepy.OAuth1UserHandler(
+            api_key,
+            api_secret,
+            access_token,
+            access_token_secret
+        )
+        return tweepy.API(auth)
+    
+    return client_pool.get("twitter_v1", "twitter", credentials, build)
 
 
 def get_twitter_v2_client() -> tweepy.Client | None:
     """
     Return Tweepy v2 Client for create_tweet (write operations).
+    The client is pooled and only rebuilt when the credentials change.
     Returns None if credentials are not configured.
     """
-    # Lazy import to avoid circular dependency
-    from app.services.credentials_service import get_platform_credentials
+    credentials = client_pool.credentials("twitter", _load_twitter_credentials)
+    if not all(credentials):
+        return None
     
-    # Get credentials from storage first, fallback to env
-    credentials = get_platform_credentials("twitter")
+    if is_simulated():
+        return SimulatedTwitterClient()
     
-    if credentials:
-        api_key = credentials.get("api_key")
-        api_secret = credentials.get("api_secret")
-        access_token = credentials.get("access_token")
-        access_token_secret = credentials.get("access_token_secret")
-    else:
-        api_key = settings.TWITTER_API_KEY
-        api_secret = settings.TWITTER_API_SECRET
-        access_token = settings.TWITTER_ACCESS_TOKEN
-        access_token_secret = settings.TWITTER_ACCESS_TOKEN_SECRET
+    api_key, api_secret, access_token, access_token_secret = credentials
     
-    if not all([api_key, api_secret, access_token, access_token_secret]):
-        return None
+    def build():
+        try:
+            return tweepy.Client(
+                consumer_key=api_key,
+                consumer_secret=api_secret,
+                access_token=access_token,
+                access_token_secret=access_token_secret,
+                wait_on_rate_limit=True
+            )
+        except Exception:
+            return None
     
-    try:
-        return tweepy.Client(
-            consumer_key=api_key,
-            consumer_secret=api_secret,
-            access_token=access_token,
-            access_token_secret=access_token_secret,
-            wait_on_rate_limit=True
-        )
-    except Exception:
-        return None
-
+    return client_pool.get("twitter_v2", "twitter", credentials, build)
@@ -69,13 +69,114 @@ class Settings:
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", 10))
+    OPENAI_READ_TIMEOUT: float = float(os.getenv("OPENAI_READ_TIMEOUT", 90))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", 2))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", 50))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 20))
+    OPENAI_MAX_IN_FLIGHT: int = int(os.getenv("OPENAI_MAX_IN_FLIGHT", 32))
+    
+    # Shared HTTP Clients (Graph API and image downloads; one keep-alive pool per event loop)
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"  # Used when the h2 package is installed
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", 10))
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", 20))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", 10))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+    GRAPH_MAX_CONNECTIONS: int = int(os.getenv("GRAPH_MAX_CONNECTIONS", 20))
+    GRAPH_TIMEOUT: float = float(os.getenv("GRAPH_TIMEOUT", 30))
+    DOWNLOAD_MAX_CONNECTIONS: int = int(os.getenv("DOWNLOAD_MAX_CONNECTIONS", 10))
+    
+    # Platform Identity Cache (page / account looked up from an access token; dropped when credentials change)
+    IDENTITY_CACHE_TTL: float = float(os.getenv("IDENTITY_CACHE_TTL", 3600))
+    IDENTITY_CACHE_NEGATIVE_TTL: float = float(os.getenv("IDENTITY_CACHE_NEGATIVE_TTL", 60))  # For tokens the platform rejected
+    IDENTITY_CACHE_MAX_ENTRIES: int = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", 100))
+    
+    # AI Generation Configuration
+    AI_PLATFORM_CONCURRENCY: int = int(os.getenv("AI_PLATFORM_CONCURRENCY", 4))
+    AI_PLATFORM_TIMEOUT: float = float(os.getenv("AI_PLATFORM_TIMEOUT", 30))
+    AI_GENERATION_MODE: str = os.getenv("AI_GENERATION_MODE", "per_platform")  # "per_platform" or "batched"
+    
+    AI_IMAGE_HEDGE_PRIMARY: str = os.getenv("AI_IMAGE_HEDGE_PRIMARY", "nano-banana")  # Provider started first in "hedged" mode
+    AI_IMAGE_HEDGE_DELAY: float = float(os.getenv("AI_IMAGE_HEDGE_DELAY", 3))  # Seconds before the second provider joins (0 = at once)
+    
+    AI_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", 3))  # Consecutive failures before a provider is skipped
+    AI_CIRCUIT_RESET_TIMEOUT: float = float(os.getenv("AI_CIRCUIT_RESET_TIMEOUT", 30))  # Seconds before a skipped provider is tried again
+    
+    AI_CAPTION_MAX_TOKENS: int = int(os.getenv("AI_CAPTION_MAX_TOKENS", 300))  # Per platform caption (batched mode asks for this per platform)
+    AI_ENHANCE_MAX_TOKENS: int = int(os.getenv("AI_ENHANCE_MAX_TOKENS", 800))
+    
+    # AI Budget Configuration (0 = unlimited); budgets degrade generation instead of failing it
+    AI_DAILY_TOKEN_BUDGET: int = int(os.getenv("AI_DAILY_TOKEN_BUDGET", 0))
+    AI_DAILY_IMAGE_BUDGET: int = int(os.getenv("AI_DAILY_IMAGE_BUDGET", 0))
+    AI_BUDGET_DEGRADE_AT: float = float(os.getenv("AI_BUDGET_DEGRADE_AT", 0.8))  # Fraction of the token budget where the fallback model takes over
+    AI_BUDGET_FALLBACK_MODEL: str = os.getenv("AI_BUDGET_FALLBACK_MODEL", "")  # Cheaper caption model near the budget (empty or = OPENAI_MODEL: keep OPENAI_MODEL)
+    
+    AI_IMAGE_MAX_BYTES: int = int(os.getenv("AI_IMAGE_MAX_BYTES", 20 * 1024 * 1024))  # Larger provider images are rejected mid-download
+    AI_IMAGE_DOWNLOAD_TIMEOUT: float = float(os.getenv("AI_IMAGE_DOWNLOAD_TIMEOUT", 30))
+    
+    AI_PROMPT_TEMPLATES_FILE: Path = Path(os.getenv("AI_PROMPT_TEMPLATES_FILE", "data/prompt_templates.json"))  # Optional overrides, reloaded on change
+    
+    # AI Response Cache Configuration
+    AI_CACHE_BACKEND: str = os.getenv("AI_CACHE_BACKEND", "memory")  # "memory", "sqlite" or "none"
+    AI_CACHE_TTL: int = int(os.getenv("AI_CACHE_TTL", 3600))
+    AI_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_CACHE_MAX_ENTRIES", 1000))
+    AI_CACHE_FILE: Path = Path(os.getenv("AI_CACHE_FILE", "data/storage/ai_cache.sqlite3"))
+    
+    # Near-duplicate topics ("AI in healthcare" / "ai in health care!") reuse the same prompt enhancement
+    AI_SEMANTIC_CACHE_ENABLED: bool = os.getenv("AI_SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    AI_SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", 0.9))  # Cosine similarity needed to reuse an enhancement
+    AI_SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("AI_SEMANTIC_CACHE_MAX_ENTRIES", 100000))
+    AI_SEMANTIC_CACHE_TTL: int = int(os.getenv("AI_SEMANTIC_CACHE_TTL", 604800))
+    
+    # Batch Generation Configuration
+    BATCH_JOBS_DIR: Path = Path(os.getenv("BATCH_JOBS_DIR", "data/storage/batch_jobs"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", 50))
+    BATCH_WORKERS: int = int(os.getenv("BATCH_WORKERS", 3))  # Generations in flight across all batch jobs
+    BATCH_OPENAI_PER_MINUTE: float = float(os.getenv("BATCH_OPENAI_PER_MINUTE", 30))
+    BATCH_DALLE_PER_MINUTE: float = float(os.getenv("BATCH_DALLE_PER_MINUTE", 5))
+    BATCH_FAL_PER_MINUTE: float = float(os.getenv("BATCH_FAL_PER_MINUTE", 30))
+    BATCH_JOB_HEARTBEAT_SECONDS: float = float(os.getenv("BATCH_JOB_HEARTBEAT_SECONDS", 10))
+    BATCH_JOB_LEASE_SECONDS: float = float(os.getenv("BATCH_JOB_LEASE_SECONDS", 60))  # Jobs without a heartbeat this long are resumed by another process
+    
+    # Image Derivatives Configuration (per-platform resized/recompressed copies, rendered in worker processes)
+    IMAGE_DERIVATIVES_ENABLED: bool = os.getenv("IMAGE_DERIVATIVES_ENABLED", "true").lower() == "true"
+    IMAGE_DERIVATIVES_DIR: Path = Path(os.getenv("IMAGE_DERIVATIVES_DIR", "uploads/derivatives"))
+    IMAGE_WORKERS: int = int(os.getenv("IMAGE_WORKERS", min(4, os.cpu_count() or 1)))
+    
+    # Publish Configuration (platforms are posted to concurrently, each with its own timeout)
+    PUBLISH_TIMEOUT: float = float(os.getenv("PUBLISH_TIMEOUT", 60))
+    INSTAGRAM_PUBLISH_TIMEOUT: float = float(os.getenv("INSTAGRAM_PUBLISH_TIMEOUT", 90))  # Includes waiting for the media container
+    PUBLISH_WORKERS: int = int(os.getenv("PUBLISH_WORKERS", 4))  # Publish jobs running at once, each on its own thread and event loop
+    PUBLISH_JOBS_DIR: Path = Path(os.getenv("PUBLISH_JOBS_DIR", "data/storage/publish_jobs"))
+    PUBLISH_JOB_HEARTBEAT_SECONDS: float = float(os.getenv("PUBLISH_JOB_HEARTBEAT_SECONDS", 10))
+    PUBLISH_JOB_LEASE_SECONDS: float = float(os.getenv("PUBLISH_JOB_LEASE_SECONDS", 60))  # Jobs without a heartbeat this long are resumed by another process
+    
+    # Media Store Configuration (uploaded and generated images, stored once per sha256; keep under UPLOAD_DIR to serve them)
+    MEDIA_STORE_DIR: Path = Path(os.getenv("MEDIA_STORE_DIR", "uploads/media"))
+    MEDIA_INDEX_FILE: Path = Path(os.getenv("MEDIA_INDEX_FILE", "data/storage/media_index.sqlite3"))
+    MEDIA_GC_ENABLED: bool = os.getenv("MEDIA_GC_ENABLED", "true").lower() == "true"
+    MEDIA_GC_INTERVAL_MINUTES: float = float(os.getenv("MEDIA_GC_INTERVAL_MINUTES", 60))
+    MEDIA_GC_RETENTION_HOURS: float = float(os.getenv("MEDIA_GC_RETENTION_HOURS", 24))  # Unreferenced files younger than this are kept
+    MEDIA_GC_QUOTA_MB: float = float(os.getenv("MEDIA_GC_QUOTA_MB", 0))  # Disk budget for UPLOAD_DIR (0 = no quota)
+    MEDIA_GC_LOW_WATERMARK: float = float(os.getenv("MEDIA_GC_LOW_WATERMARK", 0.8))  # Over quota, evict down to this fraction of it
     
     # Fal.ai Configuration
     FAL_KEY: str = os.getenv("FAL_KEY")
+    FAL_TIMEOUT: float = float(os.getenv("FAL_TIMEOUT", 120))  # Overall limit per generation
+    FAL_POLL_INITIAL_INTERVAL: float = float(os.getenv("FAL_POLL_INITIAL_INTERVAL", 0.25))
+    FAL_POLL_MAX_INTERVAL: float = float(os.getenv("FAL_POLL_MAX_INTERVAL", 2.0))
     
     # Telegram Bot Configuration
     TELEGRAM_BOT_TOKEN: str = os.getenv("TELEGRAM_BOT_TOKEN")
     TELEGRAM_CHANNEL_ID: str = os.getenv("TELEGRAM_CHANNEL_ID")
+    
+    # Provider Backend Configuration ("live" or "simulated" for offline load testing)
+    PROVIDER_BACKEND: str = os.getenv("PROVIDER_BACKEND", "live")
+    SIMULATED_PROVIDERS_FILE: Path = Path(os.getenv("SIMULATED_PROVIDERS_FILE", "data/simulated_providers.json"))  # Optional per-provider latency/error overrides
+    SIMULATED_LATENCY_SCALE: float = float(os.getenv("SIMULATED_LATENCY_SCALE", 1.0))  # 0 = instant responses
+    SIMULATED_ERROR_RATE: float = float(os.getenv("SIMULATED_ERROR_RATE")) if os.getenv("SIMULATED_ERROR_RATE") else None  # Overrides every provider's rate
+    SIMULATED_RATE_LIMIT_RATE: float = float(os.getenv("SIMULATED_RATE_LIMIT_RATE")) if os.getenv("SIMULATED_RATE_LIMIT_RATE") else None
+    SIMULATED_SEED: int = int(os.getenv("SIMULATED_SEED", 0))
 
 # Create settings instance
 settings = Settings()
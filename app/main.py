@@ -1,15 +1,16 @@
 """
 Main FastAPI application
 """
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from app.config import settings
-from app.routes import health, posts, scheduled, ai_content, enhance, credentials
-from app.scheduler.scheduler import init_scheduler, restore_scheduled_jobs
+from app.routes import health, posts, scheduled, ai_content, enhance, credentials, batch, media
+from app.scheduler.scheduler import scheduler, init_scheduler, restore_scheduled_jobs
+from app.services.media_gc import schedule_media_gc
 
 # Initialize rate limiter
 limiter = Limiter(key_func=get_remote_address)
@@ -25,18 +26,6 @@ app = FastAPI(
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
-# Add global rate limit middleware for file upload endpoints
-@app.middleware("http")
-async def rate_limit_middleware(request: Request, call_next):
-    # Apply rate limiting to posting endpoints
-    if request.url.path == "/api/post":
-        try:
-            await limiter.check_request_limit(request, "30/minute")
-        except RateLimitExceeded:
-            return _rate_limit_exceeded_handler(request, RateLimitExceeded("30 per 1 minute"))
-    response = await call_next(request)
-    return response
-
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -56,6 +45,8 @@ app.include_router(scheduled.router)
 app.include_router(ai_content.router)
 app.include_router(enhance.router)
 app.include_router(credentials.router)
+app.include_router(batch.router)
+app.include_router(media.router)
 
 
 @app.on_event("startup")
@@ -66,6 +57,13 @@ async def startup_event():
     print("🚀 Starting Social Media AI Manager...")
     init_scheduler()
     restore_scheduled_jobs()
+    schedule_media_gc(scheduler)
+    
+    from app.services.batch_service import resume_batch_jobs
+    resume_batch_jobs()
+    
+    from app.services.publish_jobs import resume_publish_jobs
+    resume_publish_jobs()
     
     # Auto-load credentials from environment variables on first startup
     from app.services.credentials_service import get_all_credentials, update_platform_credentials
@@ -142,8 +140,17 @@ async def shutdown_event():
     Cleanup on shutdown
     """
     from app.scheduler.scheduler import scheduler
+    from app.clients.http import close_http_clients
+    from app.services.ai_service import close_ai_clients
+    from app.services.image_service import shutdown_image_pool
+    from app.services.publish_jobs import shutdown_publish_workers
     
     if scheduler.running:
         scheduler.shutdown()
         print("👋 Scheduler shut down gracefully")
+    
+    await close_ai_clients()
+    await close_http_clients()
+    shutdown_publish_workers()
+    shutdown_image_pool()
 
@@ -1,7 +1,6 @@
 """
 API route handlers
 """
-from . import health, posts, scheduled, ai_content, enhance
-
-__all__ = ["health", "posts", "scheduled", "ai_content", "enhance"]
+from . import health, posts, scheduled, ai_content, enhance, batch, media
 
+__all__ = ["health", "posts", "scheduled", "ai_content", "enhance", "batch", "media"]
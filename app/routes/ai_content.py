@@ -1,7 +1,11 @@
 """
 AI content generation endpoints
 """
+import asyncio
+import json
+from typing import Optional
 from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, validator, Field
 from slowapi import Limiter
 from slowapi.util import get_remote_address
@@ -9,12 +13,43 @@ from app.services.ai_service import (
     generate_platform_content, 
     refine_content, 
     regenerate_platform_content,
-    regenerate_image
+    regenerate_image,
+    stream_platform_content,
+    response_cache,
+    image_router,
+    text_router,
+    usage_meter,
+    semantic_cache
 )
 
 router = APIRouter(prefix="/api", tags=["ai"])
 limiter = Limiter(key_func=get_remote_address)
 
+# How often long-running generations check whether the caller is still connected
+DISCONNECT_POLL_INTERVAL = 0.5
+
+
+async def _run_unless_disconnected(http_request: Request, coro):
+    """
+    Run a generation, cancelling it if the HTTP client disconnects first
+    
+    Cancellation propagates into the AI service, which cancels queued
+    fal.ai requests instead of letting them run to completion.
+    """
+    task = asyncio.create_task(coro)
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                print("🔌 Client disconnected, cancelling generation")
+                task.cancel()
+                raise HTTPException(status_code=499, detail="Client closed request")
+    finally:
+        if not task.done():
+            task.cancel()
+
 
 class GenerateRequest(BaseModel):
     topic: str = Field(..., min_length=1, max_length=500, description="Topic for content generation")
@@ -22,7 +57,9 @@ class GenerateRequest(BaseModel):
     image_style: str = "realistic"
     generate_image: bool = True
     use_prompt_enhancer: bool = True
-    image_provider: str = "dalle"  # "dalle" or "nano-banana"
+    image_provider: str = "dalle"  # "dalle", "nano-banana", "hedged" or "auto"
+    generation_mode: Optional[str] = None  # "per_platform" or "batched"; server default if omitted
+    bypass_cache: bool = False  # Force fresh generation instead of returning a cached result
     
     @validator('topic')
     def validate_topic(cls, v):
@@ -50,10 +87,17 @@ class GenerateRequest(BaseModel):
     
     @validator('image_provider')
     def validate_image_provider(cls, v):
-        valid_providers = ['dalle', 'nano-banana']
+        valid_providers = ['dalle', 'nano-banana', 'hedged', 'auto']
         if v not in valid_providers:
             raise ValueError(f'Invalid image provider. Must be one of: {", ".join(valid_providers)}')
         return v
+    
+    @validator('generation_mode')
+    def validate_generation_mode(cls, v):
+        valid_modes = ['per_platform', 'batched']
+        if v is not None and v not in valid_modes:
+            raise ValueError(f'Invalid generation mode. Must be one of: {", ".join(valid_modes)}')
+        return v
 
 
 class RegenerateRequest(BaseModel):
@@ -61,6 +105,7 @@ class RegenerateRequest(BaseModel):
     platform: str
     tone: str = "casual"
     previous_content: str = ""
+    bypass_cache: bool = False
     
     @validator('topic')
     def validate_topic(cls, v):
@@ -80,7 +125,7 @@ class RegenerateImageRequest(BaseModel):
     topic: str = Field(..., min_length=1, max_length=500)
     tone: str = "casual"
     image_style: str = "realistic"
-    image_provider: str = "dalle"  # "dalle" or "nano-banana"
+    image_provider: str = "dalle"  # "dalle", "nano-banana", "hedged" or "auto"
     
     @validator('topic')
     def validate_topic(cls, v):
@@ -93,6 +138,7 @@ class RefineRequest(BaseModel):
     original_content: str = Field(..., min_length=1, max_length=5000)
     platform: str
     instructions: str = Field(..., min_length=1, max_length=500)
+    bypass_cache: bool = False
     
     @validator('platform')
     def validate_platform(cls, v):
@@ -111,15 +157,19 @@ async def generate_content(request: GenerateRequest, http_request: Request):
     Rate limited: 10 requests per minute
     """
     try:
-        result = await generate_platform_content(
+        result = await _run_unless_disconnected(http_request, generate_platform_content(
             topic=request.topic,
             tone=request.tone,
             image_style=request.image_style,
             generate_image=request.generate_image,
             use_prompt_enhancer=request.use_prompt_enhancer,
-            image_provider=request.image_provider
-        )
+            image_provider=request.image_provider,
+            generation_mode=request.generation_mode,
+            bypass_cache=request.bypass_cache
+        ))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -127,6 +177,36 @@ async def generate_content(request: GenerateRequest, http_request: Request):
         )
 
 
+@router.post("/generate-content/stream")
+@limiter.limit("10/minute")  # Same budget as /generate-content
+async def generate_content_stream(payload: GenerateRequest, request: Request):
+    """
+    Generate content like /generate-content, streaming server-sent events as each stage finishes
+    
+    Events: enhanced, caption_delta (token stream), caption, image, then complete
+    (full result, same shape as /generate-content) or error.
+    Rate limited: 10 requests per minute (slowapi needs the Starlette request as `request`)
+    """
+    async def event_stream():
+        async for event, data in stream_platform_content(
+            topic=payload.topic,
+            tone=payload.tone,
+            image_style=payload.image_style,
+            generate_image=payload.generate_image,
+            use_prompt_enhancer=payload.use_prompt_enhancer,
+            image_provider=payload.image_provider,
+            generation_mode=payload.generation_mode,
+            bypass_cache=payload.bypass_cache
+        ):
+            yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post("/regenerate-content")
 @limiter.limit("20/minute")  # More lenient for regeneration
 async def regenerate_content(request: RegenerateRequest, http_request: Request):
@@ -139,7 +219,8 @@ async def regenerate_content(request: RegenerateRequest, http_request: Request):
             topic=request.topic,
             platform=request.platform,
             tone=request.tone,
-            previous_content=request.previous_content
+            previous_content=request.previous_content,
+            bypass_cache=request.bypass_cache
         )
         return result
     except Exception as e:
@@ -157,13 +238,15 @@ async def regenerate_image_endpoint(request: RegenerateImageRequest, http_reques
     Rate limited: 15 requests per minute
     """
     try:
-        result = await regenerate_image(
+        result = await _run_unless_disconnected(http_request, regenerate_image(
             topic=request.topic,
             tone=request.tone,
             image_style=request.image_style,
             image_provider=request.image_provider
-        )
+        ))
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -182,7 +265,8 @@ async def refine_post_content(request: RefineRequest, http_request: Request):
         result = await refine_content(
             original_content=request.original_content,
             platform=request.platform,
-            instructions=request.instructions
+            instructions=request.instructions,
+            bypass_cache=request.bypass_cache
         )
         return result
     except Exception as e:
@@ -191,3 +275,44 @@ async def refine_post_content(request: RefineRequest, http_request: Request):
             detail=f"Failed to refine content: {str(e)}"
         )
 
+
+@router.get("/ai-cache/stats")
+async def ai_cache_stats():
+    """
+    Get AI response cache hit/miss counters (plus the semantic enhancement cache, if enabled)
+    """
+    stats = response_cache.stats()
+    if semantic_cache is not None:
+        stats["semantic"] = semantic_cache.stats()
+    return stats
+
+
+@router.get("/ai-providers/stats")
+async def ai_provider_stats():
+    """
+    Get per-provider latency percentiles, error and hedged win rates, and circuit state
+    """
+    return {
+        "image": image_router.snapshot(),
+        "text": text_router.snapshot()
+    }
+
+
+@router.get("/metrics/ai")
+async def ai_usage_metrics():
+    """
+    Get token, image and estimated cost totals per endpoint, tone, platform and model,
+    plus today's budget state
+    """
+    return usage_meter.snapshot()
+
+
+@router.delete("/ai-cache")
+async def clear_ai_cache():
+    """
+    Clear all cached AI responses
+    """
+    response_cache.clear()
+    if semantic_cache is not None:
+        semantic_cache.clear()
+    return {"success": True, "message": "AI response cache cleared"}
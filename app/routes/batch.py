@@ -0,0 +1,98 @@
+"""
+Batch content generation endpoints
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field, validator
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+from app.config import settings
+from app.routes.ai_content import GenerateRequest
+from app.services.batch_service import create_batch_job, start_batch_job, get_batch_job, list_batch_jobs
+
+router = APIRouter(prefix="/api", tags=["batch"])
+limiter = Limiter(key_func=get_remote_address)
+
+
+class BatchScheduleOptions(BaseModel):
+    start: datetime  # When the first item's post goes out
+    interval_minutes: int = Field(1440, ge=1)  # Gap between consecutive posts (default: daily)
+    platforms: Dict[str, bool] = {"facebook": True, "instagram": True, "twitter": True, "reddit": True}
+
+
+class BatchRequest(BaseModel):
+    items: List[GenerateRequest]
+    schedule: Optional[BatchScheduleOptions] = None  # Schedule outputs straight into the scheduler
+
+    @validator('items')
+    def validate_items(cls, v):
+        if not v:
+            raise ValueError('At least one item is required')
+        if len(v) > settings.BATCH_MAX_ITEMS:
+            raise ValueError(f'Too many items (maximum {settings.BATCH_MAX_ITEMS})')
+        return v
+
+
+@router.post("/generate-batch", status_code=202)
+@limiter.limit("5/minute")
+async def generate_batch(payload: BatchRequest, request: Request):
+    """
+    Queue a batch of content generations and return the job to poll
+    Items run on a shared worker pool with per-provider rate limits
+    Rate limited: 5 batches per minute
+    """
+    try:
+        job = create_batch_job(
+            [item.dict() for item in payload.items],
+            schedule=payload.schedule.dict() if payload.schedule else None
+        )
+        start_batch_job(job["id"])
+        return {
+            "success": True,
+            "job_id": job["id"],
+            "status": job["status"],
+            "total": job["total"]
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create batch job: {str(e)}")
+
+
+@router.get("/generate-batch")
+async def get_batch_jobs():
+    """
+    List batch jobs (summaries only)
+    """
+    return {"jobs": list_batch_jobs()}
+
+
+@router.get("/generate-batch/{job_id}")
+async def get_batch_job_status(job_id: str):
+    """
+    Get a batch job's progress and the results generated so far
+
+    Args:
+        job_id: Job ID returned by /generate-batch
+    """
+    job = get_batch_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return job
+
+
+@router.get("/generate-batch/{job_id}/download")
+async def download_batch_job(job_id: str):
+    """
+    Download a batch job with all its results as a JSON file
+
+    Args:
+        job_id: Job ID returned by /generate-batch
+    """
+    job = get_batch_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Batch job not found")
+    return JSONResponse(
+        content=job,
+        headers={"Content-Disposition": f'attachment; filename="batch_{job_id}.json"'}
+    )
@@ -12,6 +12,7 @@ class EnhancePromptRequest(BaseModel):
     prompt: str
     tone: str = "casual"
     image_style: str = "realistic"
+    bypass_cache: bool = False
 
 
 @router.post("/enhance-prompt")
@@ -23,7 +24,8 @@ async def enhance_prompt(request: EnhancePromptRequest):
         result = await enhance_user_prompt(
             user_prompt=request.prompt,
             tone=request.tone,
-            image_style=request.image_style
+            image_style=request.image_style,
+            bypass_cache=request.bypass_cache
         )
         return result
     except Exception as e:
@@ -5,6 +5,7 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import JSONResponse
 import httpx
 from app.config import settings
+from app.clients.http import get_http_client
 from app.clients.twitter import get_twitter_v1_client
 from app.clients.reddit import get_reddit_client
 from app.services.instagram_service import get_instagram_account_info
@@ -30,43 +31,42 @@ async def verify_token():
     twitter_status = {"valid": False, "pageInfo": None}
     reddit_status = {"valid": False, "pageInfo": None}
     
-    async with httpx.AsyncClient() as client:
-        # Verify Facebook token
-        try:
-            fb_response = await client.get(
-                f"{settings.FACEBOOK_GRAPH_URL}/me",
-                params={"access_token": settings.FACEBOOK_ACCESS_TOKEN}
-            )
-            fb_response.raise_for_status()
-            fb_data = fb_response.json()
-            facebook_status = {
-                "valid": True,
-                "pageInfo": fb_data
-            }
-        except httpx.HTTPError as e:
-            print(f"Facebook token error: {e}")
-            facebook_status = {
-                "valid": False,
-                "error": str(e)
-            }
-        
-        # Verify Instagram configuration
-        try:
-            ig_account_id, username = await get_instagram_account_info()
-            instagram_status = {
-                "valid": True,
-                "pageInfo": {
-                    "id": ig_account_id,
-                    "username": username
-                }
-            }
-        except Exception as e:
-            print(f"Instagram configuration error: {e}")
-            instagram_status = {
-                "valid": False,
-                "error": str(e)
-            }
+    # Verify Facebook token
+    try:
+        fb_response = await get_http_client("graph").get(
+            f"{settings.FACEBOOK_GRAPH_URL}/me",
+            params={"access_token": settings.FACEBOOK_ACCESS_TOKEN}
+        )
+        fb_response.raise_for_status()
+        fb_data = fb_response.json()
+        facebook_status = {
+            "valid": True,
+            "pageInfo": fb_data
+        }
+    except httpx.HTTPError as e:
+        print(f"Facebook token error: {e}")
+        facebook_status = {
+            "valid": False,
+            "error": str(e)
+        }
     
+    # Verify Instagram configuration
+    try:
+        ig_account_id, username = await get_instagram_account_info()
+        instagram_status = {
+            "valid": True,
+            "pageInfo": {
+                "id": ig_account_id,
+                "username": username
+            }
+        }
+    except Exception as e:
+        print(f"Instagram configuration error: {e}")
+        instagram_status = {
+            "valid": False,
+            "error": str(e)
+        }
+
     # Verify Twitter configuration
     try:
         twitter_client = get_twitter_v1_client()
@@ -0,0 +1,39 @@
+"""
+Media store and garbage collection endpoints
+"""
+import asyncio
+from fastapi import APIRouter, HTTPException
+from app.services.media_store import get_media_store
+from app.services.media_gc import collect_garbage
+
+router = APIRouter(prefix="/api", tags=["media"])
+
+
+@router.get("/media/stats")
+async def media_stats():
+    """
+    Stored images, references and bytes saved by deduplication
+    """
+    return get_media_store().stats()
+
+
+@router.get("/media/gc")
+async def media_gc_report():
+    """
+    Dry run of the media garbage collector: what a collection would delete now
+    """
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, collect_garbage, True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to scan media: {str(e)}")
+
+
+@router.post("/media/gc")
+async def run_media_gc_now():
+    """
+    Run the media garbage collector immediately
+    """
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, collect_garbage, False)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Media collection failed: {str(e)}")
@@ -1,21 +1,20 @@
 """
 Posts API endpoints
 """
-import os
+import asyncio
 import json
+import mimetypes
 import uuid
-import aiofiles
 from datetime import datetime
 from pathlib import Path
 from fastapi import APIRouter, File, UploadFile, Form, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from apscheduler.triggers.date import DateTrigger
 from app.config import settings
-from app.services.facebook_service import post_photo_to_facebook
-from app.services.instagram_service import post_photo_to_instagram
-from app.services.twitter_service import post_photo_to_twitter
-from app.services.reddit_service import post_photo_to_reddit
+from app.services.publish_jobs import FINISHED, create_publish_job, start_publish_job, get_publish_job, watch_publish_job
+from app.services.media_store import get_media_store, discard
 from app.scheduler.scheduler import scheduler, execute_scheduled_post
 from app.scheduler.storage import load_scheduled_posts, save_scheduled_posts
 
@@ -23,8 +22,27 @@ router = APIRouter(prefix="/api", tags=["posts"])
 limiter = Limiter(key_func=get_remote_address)
 
 
+PLATFORMS = ("facebook", "instagram", "twitter", "reddit")
+
+
+def _post_result(platform: str, outcome: dict) -> dict:
+    """Shape a publish outcome like the per-platform entries of /api/post's results"""
+    if not outcome["success"]:
+        return {"success": False, "error": outcome["error"]}
+    
+    api_result = outcome["result"] or {}
+    result = {"success": True, "postId": api_result.get("id")}
+    if platform == "facebook":
+        result["postLink"] = f"https://www.facebook.com/{api_result.get('post_id')}" if api_result.get('post_id') else None
+    elif platform == "reddit":
+        result["postUrl"] = api_result.get("url")
+    return result
+
+
 @router.post("/post")
+@limiter.limit("30/minute")
 async def create_post(
+    request: Request,
     photo: UploadFile = File(...),
     caption: str = Form(""),
     platforms: str = Form(None),
@@ -32,7 +50,8 @@ async def create_post(
 ):
     """
     Post a photo with caption to selected platforms (immediately or scheduled)
-    Rate limited: 30 requests per minute (applied at app level)
+    Immediate posts return 202 with a job ID; follow progress at /post/{job_id} or /post/{job_id}/events
+    Rate limited: 30 requests per minute (slowapi needs the Starlette request as `request`)
     """
     # Validate file type
     if photo.content_type not in settings.ALLOWED_EXTENSIONS:
@@ -49,17 +68,19 @@ async def create_post(
             detail="File too large. Maximum size is 10MB."
         )
     
-    # Save file temporarily
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{photo.filename}"
-    file_path = settings.UPLOAD_DIR / filename
+    # Store the image (identical uploads share one file), referenced by this post
+    post_id = str(uuid.uuid4())
+    media_ref = f"scheduled:{post_id}" if scheduled_time else f"post:{post_id}"
+    extension = Path(photo.filename or "").suffix or mimetypes.guess_extension(photo.content_type) or ".jpg"
+    file_path = None
     
     try:
-        # Write file
-        async with aiofiles.open(file_path, 'wb') as f:
-            await f.write(contents)
+        stored = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: get_media_store().put_bytes(contents, media_ref, extension=extension, content_type=photo.content_type)
+        )
+        file_path = stored["local_path"]
         
-        print(f"Processing upload: {{'filename': '{filename}', 'caption': '{caption}'}}")
+        print(f"Processing upload: {{'filename': '{photo.filename}', 'caption': '{caption}', 'deduplicated': {stored['deduplicated']}}}")
         
         # Parse platforms selection
         selected = {"facebook": True, "instagram": True, "twitter": True, "reddit": True}
@@ -75,14 +96,11 @@ async def create_post(
                 # Parse the scheduled time
                 schedule_dt = datetime.fromisoformat(scheduled_time.replace('Z', '+00:00'))
                 
-                # Create a unique post ID
-                post_id = str(uuid.uuid4())
-                
                 # Save post info
                 scheduled_post = {
                     "id": post_id,
                     "caption": caption,
-                    "image_path": str(file_path),
+                    "image_path": file_path,
                     "platforms": selected,
                     "scheduled_time": scheduled_time,
                     "created_at": datetime.now().isoformat(),
@@ -97,7 +115,7 @@ async def create_post(
                 scheduler.add_job(
                     func=execute_scheduled_post,
                     trigger=DateTrigger(run_date=schedule_dt),
-                    args=[post_id, str(file_path), caption, selected],
+                    args=[post_id, file_path, caption, selected],
                     id=post_id,
                     replace_existing=True
                 )
@@ -113,123 +131,31 @@ async def create_post(
                 }
                 
             except Exception as e:
-                # Clean up file if scheduling fails
-                if file_path.exists():
-                    os.remove(file_path)
+                # The handler below releases the image
                 raise HTTPException(status_code=400, detail=f"Failed to schedule post: {str(e)}")
 
-        # Execute immediate posting
-        results = {
-            "facebook": {"success": False, "error": None},
-            "instagram": {"success": False, "error": None},
-            "twitter": {"success": False, "error": None},
-            "reddit": {"success": False, "error": None}
-        }
-        
-        # Post to Facebook
-        if selected.get("facebook"):
-            try:
-                fb_result = await post_photo_to_facebook(str(file_path), caption)
-                results["facebook"] = {
-                    "success": True,
-                    "postId": fb_result.get("id"),
-                    "postLink": f"https://www.facebook.com/{fb_result.get('post_id')}" if fb_result.get('post_id') else None
-                }
-                print("✅ Posted to Facebook successfully")
-            except Exception as fb_error:
-                results["facebook"] = {
-                    "success": False,
-                    "error": str(fb_error)
-                }
-                print(f"❌ Facebook posting failed: {fb_error}")
-        
-        # Post to Instagram
-        if selected.get("instagram"):
-            try:
-                ig_result = await post_photo_to_instagram(str(file_path), caption)
-                results["instagram"] = {
-                    "success": True,
-                    "postId": ig_result.get("id")
-                }
-                print("✅ Posted to Instagram successfully")
-            except Exception as ig_error:
-                results["instagram"] = {
-                    "success": False,
-                    "error": str(ig_error)
-                }
-                print(f"❌ Instagram posting failed: {ig_error}")
-
-        # Post to Twitter
-        if selected.get("twitter"):
-            try:
-                tw_result = await post_photo_to_twitter(str(file_path), caption)
-                results["twitter"] = {
-                    "success": True,
-                    "postId": tw_result.get("id")
-                }
-                print("✅ Posted photo to Twitter successfully")
-            except Exception as tw_error:
-                results["twitter"] = {
-                    "success": False,
-                    "error": str(tw_error)
-                }
-                print(f"❌ Twitter photo posting failed: {tw_error}")
-
-        # Post to Reddit
-        if selected.get("reddit"):
-            try:
-                rd_result = await post_photo_to_reddit(str(file_path), caption)
-                results["reddit"] = {
-                    "success": True,
-                    "postId": rd_result.get("id"),
-                    "postUrl": rd_result.get("url")
-                }
-                print("✅ Posted photo to Reddit successfully")
-            except Exception as rd_error:
-                results["reddit"] = {
-                    "success": False,
-                    "error": str(rd_error)
-                }
-                print(f"❌ Reddit photo posting failed: {rd_error}")
-        
-        # Clean up uploaded file
-        os.remove(file_path)
-        
-        # Determine overall success
-        fb_success = results["facebook"]["success"]
-        ig_success = results["instagram"]["success"]
-        tw_success = results["twitter"]["success"]
-        rd_success = results["reddit"]["success"]
-        
-        successes = []
-        if fb_success: successes.append("Facebook")
-        if ig_success: successes.append("Instagram")
-        if tw_success: successes.append("Twitter")
-        if rd_success: successes.append("Reddit")
+        # Hand the post to the publish workers and return straight away; the job releases the image
+        selected_platforms = [platform for platform in PLATFORMS if selected.get(platform)]
+        if not selected_platforms:
+            raise HTTPException(status_code=400, detail="Select at least one platform")
         
-        if len(successes) == 4:
-            message = "🎉 Photo posted successfully to all platforms!"
-        elif len(successes) > 0:
-            message = f"🎉 Posted to {', '.join(successes)}. Others failed."
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to post to any platform"
-            )
+        job = create_publish_job(file_path, caption, selected_platforms, media_ref=media_ref, job_id=post_id)
+        start_publish_job(job["id"])
         
-        return {
-            "success": fb_success or ig_success or tw_success or rd_success,
-            "message": message,
-            "results": results
-        }
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "message": f"Publishing to {len(selected_platforms)} platform(s)...",
+            "job_id": job["id"],
+            "status": job["status"],
+            "status_url": f"/api/post/{job['id']}",
+            "events_url": f"/api/post/{job['id']}/events"
+        })
         
     except HTTPException:
-        if file_path.exists():
-            os.remove(file_path)
+        discard(file_path, media_ref)
         raise
     except Exception as e:
-        if file_path.exists():
-            os.remove(file_path)
+        discard(file_path, media_ref)
         
         print(f"Error in /api/post: {e}")
         raise HTTPException(
@@ -237,3 +163,71 @@ async def create_post(
             detail=f"Failed to post: {str(e)}"
         )
 
+
+def _job_status(job: dict) -> dict:
+    """Publish job progress, with finished platforms in the same shape as the old synchronous results"""
+    results = {}
+    for platform, state in job["platforms"].items():
+        if state["status"] in FINISHED:
+            results[platform] = {**_post_result(platform, state), "status": state["status"]}
+        else:
+            results[platform] = {"success": False, "error": None, "status": state["status"]}
+    
+    message = None
+    if job["status"] in FINISHED:
+        successes = [platform.title() for platform, result in results.items() if result["success"]]
+        if len(successes) == len(results):
+            message = "🎉 Photo posted successfully to all platforms!"
+        elif successes:
+            message = f"🎉 Posted to {', '.join(successes)}. Others failed."
+        else:
+            message = "Failed to post to any platform"
+    
+    return {
+        "success": job["completed"] > 0,
+        "job_id": job["id"],
+        "status": job["status"],
+        "total": job["total"],
+        "completed": job["completed"],
+        "failed": job["failed"],
+        "message": message,
+        "results": results,
+        "created_at": job["created_at"],
+        "updated_at": job.get("updated_at")
+    }
+
+
+@router.get("/post/{job_id}")
+async def get_post_status(job_id: str):
+    """
+    Get a publish job's per-platform progress
+    
+    Args:
+        job_id: Job ID returned by /post
+    """
+    job = get_publish_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Publish job not found")
+    return _job_status(job)
+
+
+@router.get("/post/{job_id}/events")
+async def stream_post_status(job_id: str):
+    """
+    Stream a publish job's progress as server-sent events
+    
+    Events: progress (on every change, same payload as /post/{job_id}), then complete.
+    """
+    if not get_publish_job(job_id):
+        raise HTTPException(status_code=404, detail="Publish job not found")
+    
+    async def event_stream():
+        async for job in watch_publish_job(job_id):
+            event = "complete" if job["status"] in FINISHED else "progress"
+            yield f"event: {event}\ndata: {json.dumps(_job_status(job))}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,10 +1,10 @@
 """
 Scheduled posts API endpoints
 """
-import os
 from fastapi import APIRouter, HTTPException
 from app.scheduler.storage import load_scheduled_posts, save_scheduled_posts
 from app.scheduler.scheduler import scheduler
+from app.services.media_store import discard
 
 router = APIRouter(prefix="/api", tags=["scheduled"])
 
@@ -41,10 +41,8 @@ async def delete_scheduled_post(post_id: str):
         if not post_to_delete:
             raise HTTPException(status_code=404, detail="Scheduled post not found")
         
-        # Remove image file if it exists
-        if os.path.exists(post_to_delete["image_path"]):
-            os.remove(post_to_delete["image_path"])
-            print(f"✅ Deleted image file: {post_to_delete['image_path']}")
+        # Release the post's image (deleted unless another post still uses it)
+        discard(post_to_delete["image_path"], f"scheduled:{post_id}")
         
         # Remove from posts list
         posts = [p for p in posts if p["id"] != post_id]
@@ -1,16 +1,14 @@
 """
 APScheduler configuration and scheduled post execution
 """
-import os
 import asyncio
 from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.date import DateTrigger
 from app.scheduler.storage import load_scheduled_posts, save_scheduled_posts
-from app.services.facebook_service import post_photo_to_facebook
-from app.services.instagram_service import post_photo_to_instagram
-from app.services.twitter_service import post_photo_to_twitter
-from app.services.reddit_service import post_photo_to_reddit
+from app.services.publish_service import publish_post
+from app.services.media_store import discard
+from app.clients.http import close_http_clients
 
 # Global scheduler instance
 scheduler = BackgroundScheduler()
@@ -43,7 +41,8 @@ def run_async_in_thread(coro):
     try:
         return loop.run_until_complete(coro)
     finally:
-        pass
+        # Shared HTTP clients are per loop; don't leave this job's connections open
+        loop.run_until_complete(close_http_clients())
 
 
 async def execute_scheduled_post_async(post_id: str, image_path: str, caption: str, platforms: dict):
@@ -63,60 +62,11 @@ async def execute_scheduled_post_async(post_id: str, image_path: str, caption: s
         print(f"Caption: {caption[:50]}...")
         print(f"{'='*60}\n")
         
-        results = {
-            "facebook": {"success": False, "error": None},
-            "instagram": {"success": False, "error": None},
-            "twitter": {"success": False, "error": None},
-            "reddit": {"success": False, "error": None}
-        }
+        # Post to every selected platform at once
+        outcomes = await publish_post(image_path, caption, [platform for platform, enabled in platforms.items() if enabled])
         
-        success_count = 0
-        failed_platforms = []
-        
-        # Post to selected platforms
-        if platforms.get("facebook"):
-            try:
-                fb_result = await post_photo_to_facebook(image_path, caption)
-                results["facebook"] = {"success": True, "postId": fb_result.get("id")}
-                success_count += 1
-                print("✅ SUCCESS: Posted to Facebook")
-            except Exception as e:
-                results["facebook"] = {"success": False, "error": str(e)}
-                failed_platforms.append("Facebook")
-                print(f"❌ FAILED: Facebook - {e}")
-        
-        if platforms.get("instagram"):
-            try:
-                ig_result = await post_photo_to_instagram(image_path, caption)
-                results["instagram"] = {"success": True, "postId": ig_result.get("id")}
-                success_count += 1
-                print("✅ SUCCESS: Posted to Instagram")
-            except Exception as e:
-                results["instagram"] = {"success": False, "error": str(e)}
-                failed_platforms.append("Instagram")
-                print(f"❌ FAILED: Instagram - {e}")
-        
-        if platforms.get("twitter"):
-            try:
-                tw_result = await post_photo_to_twitter(image_path, caption)
-                results["twitter"] = {"success": True, "postId": tw_result.get("id")}
-                success_count += 1
-                print("✅ SUCCESS: Posted to Twitter")
-            except Exception as e:
-                results["twitter"] = {"success": False, "error": str(e)}
-                failed_platforms.append("Twitter")
-                print(f"❌ FAILED: Twitter - {e}")
-        
-        if platforms.get("reddit"):
-            try:
-                rd_result = await post_photo_to_reddit(image_path, caption)
-                results["reddit"] = {"success": True, "postId": rd_result.get("id")}
-                success_count += 1
-                print("✅ SUCCESS: Posted to Reddit")
-            except Exception as e:
-                results["reddit"] = {"success": False, "error": str(e)}
-                failed_platforms.append("Reddit")
-                print(f"❌ FAILED: Reddit - {e}")
+        success_count = sum(1 for outcome in outcomes.values() if outcome["success"])
+        failed_platforms = [platform.title() for platform, outcome in outcomes.items() if not outcome["success"]]
         
         # Summary
         print(f"\n{'='*60}")
@@ -185,8 +135,7 @@ def restore_scheduled_jobs():
                 print(f"✅ Restored scheduled post {post['id']} for {schedule_dt}")
             else:
                 # Remove expired scheduled posts
-                if os.path.exists(post["image_path"]):
-                    os.remove(post["image_path"])
+                discard(post["image_path"], f"scheduled:{post['id']}")
                 print(f"⚠️ Removed expired scheduled post {post['id']}")
         except Exception as e:
             print(f"❌ Failed to restore scheduled post {post.get('id')}: {e}")
@@ -2,7 +2,27 @@
 AI Services Module
 Organized AI generation functionality
 """
-from .style_config import get_tone_guidelines, get_style_prompts, get_image_style_guidelines, get_platform_configs
-
-__all__ = ['get_tone_guidelines', 'get_style_prompts', 'get_image_style_guidelines', 'get_platform_configs']
+from .style_config import (
+    get_tone_guidelines, get_style_prompts, get_image_style_guidelines, get_platform_configs,
+    get_tone_instructions, get_tone_image_styles, get_platform_briefs
+)
+from .cache import ResponseCache, create_response_cache, make_cache_key
+from .rate_limit import TokenBucket, ProviderRateLimiter, current_rate_limiter, throttle
+from .provider_stats import ProviderStats
+from .provider_router import CircuitBreaker, ProviderRouter
+from .templates import PromptTemplates, TemplateRegistry
+from .metering import UsageMeter, metered, usage_labels, estimate_cost
+from .singleflight import SingleFlight, single_flight
+from .semantic_cache import SemanticCache, normalize_topic
+from .downloads import download_image
 
+__all__ = [
+    'get_tone_guidelines', 'get_style_prompts', 'get_image_style_guidelines', 'get_platform_configs',
+    'get_tone_instructions', 'get_tone_image_styles', 'get_platform_briefs',
+    'ResponseCache', 'create_response_cache', 'make_cache_key',
+    'TokenBucket', 'ProviderRateLimiter', 'current_rate_limiter', 'throttle', 'ProviderStats',
+    'CircuitBreaker', 'ProviderRouter', 'PromptTemplates', 'TemplateRegistry',
+    'UsageMeter', 'metered', 'usage_labels', 'estimate_cost',
+    'SingleFlight', 'single_flight', 'SemanticCache', 'normalize_topic',
+    'download_image'
+]
@@ -0,0 +1,291 @@
+"""
+Response cache for AI generation
+Content-addressed cache in front of ai_service with in-memory and SQLite backends
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+# Inputs whose case doesn't change the output; text that is rewritten or
+# quoted back (content to refine, instructions, previous posts) keeps its case
+CASE_INSENSITIVE_INPUTS = frozenset({"topic"})
+
+
+def _normalize(value: Any, casefold: bool = False) -> Any:
+    """Normalize prompt inputs so trivially different requests share a key"""
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.casefold() if casefold else value
+    if isinstance(value, dict):
+        return {k: _normalize(v, casefold) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v, casefold) for v in value]
+    return value
+
+
+def make_cache_key(namespace: str, **inputs) -> str:
+    """
+    Build a cache key from a namespace and the inputs that determine the output
+
+    Args:
+        namespace: Operation name (e.g. "generate", "refine")
+        **inputs: Prompt inputs, including the model
+
+    Returns:
+        str: Namespaced sha256 digest of the normalized inputs
+    """
+    normalized = {name: _normalize(value, name in CASE_INSENSITIVE_INPUTS) for name, value in inputs.items()}
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class CacheBackend:
+    """Storage interface for cached responses (values are JSON strings)"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class NullCache(CacheBackend):
+    """Backend that never stores anything (caching disabled)"""
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return 0
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteCache(CacheBackend):
+    """On-disk cache that survives restarts, evicting least recently used entries"""
+
+    def __init__(self, path: Path, max_entries: int = 10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS ai_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ai_cache_last_access ON ai_cache (last_access)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM ai_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE ai_cache SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return value
+
+    def set(self, key: str, value: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ai_cache (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now)
+            )
+            self._conn.execute("DELETE FROM ai_cache WHERE expires_at < ?", (now,))
+            self._conn.execute(
+                """DELETE FROM ai_cache WHERE key IN (
+                    SELECT key FROM ai_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM ai_cache")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ai_cache").fetchone()[0]
+
+
+class ResponseCache:
+    """Cache facade that serializes responses and counts hits, misses and bypasses"""
+
+    def __init__(self, backend: CacheBackend, ttl: float = 3600):
+        self.backend = backend
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, key: str, counter: str) -> None:
+        namespace = key.split(":", 1)[0]
+        with self._lock:
+            counters = self._counters.setdefault(namespace, {"hits": 0, "misses": 0, "bypasses": 0, "stores": 0})
+            counters[counter] += 1
+
+    def get(self, key: str, bypass: bool = False) -> Optional[dict]:
+        """
+        Look up a cached response
+
+        Args:
+            key: Key from make_cache_key
+            bypass: Skip the lookup (regenerate semantics); the fresh result can still be stored
+
+        Returns:
+            dict: A fresh copy of the cached response, or None
+        """
+        if bypass:
+            self._count(key, "bypasses")
+            return None
+
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            print(f"⚠️ AI cache read failed: {e}")
+            value = None
+
+        if value is None:
+            self._count(key, "misses")
+            return None
+
+        self._count(key, "hits")
+        return json.loads(value)
+
+    def set(self, key: str, response: dict, ttl: float = None) -> None:
+        """Store a response (must be JSON-serializable)"""
+        try:
+            self.backend.set(key, json.dumps(response), self.ttl if ttl is None else ttl)
+            self._count(key, "stores")
+        except Exception as e:
+            print(f"⚠️ AI cache write failed: {e}")
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        """Get hit/miss counters per namespace plus totals"""
+        with self._lock:
+            namespaces = {name: dict(counters) for name, counters in self._counters.items()}
+
+        totals = {"hits": 0, "misses": 0, "bypasses": 0, "stores": 0}
+        for counters in namespaces.values():
+            for name, count in counters.items():
+                totals[name] += count
+
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": len(self.backend),
+            "ttl_seconds": self.ttl,
+            "hit_rate": round(totals["hits"] / lookups, 4) if lookups else 0.0,
+            "totals": totals,
+            "namespaces": namespaces
+        }
+
+
+def create_response_cache(backend: str, ttl: float, max_entries: int, path: Path = None) -> ResponseCache:
+    """
+    Build a response cache for the configured backend
+
+    Args:
+        backend: "memory", "sqlite" or "none"
+        ttl: Entry lifetime in seconds
+        max_entries: Maximum number of entries before LRU eviction
+        path: SQLite database file (sqlite backend only)
+    """
+    if backend == "sqlite":
+        try:
+            return ResponseCache(SQLiteCache(path, max_entries=max_entries), ttl=ttl)
+        except Exception as e:
+            print(f"⚠️ Could not open SQLite AI cache at {path}: {e}. Using in-memory cache.")
+            return ResponseCache(MemoryCache(max_entries=max_entries), ttl=ttl)
+    if backend == "none":
+        return ResponseCache(NullCache(), ttl=ttl)
+    return ResponseCache(MemoryCache(max_entries=max_entries), ttl=ttl)
@@ -0,0 +1,70 @@
+"""
+Streaming image downloads for the image providers
+Writes generated images to disk chunk by chunk, enforcing a size limit and hashing on the way
+"""
+import hashlib
+from pathlib import Path
+import aiofiles
+import aiofiles.os
+from app.clients.http import get_http_client
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def download_image(url: str, directory: Path, filename: str, max_bytes: int, timeout: float = 30.0) -> dict:
+    """
+    Stream an image from a provider URL into directory/filename
+
+    The body is written to a `.part` file through aiofiles as it arrives and
+    renamed into place once complete, so readers never see a partial image.
+
+    Args:
+        url: Image URL returned by the provider
+        directory: Directory to save into
+        filename: Final file name
+        max_bytes: Largest accepted image; bigger downloads are aborted
+        timeout: HTTP timeout in seconds
+
+    Returns:
+        dict: local_path, filename, size_bytes, sha256 and content_type
+
+    Raises:
+        ValueError: If the response is not an image, is empty or exceeds max_bytes
+        httpx.HTTPError: If the download fails
+    """
+    path = Path(directory) / filename
+    partial = path.with_name(path.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+
+    try:
+        async with get_http_client("downloads").stream("GET", url, timeout=timeout) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "")
+            if content_type and not content_type.startswith("image/"):
+                raise ValueError(f"Expected an image but got {content_type}")
+            if int(response.headers.get("content-length") or 0) > max_bytes:
+                raise ValueError(f"Image is larger than {max_bytes} bytes")
+
+            async with aiofiles.open(partial, "wb") as f:
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ValueError(f"Image is larger than {max_bytes} bytes")
+                    digest.update(chunk)
+                    await f.write(chunk)
+
+        if not size:
+            raise ValueError("Downloaded image is empty")
+        await aiofiles.os.replace(partial, path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    return {
+        "local_path": str(path),
+        "filename": filename,
+        "size_bytes": size,
+        "sha256": digest.hexdigest(),
+        "content_type": content_type or "image/png"
+    }
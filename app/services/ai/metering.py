@@ -0,0 +1,202 @@
+"""
+Token and image usage metering for AI generation
+Aggregates usage per day, endpoint, tone, platform and model, and applies daily budgets
+"""
+import contextvars
+import functools
+import inspect
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import Optional
+
+# Estimated USD prices: (input, output) per 1M tokens, and per image
+TOKEN_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50)
+}
+IMAGE_PRICES = {
+    "dall-e-3": 0.04,
+    "nano-banana": 0.039
+}
+
+# Labels (endpoint, tone, platform) for AI calls made in the current task.
+# Tasks copy the context when they are created, so captions generated with
+# asyncio.gather inherit the labels of the request that started them.
+_labels = contextvars.ContextVar("ai_usage_labels", default={})
+
+
+@contextmanager
+def usage_labels(**labels):
+    """Attribute AI calls made inside the block to these labels (merged over the current ones)"""
+    token = _labels.set({**_labels.get(), **labels})
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+
+
+def metered(endpoint: Optional[str] = None):
+    """
+    Decorator labelling the AI calls made by an async function
+
+    The endpoint (if given) plus the function's own `tone` and `platform`
+    arguments become the usage labels for everything it calls.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            labels = {name: bound.arguments[name] for name in ("tone", "platform") if name in bound.arguments}
+            if endpoint:
+                labels["endpoint"] = endpoint
+            with usage_labels(**labels):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _count(usage, field: str) -> int:
+    value = getattr(usage, field, 0)
+    return value if isinstance(value, int) else 0
+
+
+def estimate_cost(model: str, prompt_tokens: int = 0, completion_tokens: int = 0, images: int = 0) -> float:
+    """Estimated USD cost of a call (0 for models without a known price)"""
+    input_price, output_price = TOKEN_PRICES.get(model, (0.0, 0.0))
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000 + images * IMAGE_PRICES.get(model, 0.0)
+
+
+def _empty_totals() -> dict:
+    return {
+        "calls": 0,
+        "errors": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "images": 0,
+        "latency_total": 0.0,
+        "estimated_cost": 0.0
+    }
+
+
+class UsageMeter:
+    """
+    Daily AI usage aggregates with token and image budgets
+
+    Budgets degrade generation instead of failing it: past `degrade_at` of the
+    token budget captions switch to `fallback_model` (if one is set and it
+    differs from `model`) and the prompt enhancer is skipped; past the whole budget captions are also generated in a single
+    batched completion. Past the image budget images are skipped.
+    Usage is kept in memory, so a restart starts the day's count again.
+    """
+
+    def __init__(self, model: str, fallback_model: Optional[str] = None, token_budget: int = 0, image_budget: int = 0, degrade_at: float = 0.8, history_days: int = 7):
+        self.model = model
+        # A fallback equal to the primary model would make the switch a no-op
+        self.fallback_model = fallback_model if fallback_model and fallback_model != model else None
+        self.token_budget = token_budget
+        self.image_budget = image_budget
+        self.degrade_at = degrade_at
+        self.history_days = history_days
+        self._lock = threading.Lock()
+        self._days = {}
+        self._level = "normal"
+
+    def _day(self, day: str) -> dict:
+        if day not in self._days:
+            self._days[day] = {"totals": _empty_totals(), "breakdown": {}}
+            for old in sorted(self._days)[:-self.history_days]:
+                del self._days[old]
+        return self._days[day]
+
+    def record(self, model: str, prompt_tokens: int = 0, completion_tokens: int = 0, images: int = 0, latency: float = 0.0, success: bool = True) -> None:
+        """Add one finished call to today's totals and its endpoint/tone/platform/model bucket"""
+        labels = _labels.get()
+        key = (labels.get("endpoint", "other"), labels.get("tone"), labels.get("platform"), model)
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, images)
+
+        with self._lock:
+            day = self._day(date.today().isoformat())
+            for totals in (day["totals"], day["breakdown"].setdefault(key, _empty_totals())):
+                totals["calls"] += 1
+                totals["errors"] += 0 if success else 1
+                totals["prompt_tokens"] += prompt_tokens
+                totals["completion_tokens"] += completion_tokens
+                totals["total_tokens"] += prompt_tokens + completion_tokens
+                totals["images"] += images
+                totals["latency_total"] += latency
+                totals["estimated_cost"] += cost
+
+    def record_completion(self, model: str, usage, latency: float) -> None:
+        """Record a chat completion from its `usage` object (None if the API didn't report it)"""
+        self.record(model, _count(usage, "prompt_tokens"), _count(usage, "completion_tokens"), latency=latency)
+
+    def usage_today(self) -> dict:
+        with self._lock:
+            return dict(self._day(date.today().isoformat())["totals"])
+
+    def policy(self) -> dict:
+        """
+        How generation should run given today's usage
+
+        Returns:
+            dict: level ("normal", "economy" or "exhausted"), model to use,
+            whether the prompt enhancer and image generation are allowed, and
+            a generation_mode override (None = caller's choice)
+        """
+        usage = self.usage_today()
+        spent = usage["total_tokens"] / self.token_budget if self.token_budget else 0.0
+        level = "exhausted" if spent >= 1.0 else "economy" if spent >= self.degrade_at else "normal"
+
+        if level != self._level:
+            print(f"💸 AI token budget {level}: {usage['total_tokens']}/{self.token_budget} tokens used today")
+            self._level = level
+
+        return {
+            "level": level,
+            "model": self.fallback_model if level != "normal" and self.fallback_model else self.model,
+            "use_prompt_enhancer": level == "normal",
+            "generation_mode": "batched" if level == "exhausted" else None,
+            "generate_images": not self.image_budget or usage["images"] < self.image_budget
+        }
+
+    def snapshot(self) -> dict:
+        """Today's budget state plus totals and per endpoint/tone/platform/model breakdowns for recent days"""
+        def summarize(totals: dict) -> dict:
+            summary = dict(totals, estimated_cost=round(totals["estimated_cost"], 6))
+            summary["avg_latency"] = round(summary.pop("latency_total") / totals["calls"], 3) if totals["calls"] else 0.0
+            return summary
+
+        with self._lock:
+            days = {
+                day: {
+                    "totals": summarize(data["totals"]),
+                    "breakdown": [
+                        {"endpoint": endpoint, "tone": tone, "platform": platform, "model": model, **summarize(totals)}
+                        for (endpoint, tone, platform, model), totals in data["breakdown"].items()
+                    ]
+                }
+                for day, data in sorted(self._days.items(), reverse=True)
+            }
+
+        return {
+            "budget": {
+                "daily_tokens": self.token_budget,
+                "daily_images": self.image_budget,
+                "degrade_at": self.degrade_at,
+                "fallback_model": self.fallback_model,
+                **self.policy()
+            },
+            "days": days
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._days.clear()
+            self._level = "normal"
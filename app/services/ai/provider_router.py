@@ -0,0 +1,144 @@
+"""
+Adaptive provider routing for AI generation
+Ranks providers by live latency and error rate and skips providers whose circuit is open
+"""
+import threading
+import time
+from typing import Dict, List
+from .provider_stats import ProviderStats, percentile
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker
+
+    closed: calls allowed. open: calls rejected until reset_timeout has passed.
+    half_open: a single trial call is allowed; its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def available(self) -> bool:
+        """Whether a call would currently be allowed (does not change state)"""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            return time.monotonic() - self.opened_at >= self.reset_timeout
+        return not self._trial_in_flight
+
+    def allow(self) -> bool:
+        """Claim permission for a call, moving open -> half_open once the timeout has passed"""
+        if not self.available():
+            return False
+        if self.state != "closed":
+            self.state = "half_open"
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def release(self) -> None:
+        """Give back a half-open trial whose call was cancelled before it finished"""
+        self._trial_in_flight = False
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial call through"""
+        if self.state != "open":
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+
+class ProviderRouter:
+    """Per-provider stats and circuit breakers, used to order and skip providers"""
+
+    def __init__(self, stats: ProviderStats = None, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.stats = stats or ProviderStats()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def _breaker(self, provider: str) -> CircuitBreaker:
+        return self._breakers.setdefault(provider, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+
+    def available(self, provider: str) -> bool:
+        """Whether the provider's circuit would let a call through"""
+        with self._lock:
+            return self._breaker(provider).available()
+
+    def allow(self, provider: str) -> bool:
+        """Claim a call on the provider (False if its circuit is open)"""
+        with self._lock:
+            return self._breaker(provider).allow()
+
+    def record(self, provider: str, latency: float, success: bool) -> None:
+        """Record a finished call in the stats and the provider's circuit"""
+        self.stats.record(provider, latency, success)
+        with self._lock:
+            breaker = self._breaker(provider)
+            if success:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+                if breaker.state == "open":
+                    print(f"🔌 Circuit open for {provider} (retry in {breaker.retry_in():.0f}s)")
+
+    def record_cancelled(self, provider: str) -> None:
+        """Record a call cancelled before it finished (neither success nor failure)"""
+        self.stats.record_cancelled(provider)
+        with self._lock:
+            self._breaker(provider).release()
+
+    def release(self, provider: str) -> None:
+        """Give back a claimed call that says nothing about the provider's health"""
+        with self._lock:
+            self._breaker(provider).release()
+
+    def expected_latency(self, provider: str) -> float:
+        """
+        Expected seconds to a successful result: median latency divided by the success rate
+
+        Untried providers score 0 so they get tried and measured; providers that
+        have only failed score infinity.
+        """
+        latencies = self.stats.latencies(provider)
+        stats = self.stats.snapshot().get(provider, {})
+        if not latencies:
+            return float("inf") if stats.get("failures") else 0.0
+        return percentile(latencies, 0.5) / max(0.05, 1.0 - stats.get("error_rate", 0.0))
+
+    def rank(self, providers: List[str]) -> List[str]:
+        """Order providers fastest-expected first (stable for ties)"""
+        return sorted(providers, key=self.expected_latency)
+
+    def reset(self) -> None:
+        """Forget all stats and close every circuit"""
+        self.stats.reset()
+        with self._lock:
+            self._breakers.clear()
+
+    def snapshot(self) -> dict:
+        """Stats for every provider plus its circuit state"""
+        summary = self.stats.snapshot()
+        with self._lock:
+            for provider, breaker in self._breakers.items():
+                summary.setdefault(provider, {})
+                summary[provider]["circuit"] = breaker.state
+                summary[provider]["circuit_retry_in"] = round(breaker.retry_in(), 1)
+        return summary
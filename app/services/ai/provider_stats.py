@@ -0,0 +1,87 @@
+"""
+Per-provider statistics for image generation
+Latency percentiles, error counts and hedged-race win rates
+"""
+import threading
+from collections import deque
+from typing import Dict
+
+
+def percentile(samples: list, fraction: float) -> float:
+    """Nearest-rank percentile of a list of numbers (0.0 when empty)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class ProviderStats:
+    """Rolling latency window and counters for each image provider"""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._providers: Dict[str, dict] = {}
+
+    def _provider(self, name: str) -> dict:
+        return self._providers.setdefault(name, {
+            "attempts": 0,
+            "successes": 0,
+            "failures": 0,
+            "races": 0,
+            "wins": 0,
+            "cancelled": 0,
+            "latencies": deque(maxlen=self.window)
+        })
+
+    def record(self, provider: str, latency: float, success: bool) -> None:
+        """Record a finished generation attempt"""
+        with self._lock:
+            stats = self._provider(provider)
+            stats["attempts"] += 1
+            if success:
+                stats["successes"] += 1
+                stats["latencies"].append(latency)
+            else:
+                stats["failures"] += 1
+
+    def record_cancelled(self, provider: str) -> None:
+        """Record an attempt that was cancelled because another provider won"""
+        with self._lock:
+            self._provider(provider)["cancelled"] += 1
+
+    def record_race(self, winner: str, entrants: list) -> None:
+        """Record the outcome of a hedged race"""
+        with self._lock:
+            for provider in entrants:
+                self._provider(provider)["races"] += 1
+            if winner:
+                self._provider(winner)["wins"] += 1
+
+    def latencies(self, provider: str) -> list:
+        """Recent successful latencies for a provider, oldest first"""
+        with self._lock:
+            return list(self._provider(provider)["latencies"])
+
+    def snapshot(self) -> dict:
+        """Get counters, latency percentiles and win rates for every provider"""
+        with self._lock:
+            providers = {name: dict(stats, latencies=list(stats["latencies"])) for name, stats in self._providers.items()}
+
+        summary = {}
+        for name, stats in providers.items():
+            latencies = stats.pop("latencies")
+            finished = stats["successes"] + stats["failures"]
+            summary[name] = {
+                **stats,
+                "error_rate": round(stats["failures"] / finished, 4) if finished else 0.0,
+                "win_rate": round(stats["wins"] / stats["races"], 4) if stats["races"] else 0.0,
+                "latency_p50": round(percentile(latencies, 0.5), 3),
+                "latency_p95": round(percentile(latencies, 0.95), 3)
+            }
+        return summary
+
+    def reset(self) -> None:
+        with self._lock:
+            self._providers.clear()
@@ -0,0 +1,64 @@
+"""
+Token bucket rate limiting for background AI work
+Keeps batch jobs under each provider's per-minute quota
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, per_minute / 6.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until the bucket has enough tokens, then take them"""
+        # Take the tokens up front; a negative balance is a reservation that
+        # later callers queue behind, so tokens are handed out in arrival order
+        self._refill()
+        self._tokens -= tokens
+        if self._tokens >= 0:
+            return
+        try:
+            await asyncio.sleep(-self._tokens / self.rate)
+        except asyncio.CancelledError:
+            self._tokens += tokens
+            raise
+
+
+class ProviderRateLimiter:
+    """One token bucket per provider"""
+
+    def __init__(self, limits: Dict[str, float]):
+        self.buckets = {provider: TokenBucket(per_minute) for provider, per_minute in limits.items() if per_minute > 0}
+
+    async def acquire(self, provider: str, tokens: float = 1.0) -> None:
+        """Wait for capacity on the provider's bucket (unknown or unlimited providers pass straight through)"""
+        bucket = self.buckets.get(provider)
+        if bucket:
+            await bucket.acquire(tokens)
+
+
+# Limiter that provider calls made by the current task draw from (set by batch
+# jobs; interactive requests leave it unset and are not throttled). Tasks
+# started from that task, such as parallel captions or a hedged image race,
+# inherit it.
+current_rate_limiter: ContextVar[Optional[ProviderRateLimiter]] = ContextVar("current_rate_limiter", default=None)
+
+
+async def throttle(provider: str) -> None:
+    """Take one token for a provider call from the current task's limiter, if any"""
+    limiter = current_rate_limiter.get()
+    if limiter is not None:
+        await limiter.acquire(provider)
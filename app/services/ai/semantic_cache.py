@@ -0,0 +1,235 @@
+"""
+Semantic near-duplicate cache for prompt enhancement
+Reuses an enhancement for topics that are worded slightly differently ("AI in healthcare" / "ai in health care!")
+"""
+import copy
+import hashlib
+import heapq
+import math
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from typing import Dict, Optional, Set
+
+# One-permutation MinHash LSH: features (already uniform hashes) are split into
+# NUM_BANDS * BAND_ROWS buckets by value and each bucket keeps its minimum. Two
+# topics become candidates if all the minimums of any band match, which for
+# n-gram Jaccard 0.5 happens ~99% of the time
+NUM_BANDS = 16
+BAND_ROWS = 2
+_BUCKETS = NUM_BANDS * BAND_ROWS
+
+
+def normalize_topic(text: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text).casefold()
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(re.findall(r"\w+", text))
+
+
+def topic_features(topic: str, partition: str) -> Counter:
+    """
+    Hashed character 3- and 4-grams of a normalized topic
+
+    Spaces are dropped first so "health care" and "healthcare" match. The
+    partition is hashed into every feature, so topics only match within it.
+    """
+    padded = "^" + topic.replace(" ", "") + "$"
+    grams = Counter(padded[i:i + n] for n in (3, 4) for i in range(len(padded) - n + 1))
+    return Counter({
+        int.from_bytes(hashlib.blake2b(f"{partition}\x00{gram}".encode("utf-8"), digest_size=4).digest(), "big"): count
+        for gram, count in grams.items()
+    })
+
+
+def _band_keys(features, partition: str) -> list:
+    minimums = [None] * _BUCKETS
+    for feature in features:
+        bucket, value = feature % _BUCKETS, feature // _BUCKETS
+        if minimums[bucket] is None or value < minimums[bucket]:
+            minimums[bucket] = value
+    bands = [tuple(minimums[band * BAND_ROWS:(band + 1) * BAND_ROWS]) for band in range(NUM_BANDS)]
+    # Bands with no features (short topics) would match every other short topic
+    return [(partition, band, rows) for band, rows in enumerate(bands) if any(row is not None for row in rows)]
+
+
+class _Entry:
+    """A cached enhancement with its n-gram term frequencies"""
+
+    __slots__ = ("id", "partition", "topic", "features", "weights", "bands", "value", "created", "last_used", "hits")
+
+    def __init__(self, entry_id: int, partition: str, topic: str, features: Counter, bands: list, value: dict, now: float):
+        self.id = entry_id
+        self.partition = partition
+        self.topic = topic
+        self.features = array("I", features.keys())
+        self.weights = array("f", (1.0 + math.log(count) for count in features.values()))
+        self.bands = bands
+        self.value = value
+        self.created = now
+        self.last_used = now
+        self.hits = 0
+
+
+class SemanticCache:
+    """
+    Near-duplicate lookup over enhanced prompts
+
+    Topics are embedded as hashed n-gram TF-IDF vectors (no model or network
+    needed). Candidates come from a MinHash LSH index, so a lookup only scores a
+    handful of entries however many are stored, and the best candidate with
+    cosine similarity >= threshold is reused.
+
+    Entries expire after ttl seconds. When the cache is full the entries with the
+    lowest (hits + 1) / hours-since-last-use score are evicted first.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 100000, ttl: float = 7 * 86400, max_candidates: int = 50):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_candidates = max_candidates
+        self._lock = threading.Lock()
+        self._entries: Dict[int, _Entry] = {}
+        self._by_topic: Dict[tuple, int] = {}
+        self._bands: Dict[tuple, Set[int]] = {}
+        self._document_frequency: Counter = Counter()
+        self._partition_sizes: Counter = Counter()
+        self._next_id = 0
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _idf(self, feature: int, partition: str) -> float:
+        return math.log((1 + self._partition_sizes[partition]) / (1 + self._document_frequency[feature])) + 1.0
+
+    def _remove(self, entry: _Entry) -> None:
+        del self._entries[entry.id]
+        self._by_topic.pop((entry.partition, entry.topic), None)
+        for key in entry.bands:
+            ids = self._bands.get(key)
+            if ids is not None:
+                ids.discard(entry.id)
+                if not ids:
+                    del self._bands[key]
+        self._document_frequency.subtract(entry.features)
+        for feature in entry.features:
+            if self._document_frequency[feature] <= 0:
+                del self._document_frequency[feature]
+        self._partition_sizes[entry.partition] -= 1
+
+    def _evict(self, now: float) -> None:
+        expired = [entry for entry in self._entries.values() if now - entry.created > self.ttl]
+        for entry in expired:
+            self._remove(entry)
+        overflow = len(self._entries) - self.max_entries
+        if overflow <= 0:
+            self._counters["evictions"] += len(expired)
+            return
+        # Evict in batches so a full cache doesn't rescan on every store
+        batch = max(overflow, self.max_entries // 100)
+        coldest = heapq.nsmallest(batch, self._entries.values(), key=lambda e: (e.hits + 1) / (1 + (now - e.last_used) / 3600))
+        for entry in coldest:
+            self._remove(entry)
+        self._counters["evictions"] += len(expired) + len(coldest)
+
+    def get(self, topic: str, partition: str) -> Optional[dict]:
+        """
+        Find a stored enhancement for a near-identical topic
+
+        Args:
+            topic: User's topic
+            partition: Everything else the enhancement depends on (tone, style, model, templates)
+
+        Returns:
+            dict: A copy of the stored value, or None
+        """
+        normalized = normalize_topic(topic)
+        if not normalized:
+            return None
+
+        features = topic_features(normalized, partition)
+        now = time.time()
+        with self._lock:
+            candidates = Counter()
+            for key in _band_keys(features, partition):
+                candidates.update(self._bands.get(key, ()))
+
+            query = {feature: (1.0 + math.log(count)) * self._idf(feature, partition) for feature, count in features.items()}
+            query_norm = math.sqrt(sum(weight * weight for weight in query.values()))
+
+            best, best_score = None, 0.0
+            for entry_id, _ in candidates.most_common(self.max_candidates):
+                entry = self._entries[entry_id]
+                if now - entry.created > self.ttl:
+                    continue
+                dot = 0.0
+                norm = 0.0
+                for feature, weight in zip(entry.features, entry.weights):
+                    weight *= self._idf(feature, partition)
+                    norm += weight * weight
+                    dot += weight * query.get(feature, 0.0)
+                score = dot / (query_norm * math.sqrt(norm)) if norm else 0.0
+                if score > best_score:
+                    best, best_score = entry, score
+
+            if best is None or best_score < self.threshold:
+                self._counters["misses"] += 1
+                return None
+
+            best.hits += 1
+            best.last_used = now
+            self._counters["hits"] += 1
+            print(f"🧠 Semantic cache hit: '{topic}' ~ '{best.topic}' ({best_score:.2f})")
+            return copy.deepcopy(best.value)
+
+    def set(self, topic: str, partition: str, value: dict) -> None:
+        """Store a value for a topic (replacing the value for the same normalized topic)"""
+        normalized = normalize_topic(topic)
+        if not normalized:
+            return
+
+        features = topic_features(normalized, partition)
+        now = time.time()
+        with self._lock:
+            existing = self._by_topic.get((partition, normalized))
+            if existing is not None:
+                self._remove(self._entries[existing])
+
+            entry = _Entry(self._next_id, partition, normalized, features, _band_keys(features, partition), copy.deepcopy(value), now)
+            self._next_id += 1
+            self._entries[entry.id] = entry
+            self._by_topic[(partition, normalized)] = entry.id
+            for key in entry.bands:
+                self._bands.setdefault(key, set()).add(entry.id)
+            self._document_frequency.update(entry.features)
+            self._partition_sizes[partition] += 1
+            self._counters["stores"] += 1
+
+            if len(self._entries) > self.max_entries:
+                self._evict(now)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_topic.clear()
+            self._bands.clear()
+            self._document_frequency.clear()
+            self._partition_sizes.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "threshold": self.threshold,
+            "ttl_seconds": self.ttl,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+            **counters
+        }
@@ -0,0 +1,92 @@
+"""
+Single-flight deduplication for AI generation
+Identical concurrent requests share one provider call instead of each starting their own
+"""
+import asyncio
+import copy
+import functools
+import inspect
+from typing import Any, Awaitable, Callable, Dict
+from .cache import make_cache_key
+
+
+class _Call:
+    """One in-flight call and the number of callers waiting on it"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.shared = False
+
+
+class SingleFlight:
+    """
+    Coordinator that runs one call per key at a time
+
+    Callers arriving while a call with the same key is running wait for that
+    call's result instead of starting another. Cancellation is reference
+    counted: the call is only cancelled once every waiter has gone.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self.deduplicated = 0
+
+    def _forget(self, key: str, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run factory() for this key, or join the identical call already running
+
+        Args:
+            key: Normalized request key (e.g. from make_cache_key)
+            factory: Creates the coroutine to run when no call is in flight
+
+        Returns:
+            The call's result. Callers that shared a call each get their own copy.
+        """
+        call = self._calls.get(key)
+        if call is None or call.task.done():
+            call = _Call(asyncio.create_task(factory()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self._calls[key] = call
+        else:
+            call.shared = True
+            self.deduplicated += 1
+            print(f"🔁 Joining in-flight request {key.split(':')[0]} ({call.waiters + 1} waiting)")
+
+        call.waiters += 1
+        try:
+            result = await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+        return copy.deepcopy(result) if call.shared else result
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def single_flight(flight: SingleFlight, namespace: str):
+    """
+    Decorator deduplicating concurrent calls of an async function with identical arguments
+
+    Calls with an `on_event` callback report progress to their own caller and
+    always run on their own.
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if bound.arguments.get("on_event"):
+                return await func(*args, **kwargs)
+            key = make_cache_key(namespace, **{name: value for name, value in bound.arguments.items() if name != "on_event"})
+            return await flight.run(key, lambda: func(*args, **kwargs))
+        return wrapper
+    return decorator
@@ -35,13 +35,59 @@ def get_style_prompts():
     """Get DALL-E specific style prompts"""
     return {
         "realistic": "professional photography style, high quality, well-lit, sharp focus, beautiful composition, commercial photography aesthetic",
-        "minimal": "minimalist design, clean white background, single subject, maximum negative space, Apple product photography style, ultra-clean composition",
-        "anime": "anime art style, manga illustration, vibrant colors, Japanese animation style, Studio Ghibli quality",
-        "2d": "flat 2D illustration, modern vector art, clean geometric shapes, contemporary graphic design",
-        "comics": "comic book art, graphic novel style, bold outlines, dynamic composition, superhero aesthetic",
-        "sketch": "pencil sketch, hand-drawn illustration, artistic linework, sketchy texture",
-        "vintage": "vintage 1970s aesthetic, retro colors, aged paper texture, nostalgic feel",
-        "disney": "Disney Pixar 3D animation style, whimsical cartoon, bright colorful, family-friendly"
+        "minimal": "ultra-minimalist design, clean white space, single focal point, Apple-style simplicity, corporate clean aesthetic, NO text overlays, pure visual impact, negative space emphasis",
+        "anime": "Japanese anime art style, vibrant colors, cel-shaded illustration, manga-inspired",
+        "2d": "flat 2D vector illustration, modern graphic design, clean shapes",
+        "comics": "comic book art style, bold outlines, dynamic panels, graphic novel aesthetic",
+        "sketch": "hand-drawn pencil sketch, artistic linework, sketchy texture",
+        "vintage": "retro vintage style, nostalgic feel, classic poster design, aged aesthetic",
+        "disney": "Disney Pixar animation style, 3D cartoon, whimsical character design"
+    }
+
+
+def get_tone_instructions():
+    """Get tone instructions for platform caption generation"""
+    return {
+        "casual": "Be conversational, friendly, and approachable like talking to a friend",
+        "professional": "Be formal, polished, and business-appropriate with expertise",
+        "corporate": "Be EXTREMELY brief and minimal. Use only 1-2 short sentences MAX. Clean, simple language. Think Apple or Tesla - minimal text, maximum impact. NO hashtags. NO emojis unless absolutely essential. Pure corporate minimalism.",
+        "funny": "Be hilarious, witty, and entertaining with humor that makes people laugh out loud",
+        "inspirational": "Be deeply motivational, uplifting, and empowering with powerful impact",
+        "educational": "Be informative, clear, and teaching-focused with valuable insights",
+        "storytelling": "Be narrative-driven, engaging, and emotionally compelling like a great story",
+        "promotional": "Be persuasive, sales-focused, and action-oriented with strong call-to-action"
+    }
+
+
+def get_tone_image_styles():
+    """Get tone descriptions added to image prompts"""
+    return {
+        "casual": "friendly and approachable, warm and inviting atmosphere",
+        "professional": "sleek, corporate, and polished with sophisticated elegance",
+        "corporate": "ultra-clean, minimalist corporate aesthetic, extreme simplicity with maximum impact",
+        "funny": "hilarious, playful, vibrant and whimsical with comedic flair",
+        "inspirational": "motivational, uplifting, dramatic and empowering with cinematic quality",
+        "educational": "clear, informative, well-structured with visual learning elements",
+        "storytelling": "narrative-driven, emotional, engaging with story-like composition",
+        "promotional": "eye-catching, sales-focused, bold and attention-grabbing"
+    }
+
+
+def get_platform_briefs():
+    """Get per-platform caption guidance (length, style, hashtags), with a separate set for the corporate tone"""
+    return {
+        "default": {
+            "facebook": {"max_length": 500, "style": "conversational and friendly, can be longer", "hashtags": "optional, 2-3 max"},
+            "instagram": {"max_length": 400, "style": "visual and engaging with emojis", "hashtags": "5-10 relevant hashtags"},
+            "twitter": {"max_length": 260, "style": "concise and punchy", "hashtags": "1-3 hashtags"},
+            "reddit": {"max_length": 300, "style": "authentic and community-focused, no spam", "hashtags": "avoid hashtags, focus on genuine content"}
+        },
+        "corporate": {
+            "facebook": {"max_length": 150, "style": "ultra-brief, minimal, clean", "hashtags": "NO hashtags"},
+            "instagram": {"max_length": 100, "style": "minimal caption, let image speak", "hashtags": "1-2 minimal hashtags max"},
+            "twitter": {"max_length": 100, "style": "extremely brief and impactful", "hashtags": "NO hashtags"},
+            "reddit": {"max_length": 150, "style": "simple, direct, no fluff", "hashtags": "avoid hashtags, focus on genuine content"}
+        }
     }
 
 
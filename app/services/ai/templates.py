@@ -0,0 +1,372 @@
+"""
+Prompt template registry for AI generation
+Precompiles every (platform, tone, style) prompt once so requests only do lookups,
+with optional overrides from a JSON file that are hot-reloaded when it changes
+"""
+import hashlib
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+from .style_config import (
+    get_tone_guidelines,
+    get_tone_instructions,
+    get_tone_image_styles,
+    get_image_style_guidelines,
+    get_style_prompts,
+    get_platform_briefs
+)
+
+# Placeholder used to split a formatted template around the per-request value
+_SLOT = "\x00SLOT\x00"
+
+DEFAULT_TONE_GUIDELINE = "engaging and authentic"
+DEFAULT_TONE_INSTRUCTION = "Be engaging and authentic"
+DEFAULT_TONE_IMAGE_STYLE = "clean and modern"
+DEFAULT_IMAGE_STYLE_GUIDELINE = "professional quality"
+DEFAULT_STYLE_PROMPT = "photorealistic"
+
+CAPTION_SYSTEM_PROMPT = "You are a professional social media content creator specializing in {platform}. Create engaging, authentic posts optimized for {platform}'s unique audience and format."
+
+CAPTION_PROMPT = """Create a {tone} social media post about: {content_topic}
+
+Platform: {platform_upper}
+Style: {style}
+Max length: {max_length} characters
+Hashtags: {hashtags}
+
+TONE INSTRUCTION: {tone_instruction}
+
+Requirements:
+- Make it HIGHLY engaging and scroll-stopping
+- Optimize for {platform}'s specific audience
+- Include appropriate emojis that enhance the message
+- Return ONLY the post text, nothing else
+
+Post:"""
+
+BATCHED_SYSTEM_PROMPT = "You are a professional social media content creator. Create engaging, authentic posts optimized for each platform's unique audience and format."
+
+BATCHED_PROMPT = """Create a {tone} social media post about: {content_topic}
+
+Write one version for each platform below:
+
+{platform_specs}
+
+TONE INSTRUCTION: {tone_instruction}
+
+Requirements:
+- Make each post HIGHLY engaging and scroll-stopping
+- Optimize each post for its platform's specific audience
+- Include appropriate emojis that enhance the message
+- Put ONLY the post text in each field, nothing else"""
+
+ENHANCE_SYSTEM_PROMPT = """You are a MASTER prompt engineer with 10+ years of experience in viral social media marketing and AI art generation.
+
+Your expertise includes:
+- Creating prompts that generate 10x more engagement
+- Deep understanding of platform algorithms and audience psychology
+- Expert knowledge of DALL-E 3's capabilities and optimal prompt structure
+- Ability to transform vague ideas into crystal-clear, actionable instructions
+- Mastery of visual composition, lighting, color theory, and artistic styles
+
+Your prompts consistently produce professional-grade results that look like they were created by expert marketers and professional photographers/artists.
+
+You ALWAYS provide extremely detailed, specific prompts - never vague or generic."""
+
+ENHANCE_PROMPT = """You are a MASTER prompt engineer specializing in viral social media content and stunning AI image generation. You transform basic ideas into professional, highly-detailed prompts.
+
+USER'S BASIC IDEA: "{user_prompt}"
+
+SELECTED TONE: {tone}
+TONE REQUIREMENTS: {tone_guideline}
+
+SELECTED IMAGE STYLE: {image_style}
+IMAGE STYLE REQUIREMENTS: {image_style_guideline}
+
+YOUR MISSION:
+Create TWO highly-detailed, professional prompts that will generate EXCEPTIONAL results:
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+1. CONTENT PROMPT (for social media text generation):
+Transform the basic idea into a RICH, DETAILED prompt that captures:
+   - Main message and key themes
+   - Specific emotions to evoke
+   - Target audience considerations
+   - Platform-specific best practices (Facebook: conversational; Instagram: visual focus; Twitter: concise; Reddit: authentic)
+   - Tone-specific requirements (see TONE REQUIREMENTS above)
+   - Engagement hooks and call-to-action approach
+   - Content structure and flow
+
+Make it SPECIFIC and ACTIONABLE - not just "create a post about X" but "create a {tone} post that [specific detailed instructions]"
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+2. IMAGE PROMPT (for DALL-E 3 generation):
+Transform the basic idea into an EXTREMELY DETAILED visual description:
+   - Exact subject/scene description
+   - Precise composition and framing (rule of thirds, centered, asymmetric, etc.)
+   - Specific colors and color palette
+   - Detailed lighting description (natural light, studio lighting, golden hour, dramatic shadows, etc.)
+   - Exact mood and atmosphere
+   - Background and environmental details
+   - Style-specific elements (see IMAGE STYLE REQUIREMENTS above)
+   - Camera angle and perspective
+   - Textures and materials
+   - Any additional visual elements that enhance impact
+
+Be HYPER-SPECIFIC about visual details. Instead of "a product", say "a sleek silver smartphone at 45-degree angle on white marble surface with soft shadows"
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+EXAMPLES OF QUALITY:
+
+BAD Content Prompt: "Create a post about coffee"
+GOOD Content Prompt: "Create a warm, inspirational post about the ritual of morning coffee that evokes comfort and motivation. Focus on the sensory experience - rich aroma, warming first sip, peaceful morning moment. Target busy professionals who rely on coffee to start their day. Include themes of self-care, daily rituals, and small pleasures. Encourage audience to share their own coffee moments."
+
+BAD Image Prompt: "Coffee cup"
+GOOD Image Prompt: "Close-up of a pristine white ceramic coffee cup filled with freshly brewed dark coffee, steam rising gracefully, placed on rustic wooden table with natural morning sunlight streaming from left creating soft highlights and long shadows, scattered coffee beans artistically arranged, blurred green plant in background, warm earth-tone color palette with cream and brown accents, shallow depth of field, professional food photography style, cozy intimate atmosphere"
+
+━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+Return ONLY valid JSON in this exact format:
+{{
+  "content_prompt": "your enhanced detailed content prompt here",
+  "image_prompt": "your enhanced detailed image prompt here"
+}}
+
+NO other text, NO explanations, ONLY the JSON."""
+
+
+def _freeze(value):
+    """Recursively turn dicts into read-only mappings and intern strings"""
+    if isinstance(value, dict):
+        return MappingProxyType({_freeze(k): _freeze(v) for k, v in value.items()})
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """A prompt with everything filled in except one per-request value"""
+    head: str
+    tail: str
+
+    @classmethod
+    def compile(cls, template: str, slot: str, **values) -> "CompiledPrompt":
+        head, tail = template.format(**{slot: _SLOT}, **values).split(_SLOT, 1)
+        return cls(sys.intern(head), sys.intern(tail))
+
+    def render(self, value: str) -> str:
+        return self.head + value + self.tail
+
+
+def _platform_specs(briefs: Mapping) -> str:
+    return "\n\n".join(
+        f"{platform.upper()}:\n"
+        f"- Style: {info['style']}\n"
+        f"- Max length: {info['max_length']} characters\n"
+        f"- Hashtags: {info['hashtags']}"
+        for platform, info in briefs.items()
+    )
+
+
+@dataclass(frozen=True)
+class PromptTemplates:
+    """Immutable snapshot of every prompt text, with the per-combination prompts precompiled"""
+    version: str
+    tone_guidelines: Mapping[str, str]
+    tone_instructions: Mapping[str, str]
+    tone_image_styles: Mapping[str, str]
+    image_style_guidelines: Mapping[str, str]
+    style_prompts: Mapping[str, str]
+    platform_briefs: Mapping[str, Mapping]
+    captions: Mapping[Tuple[str, str], Tuple[str, CompiledPrompt]]
+    batched: Mapping[str, CompiledPrompt]
+    enhance: Mapping[Tuple[str, str], CompiledPrompt]
+    image_styles: Mapping[Tuple[str, str], str]
+
+    @classmethod
+    def build(cls, overrides: dict = None) -> "PromptTemplates":
+        """
+        Compile templates from style_config, with optional per-section overrides
+
+        Args:
+            overrides: Sections to merge over the defaults, e.g. {"style_prompts": {"minimal": "..."}}
+        """
+        sections = {
+            "tone_guidelines": get_tone_guidelines(),
+            "tone_instructions": get_tone_instructions(),
+            "tone_image_styles": get_tone_image_styles(),
+            "image_style_guidelines": get_image_style_guidelines(),
+            "style_prompts": get_style_prompts(),
+            "platform_briefs": get_platform_briefs()
+        }
+        for name, values in (overrides or {}).items():
+            if name not in sections:
+                print(f"⚠️ Unknown prompt template section ignored: {name}")
+                continue
+            if name == "platform_briefs":
+                for group, platforms in values.items():
+                    for platform, brief in platforms.items():
+                        sections[name].setdefault(group, {}).setdefault(platform, {}).update(brief)
+            else:
+                sections[name].update(values)
+
+        version = hashlib.sha256(json.dumps(sections, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        templates = cls(
+            version=version,
+            captions={},
+            batched={},
+            enhance={},
+            image_styles={},
+            **{name: _freeze(values) for name, values in sections.items()}
+        )
+
+        tones = set(templates.tone_instructions) | set(templates.tone_guidelines) | set(templates.tone_image_styles)
+        styles = set(templates.style_prompts) | set(templates.image_style_guidelines)
+        captions, batched, enhance, image_styles = {}, {}, {}, {}
+        for tone in tones:
+            briefs = templates.platforms(tone)
+            batched[tone] = templates._compile_batched(tone, briefs)
+            for platform in briefs:
+                captions[(platform, tone)] = templates._compile_caption(platform, tone, briefs)
+            for style in styles:
+                enhance[(tone, style)] = templates._compile_enhance(tone, style)
+                image_styles[(tone, style)] = templates._compile_image_style(tone, style)
+
+        # Frozen dataclass: install the compiled tables once, then never touch them again
+        object.__setattr__(templates, "captions", MappingProxyType(captions))
+        object.__setattr__(templates, "batched", MappingProxyType(batched))
+        object.__setattr__(templates, "enhance", MappingProxyType(enhance))
+        object.__setattr__(templates, "image_styles", MappingProxyType(image_styles))
+        return templates
+
+    def _compile_caption(self, platform: str, tone: str, briefs: Mapping) -> Tuple[str, CompiledPrompt]:
+        info = briefs[platform]
+        system = sys.intern(CAPTION_SYSTEM_PROMPT.format(platform=platform))
+        return system, CompiledPrompt.compile(
+            CAPTION_PROMPT,
+            "content_topic",
+            tone=tone,
+            platform=platform,
+            platform_upper=platform.upper(),
+            style=info["style"],
+            max_length=info["max_length"],
+            hashtags=info["hashtags"],
+            tone_instruction=self.tone_instruction(tone)
+        )
+
+    def _compile_batched(self, tone: str, briefs: Mapping) -> CompiledPrompt:
+        return CompiledPrompt.compile(
+            BATCHED_PROMPT,
+            "content_topic",
+            tone=tone,
+            platform_specs=_platform_specs(briefs),
+            tone_instruction=self.tone_instruction(tone)
+        )
+
+    def _compile_enhance(self, tone: str, image_style: str) -> CompiledPrompt:
+        return CompiledPrompt.compile(
+            ENHANCE_PROMPT,
+            "user_prompt",
+            tone=tone,
+            tone_guideline=self.tone_guidelines.get(tone, DEFAULT_TONE_GUIDELINE),
+            image_style=image_style,
+            image_style_guideline=self.image_style_guidelines.get(image_style, DEFAULT_IMAGE_STYLE_GUIDELINE)
+        )
+
+    def _compile_image_style(self, tone: str, image_style: str) -> str:
+        style_desc = self.style_prompts.get(image_style, DEFAULT_STYLE_PROMPT)
+        tone_desc = self.tone_image_styles.get(tone, DEFAULT_TONE_IMAGE_STYLE)
+        return sys.intern(f"{style_desc}, {tone_desc}")
+
+    def platforms(self, tone: str) -> Mapping:
+        """Caption guidance per platform for a tone"""
+        return self.platform_briefs["corporate" if tone == "corporate" else "default"]
+
+    def tone_instruction(self, tone: str) -> str:
+        return self.tone_instructions.get(tone, DEFAULT_TONE_INSTRUCTION)
+
+    def caption_prompt(self, platform: str, tone: str, content_topic: str) -> Tuple[str, str]:
+        """System and user messages for one platform's caption"""
+        compiled = self.captions.get((platform, tone)) or self._compile_caption(platform, tone, self.platforms(tone))
+        system, prompt = compiled
+        return system, prompt.render(content_topic)
+
+    def batched_prompt(self, tone: str, content_topic: str) -> str:
+        """User message asking for every platform's caption in one completion"""
+        compiled = self.batched.get(tone) or self._compile_batched(tone, self.platforms(tone))
+        return compiled.render(content_topic)
+
+    def enhance_prompt(self, user_prompt: str, tone: str, image_style: str) -> str:
+        """User message for the prompt enhancer"""
+        compiled = self.enhance.get((tone, image_style)) or self._compile_enhance(tone, image_style)
+        return compiled.render(user_prompt)
+
+    def image_prompt_style(self, tone: str, image_style: str) -> str:
+        """Style and tone description appended to image prompts"""
+        return self.image_styles.get((tone, image_style)) or self._compile_image_style(tone, image_style)
+
+
+class TemplateRegistry:
+    """
+    Holds the current PromptTemplates and reloads them when the overrides file changes
+
+    The file is a JSON object with any of the PromptTemplates sections, for example
+    {"style_prompts": {"minimal": "..."}, "platform_briefs": {"default": {"twitter": {"max_length": 240}}}}.
+    A missing file means the built-in defaults; an invalid file keeps the last good templates.
+    """
+
+    def __init__(self, path: Optional[Path] = None, check_interval: float = 1.0):
+        self.path = Path(path) if path else None
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = 0.0
+        try:
+            self._templates = self._load()
+        except Exception as e:
+            print(f"⚠️ Could not load prompt templates from {self.path}: {e}. Using built-in defaults")
+            self._templates = PromptTemplates.build()
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime if self.path else None
+        except OSError:
+            return None
+
+    def _load(self) -> PromptTemplates:
+        self._mtime = self._file_mtime()
+        if self._mtime is None:
+            return PromptTemplates.build()
+
+        with open(self.path, "r") as f:
+            overrides = json.load(f)
+        templates = PromptTemplates.build(overrides)
+        print(f"📝 Loaded prompt templates from {self.path} (version {templates.version})")
+        return templates
+
+    def reload(self) -> PromptTemplates:
+        """Rebuild the templates from the overrides file now"""
+        with self._lock:
+            try:
+                self._templates = self._load()
+            except Exception as e:
+                print(f"⚠️ Could not reload prompt templates from {self.path}: {e}. Keeping version {self._templates.version}")
+            return self._templates
+
+    def get(self) -> PromptTemplates:
+        """Current templates, reloading first if the overrides file changed"""
+        now = time.monotonic()
+        if self.path and now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            if self._file_mtime() != self._mtime:
+                return self.reload()
+        return self._templates
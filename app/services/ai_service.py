@@ -1,25 +1,336 @@
 """
 AI content generation service using OpenAI
 """
+import asyncio
 import httpx
+import mimetypes
 import os
+import time
 import uuid
-from datetime import datetime
 from pathlib import Path
-from openai import OpenAI
+import openai
+from contextlib import asynccontextmanager
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from fastapi import HTTPException
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from app.config import settings
+from app.services.ai.style_config import get_platform_configs
+from app.services.ai.templates import TemplateRegistry, ENHANCE_SYSTEM_PROMPT, BATCHED_SYSTEM_PROMPT
+from app.services.ai.cache import create_response_cache, make_cache_key
+from app.services.ai.rate_limit import throttle
+from app.services.ai.provider_stats import ProviderStats
+from app.services.ai.provider_router import ProviderRouter
+from app.services.ai.metering import UsageMeter, metered
+from app.services.ai.singleflight import SingleFlight, single_flight
+from app.services.ai.semantic_cache import SemanticCache
+from app.services.ai.downloads import download_image
+from app.services.media_store import get_media_store
+from app.clients.simulated import is_simulated, SimulatedTransport, SimulatedFalClient
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+# OpenAI request timeouts (connect is short, read covers slow DALL-E generations)
+OPENAI_TIMEOUT = httpx.Timeout(settings.OPENAI_READ_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
 
-# Directory for AI-generated images
-AI_IMAGES_DIR = Path("uploads/ai_generated")
-AI_IMAGES_DIR.mkdir(parents=True, exist_ok=True)
 
+def _create_openai_client():
+    """Create the async OpenAI client on a single pooled HTTP transport"""
+    simulated = is_simulated()
+    if not settings.OPENAI_API_KEY and not simulated:
+        return None
+    
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        timeout=OPENAI_TIMEOUT,
+        **({"transport": SimulatedTransport()} if simulated else {})
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY or "simulated",
+        http_client=http_client,
+        timeout=OPENAI_TIMEOUT,
+        max_retries=settings.OPENAI_MAX_RETRIES
+    )
+
+
+# Initialize OpenAI client (shared by every request in this process)
+client = _create_openai_client()
+
+# Bound on OpenAI requests in flight across all users of this process
+_openai_slots = asyncio.Semaphore(max(1, settings.OPENAI_MAX_IN_FLIGHT))
+
+# Latency, error and circuit state for the text (chat completion) provider
+text_router = ProviderRouter(
+    failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.AI_CIRCUIT_RESET_TIMEOUT
+)
+
+
+# Errors that mean OpenAI itself is unhealthy (as opposed to a bad request)
+OPENAI_OUTAGE_ERRORS = (
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+    asyncio.TimeoutError
+)
+
+
+@asynccontextmanager
+async def _openai_text_call():
+    """Hold an in-flight slot and track the call in the text provider's stats and circuit"""
+    if not text_router.allow("openai"):
+        raise HTTPException(status_code=503, detail="OpenAI is temporarily unavailable (circuit open). Please try again shortly.")
+    
+    try:
+        # Batch jobs pay one "openai" token per call
+        await throttle("openai")
+        await _openai_slots.acquire()
+    except BaseException:
+        # Cancelled while waiting: give back a half-open trial claimed above
+        text_router.release("openai")
+        raise
+    
+    started = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        text_router.record_cancelled("openai")
+        raise
+    except OPENAI_OUTAGE_ERRORS:
+        text_router.record("openai", time.perf_counter() - started, success=False)
+        raise
+    except Exception:
+        # A rejected request says nothing about OpenAI's health
+        text_router.release("openai")
+        raise
+    else:
+        text_router.record("openai", time.perf_counter() - started, success=True)
+    finally:
+        _openai_slots.release()
+
+
+# Token and image usage per endpoint, tone and platform, with daily budgets
+usage_meter = UsageMeter(
+    settings.OPENAI_MODEL,
+    fallback_model=settings.AI_BUDGET_FALLBACK_MODEL,
+    token_budget=settings.AI_DAILY_TOKEN_BUDGET,
+    image_budget=settings.AI_DAILY_IMAGE_BUDGET,
+    degrade_at=settings.AI_BUDGET_DEGRADE_AT
+)
+
+# Image provider -> model name used for usage metering
+IMAGE_MODELS = {"dalle": "dall-e-3", "nano-banana": "nano-banana"}
+
+
+def _text_model() -> str:
+    """Chat model to use right now (the fallback model once the token budget runs low)"""
+    return usage_meter.policy()["model"]
+
+
+async def _create_chat_completion(timeout: float = None, **kwargs):
+    """
+    Create a chat completion, waiting for a free in-flight slot and metering its token usage
+    
+    The timeout (seconds, excluding the wait for a slot) is applied inside the
+    call's tracking, so a hung OpenAI counts as a failure towards the circuit
+    rather than as a caller cancelling.
+    """
+    async with _openai_text_call():
+        started = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(client.chat.completions.create(**kwargs), timeout=timeout)
+        except Exception:
+            usage_meter.record(kwargs.get("model"), latency=time.perf_counter() - started, success=False)
+            raise
+        usage_meter.record_completion(kwargs.get("model"), getattr(response, "usage", None), time.perf_counter() - started)
+        return response
+
+
+async def _stream_chat_completion(timeout: float = None, **kwargs):
+    """Stream the text deltas of a chat completion, holding an in-flight slot until it finishes (timeout as in _create_chat_completion)"""
+    async with _openai_text_call():
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        deadline = None if timeout is None else loop.time() + timeout
+        
+        def remaining():
+            return None if deadline is None else max(0.0, deadline - loop.time())
+        
+        usage = None
+        stream = None
+        try:
+            # The final chunk carries the token usage for the whole completion
+            stream = await asyncio.wait_for(
+                client.chat.completions.create(stream=True, stream_options={"include_usage": True}, **kwargs),
+                timeout=remaining()
+            )
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=remaining())
+                except StopAsyncIteration:
+                    break
+                usage = getattr(chunk, "usage", None) or usage
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception:
+            usage_meter.record(kwargs.get("model"), latency=time.perf_counter() - started, success=False)
+            if stream is not None and hasattr(stream, "close"):
+                await stream.close()
+            raise
+        usage_meter.record_completion(kwargs.get("model"), usage, time.perf_counter() - started)
+
+
+async def _emit(on_event, event: str, data: dict) -> None:
+    """Send a progress event to the caller's callback, if there is one"""
+    if on_event:
+        await on_event(event, data)
+
+
+async def _generate_images(**kwargs):
+    """Generate images, waiting for a free in-flight slot"""
+    async with _openai_slots:
+        return await client.images.generate(**kwargs)
+
+
+async def close_openai_client() -> None:
+    """Close the pooled OpenAI HTTP transport (call on shutdown)"""
+    if client:
+        await client.close()
+
+
+# Fal.ai queue client, created on first use so FAL_KEY can be added without a code change
+_fal_client = None
+
+
+def _get_fal_client():
+    """Get the shared fal.ai async client (one HTTP pool, key passed explicitly)"""
+    global _fal_client
+    if _fal_client is None and is_simulated():
+        _fal_client = SimulatedFalClient()
+    elif _fal_client is None:
+        import fal_client
+        _fal_client = fal_client.AsyncClient(key=settings.FAL_KEY, default_timeout=settings.FAL_TIMEOUT)
+    return _fal_client
+
+
+async def _run_fal_request(application: str, arguments: dict) -> dict:
+    """
+    Submit a request to the fal.ai queue and poll until it completes
+    
+    Polling starts at FAL_POLL_INITIAL_INTERVAL and backs off to FAL_POLL_MAX_INTERVAL.
+    If the caller is cancelled (e.g. the HTTP client disconnected) or FAL_TIMEOUT
+    passes, the queued request is cancelled on fal.ai as well.
+    
+    Args:
+        application: fal.ai application id (e.g. "fal-ai/nano-banana")
+        arguments: Application arguments
+        
+    Returns:
+        dict: Application result
+    """
+    import fal_client
+    
+    handle = await _get_fal_client().submit(application, arguments=arguments)
+    
+    async def wait_for_result():
+        interval = settings.FAL_POLL_INITIAL_INTERVAL
+        while not isinstance(await handle.status(), fal_client.Completed):
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, settings.FAL_POLL_MAX_INTERVAL)
+        return await handle.get()
+    
+    try:
+        return await asyncio.wait_for(wait_for_result(), timeout=settings.FAL_TIMEOUT)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        print(f"🛑 Cancelling fal.ai request {handle.request_id}")
+        try:
+            await asyncio.shield(handle.cancel())
+        except Exception as e:
+            print(f"⚠️ Could not cancel fal.ai request {handle.request_id}: {e}")
+        raise
+
+
+async def close_ai_clients() -> None:
+    """Close the pooled OpenAI and fal.ai HTTP transports (call on shutdown)"""
+    global _fal_client
+    await close_openai_client()
+    
+    # fal_client builds its httpx client lazily and exposes no close(); only
+    # close one it actually built, and tolerate the attribute going away
+    fal_http = getattr(_fal_client, "__dict__", {}).get("_client")
+    _fal_client = None
+    if isinstance(fal_http, httpx.AsyncClient):
+        await fal_http.aclose()
+
+
+# Prompt templates, compiled once and hot-reloaded when the overrides file changes
+prompt_templates = TemplateRegistry(settings.AI_PROMPT_TEMPLATES_FILE)
+
+# Cache for repeat generation requests (double-clicks, bot retries)
+response_cache = create_response_cache(
+    settings.AI_CACHE_BACKEND,
+    ttl=settings.AI_CACHE_TTL,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+    path=settings.AI_CACHE_FILE
+)
+
+# Optional near-duplicate cache for prompt enhancements (None when disabled)
+semantic_cache = SemanticCache(
+    threshold=settings.AI_SEMANTIC_CACHE_THRESHOLD,
+    max_entries=settings.AI_SEMANTIC_CACHE_MAX_ENTRIES,
+    ttl=settings.AI_SEMANTIC_CACHE_TTL
+) if settings.AI_SEMANTIC_CACHE_ENABLED else None
+
+# Identical generation requests in flight at the same time share one provider call
+inflight = SingleFlight()
+
+# Latency, error and hedged-race win stats per image provider, plus circuit breakers
+IMAGE_PROVIDERS = ["nano-banana", "dalle"]
+image_provider_stats = ProviderStats()
+image_router = ProviderRouter(
+    image_provider_stats,
+    failure_threshold=settings.AI_CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=settings.AI_CIRCUIT_RESET_TIMEOUT
+)
+
+
+async def _download_generated_image(image_url: str) -> dict:
+    """
+    Stream a provider's image into the media store
+    
+    The download lands in the store's incoming directory and is then moved
+    into place by content hash (or dropped if those bytes are already stored).
+    
+    Returns:
+        dict: local_path, web_path, size_bytes, sha256 and content_type
+    """
+    store = get_media_store()
+    artifact = await download_image(
+        image_url,
+        store.incoming_dir,
+        f"{uuid.uuid4().hex}.tmp",
+        max_bytes=settings.AI_IMAGE_MAX_BYTES,
+        timeout=settings.AI_IMAGE_DOWNLOAD_TIMEOUT
+    )
+    stored = await asyncio.get_running_loop().run_in_executor(None, lambda: store.put_file(
+        artifact["local_path"],
+        "generated",
+        sha256=artifact["sha256"],
+        content_type=artifact["content_type"],
+        extension=mimetypes.guess_extension(artifact["content_type"]) or ".png"
+    ))
+    local_path = Path(stored["local_path"])
+    return {
+        **artifact,
+        "local_path": str(local_path),
+        "filename": local_path.name,
+        "web_path": f"/uploads/{local_path.relative_to(settings.UPLOAD_DIR).as_posix()}"
+    }
 
-async def enhance_user_prompt(user_prompt: str, tone: str, image_style: str) -> dict:
+
+@metered("enhance")
+async def enhance_user_prompt(user_prompt: str, tone: str, image_style: str, bypass_cache: bool = False) -> dict:
     """
     Enhance user's basic prompt into optimized prompts for content and image generation
     
@@ -27,6 +338,7 @@ async def enhance_user_prompt(user_prompt: str, tone: str, image_style: str) ->
         user_prompt: The user's basic topic/idea
         tone: Selected tone (casual, professional, corporate, etc.)
         image_style: Selected image style (realistic, anime, minimal, etc.)
+        bypass_cache: Skip the response cache and always call OpenAI
         
     Returns:
         dict: Enhanced prompts for content and image generation
@@ -40,113 +352,36 @@ async def enhance_user_prompt(user_prompt: str, tone: str, image_style: str) ->
             "enhanced": False
         }
     
-    # Detailed tone guidelines for content
-    tone_guidelines = {
-        "casual": "friendly, conversational, relatable language with warmth and approachability. Use everyday language, personal anecdotes, and create connection.",
-        "professional": "formal, authoritative, business-appropriate language with expertise and credibility. Use industry terminology, data-driven insights, and professional tone.",
-        "corporate": "ULTRA-MINIMAL text - only 1-2 sentences maximum. Think Apple/Tesla minimalism. Clean, simple, impactful language with NO fluff, NO hashtags, NO emojis. Pure sophistication.",
-        "funny": "hilarious, witty, entertaining language with humor and comedic timing. Use jokes, puns, pop culture references, and make people laugh out loud.",
-        "inspirational": "motivational, uplifting, empowering language with emotional depth. Use powerful quotes, success stories, and drive action through inspiration.",
-        "educational": "informative, teaching-focused, clear explanations with valuable insights. Use step-by-step guidance, facts, and help audience learn.",
-        "storytelling": "narrative-driven, emotional, engaging story structure with character and plot. Use story arcs, emotional hooks, and compelling narratives.",
-        "promotional": "persuasive, sales-focused, action-oriented language with urgency. Use strong CTAs, benefits-focused messaging, and create FOMO."
-    }
+    templates = prompt_templates.get()
+    cache_key = make_cache_key(
+        "enhance",
+        model=_text_model(),
+        templates=templates.version,
+        prompt=user_prompt,
+        tone=tone,
+        image_style=image_style
+    )
+    cached = response_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
     
-    # Detailed image style guidelines for DALL-E
-    image_style_guidelines = {
-        "realistic": "PHOTOREALISTIC style: Professional photography quality with real-world textures, natural lighting, authentic details, high-resolution clarity, lifelike colors, and camera-shot composition. Like a professional photographer's work.",
-        "minimal": "ULTRA-MINIMALIST style: Clean white/neutral backgrounds, single focal subject, MAXIMUM negative space, Apple-style simplicity, geometric precision, NO text overlays, NO clutter. Think Apple product ads - pure, clean, sophisticated.",
-        "anime": "JAPANESE ANIME style: Vibrant cel-shaded colors, manga-inspired character designs, dynamic action poses, expressive large eyes, clean outlined illustration, colorful backgrounds, Japanese animation aesthetic. Think Studio Ghibli or popular anime series.",
-        "2d": "FLAT 2D ILLUSTRATION style: Modern vector graphics, geometric shapes, flat colors without gradients, clean lines, contemporary graphic design, minimalist illustration approach. Think modern app design or infographics.",
-        "comics": "COMIC BOOK ART style: Bold black outlines, dynamic action panels, speech bubble aesthetic (no actual text), vibrant primary colors, dramatic shading, graphic novel atmosphere, superhero comic aesthetic.",
-        "sketch": "HAND-DRAWN SKETCH style: Pencil or charcoal sketch appearance, artistic linework, sketchy textures, visible pencil strokes, artistic imperfection, raw creative energy, hand-crafted feel.",
-        "vintage": "VINTAGE RETRO style: 1950s-1980s aesthetic, aged paper texture, retro color palette (muted oranges, browns, creams), classic poster design, nostalgic feel, old-school typography style, weathered look.",
-        "disney": "DISNEY PIXAR style: 3D animated cartoon aesthetic, whimsical character design, bright cheerful colors, rounded friendly shapes, Pixar-quality 3D rendering, family-friendly warm atmosphere."
-    }
+    # A slightly differently worded topic may already have an enhancement
+    semantic_partition = make_cache_key("enhance", model=_text_model(), templates=templates.version, tone=tone, image_style=image_style)
+    if semantic_cache is not None and not bypass_cache:
+        similar = semantic_cache.get(user_prompt, semantic_partition)
+        if similar is not None:
+            similar["original_prompt"] = user_prompt
+            return similar
     
     try:
-        # Create enhanced, detailed prompt
-        enhancement_prompt = f"""You are a MASTER prompt engineer specializing in viral social media content and stunning AI image generation. You transform basic ideas into professional, highly-detailed prompts.
-
-USER'S BASIC IDEA: "{user_prompt}"
-
-SELECTED TONE: {tone}
-TONE REQUIREMENTS: {tone_guidelines.get(tone, 'engaging and authentic')}
-
-SELECTED IMAGE STYLE: {image_style}
-IMAGE STYLE REQUIREMENTS: {image_style_guidelines.get(image_style, 'professional quality')}
-
-YOUR MISSION:
-Create TWO highly-detailed, professional prompts that will generate EXCEPTIONAL results:
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-1. CONTENT PROMPT (for social media text generation):
-Transform the basic idea into a RICH, DETAILED prompt that captures:
-   - Main message and key themes
-   - Specific emotions to evoke
-   - Target audience considerations
-   - Platform-specific best practices (Facebook: conversational; Instagram: visual focus; Twitter: concise; Reddit: authentic)
-   - Tone-specific requirements (see TONE REQUIREMENTS above)
-   - Engagement hooks and call-to-action approach
-   - Content structure and flow
-   
-Make it SPECIFIC and ACTIONABLE - not just "create a post about X" but "create a {tone} post that [specific detailed instructions]"
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+        enhancement_prompt = templates.enhance_prompt(user_prompt, tone, image_style)
 
-2. IMAGE PROMPT (for DALL-E 3 generation):
-Transform the basic idea into an EXTREMELY DETAILED visual description:
-   - Exact subject/scene description
-   - Precise composition and framing (rule of thirds, centered, asymmetric, etc.)
-   - Specific colors and color palette
-   - Detailed lighting description (natural light, studio lighting, golden hour, dramatic shadows, etc.)
-   - Exact mood and atmosphere
-   - Background and environmental details
-   - Style-specific elements (see IMAGE STYLE REQUIREMENTS above)
-   - Camera angle and perspective
-   - Textures and materials
-   - Any additional visual elements that enhance impact
-   
-Be HYPER-SPECIFIC about visual details. Instead of "a product", say "a sleek silver smartphone at 45-degree angle on white marble surface with soft shadows"
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-EXAMPLES OF QUALITY:
-
-BAD Content Prompt: "Create a post about coffee"
-GOOD Content Prompt: "Create a warm, inspirational post about the ritual of morning coffee that evokes comfort and motivation. Focus on the sensory experience - rich aroma, warming first sip, peaceful morning moment. Target busy professionals who rely on coffee to start their day. Include themes of self-care, daily rituals, and small pleasures. Encourage audience to share their own coffee moments."
-
-BAD Image Prompt: "Coffee cup"
-GOOD Image Prompt: "Close-up of a pristine white ceramic coffee cup filled with freshly brewed dark coffee, steam rising gracefully, placed on rustic wooden table with natural morning sunlight streaming from left creating soft highlights and long shadows, scattered coffee beans artistically arranged, blurred green plant in background, warm earth-tone color palette with cream and brown accents, shallow depth of field, professional food photography style, cozy intimate atmosphere"
-
-━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-
-Return ONLY valid JSON in this exact format:
-{{
-  "content_prompt": "your enhanced detailed content prompt here",
-  "image_prompt": "your enhanced detailed image prompt here"
-}}
-
-NO other text, NO explanations, ONLY the JSON."""
-
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        response = await _create_chat_completion(
+            model=_text_model(),
             messages=[
                 {
                     "role": "system",
-                    "content": """You are a MASTER prompt engineer with 10+ years of experience in viral social media marketing and AI art generation. 
-
-Your expertise includes:
-- Creating prompts that generate 10x more engagement
-- Deep understanding of platform algorithms and audience psychology
-- Expert knowledge of DALL-E 3's capabilities and optimal prompt structure
-- Ability to transform vague ideas into crystal-clear, actionable instructions
-- Mastery of visual composition, lighting, color theory, and artistic styles
-
-Your prompts consistently produce professional-grade results that look like they were created by expert marketers and professional photographers/artists.
-
-You ALWAYS provide extremely detailed, specific prompts - never vague or generic."""
+                    "content": ENHANCE_SYSTEM_PROMPT
                 },
                 {
                     "role": "user",
@@ -154,19 +389,23 @@ You ALWAYS provide extremely detailed, specific prompts - never vague or generic
                 }
             ],
             temperature=0.8,  # Slightly higher for more creative enhancements
-            max_tokens=800  # More tokens for detailed prompts
+            max_tokens=settings.AI_ENHANCE_MAX_TOKENS  # More tokens for detailed prompts
         )
         
         # Parse the JSON response
         import json
         enhanced_data = json.loads(response.choices[0].message.content.strip())
         
-        return {
+        result = {
             "content_prompt": enhanced_data.get("content_prompt", user_prompt),
             "image_prompt": enhanced_data.get("image_prompt", user_prompt),
             "original_prompt": user_prompt,
             "enhanced": True
         }
+        response_cache.set(cache_key, result)
+        if semantic_cache is not None:
+            semantic_cache.set(user_prompt, semantic_partition, result)
+        return result
         
     except Exception as e:
         print(f"Prompt enhancement error: {e}")
@@ -221,7 +460,7 @@ async def generate_image_with_dalle(prompt_style: str, topic: str, enhanced_imag
             image_prompt = f"Create a professional social media image about {topic}. {prompt_style}. High quality, visually appealing, suitable for social platforms."
 
         # Generate image with DALL-E 3
-        response = client.images.generate(
+        response = await _generate_images(
             model="dall-e-3",
             prompt=image_prompt[:4000],  # DALL-E has prompt limit
             size="1024x1024",
@@ -231,25 +470,13 @@ async def generate_image_with_dalle(prompt_style: str, topic: str, enhanced_imag
         
         image_url = response.data[0].url
         
-        # Download and save the image locally
-        async with httpx.AsyncClient() as http_client:
-            img_response = await http_client.get(image_url)
-            img_response.raise_for_status()
-            
-            # Save with unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ai_generated_{timestamp}_{uuid.uuid4().hex[:8]}.png"
-            file_path = AI_IMAGES_DIR / filename
-            
-            with open(file_path, "wb") as f:
-                f.write(img_response.content)
+        # Stream the image to disk with a unique filename
+        artifact = await _download_generated_image(image_url)
         
         return {
             "success": True,
             "image_url": image_url,
-            "local_path": str(file_path),
-            "filename": filename,
-            "web_path": f"/uploads/ai_generated/{filename}"
+            **artifact
         }
         
     except Exception as e:
@@ -281,19 +508,13 @@ async def generate_image_with_fal(prompt_style: str, topic: str, enhanced_image_
     Returns:
         dict: Image URL and local path
     """
-    if not settings.FAL_KEY:
+    if not settings.FAL_KEY and not is_simulated():
         raise HTTPException(
             status_code=500,
             detail="Fal.ai API key not configured. Add FAL_KEY to .env file"
         )
     
     try:
-        import fal_client
-        import os as os_module
-        
-        # Set API key
-        os_module.environ["FAL_KEY"] = settings.FAL_KEY
-        
         # Create modern, clean prompt that avoids text generation issues
         # Nano Banana works best with clear, focused prompts without text requests
         
@@ -315,8 +536,8 @@ async def generate_image_with_fal(prompt_style: str, topic: str, enhanced_image_
         
         print(f"🍌 Generating image with Nano Banana (Fal.ai)...")
         
-        # Generate with Nano Banana
-        result = fal_client.subscribe(
+        # Generate with Nano Banana (queued on fal.ai, polled without blocking the event loop)
+        result = await _run_fal_request(
             "fal-ai/nano-banana",
             arguments={
                 "prompt": image_prompt[:2000],
@@ -331,28 +552,15 @@ async def generate_image_with_fal(prompt_style: str, topic: str, enhanced_image_
         
         print(f"✅ Nano Banana image generated: {image_url}")
         
-        # Download and save locally
-        async with httpx.AsyncClient(timeout=30.0) as http_client:
-            img_response = await http_client.get(image_url)
-            img_response.raise_for_status()
-            
-            # Save with unique filename
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_id = uuid.uuid4().hex[:8]
-            filename = f"ai_generated_{timestamp}_{unique_id}.png"
-            filepath = AI_IMAGES_DIR / filename
-            
-            with open(filepath, "wb") as f:
-                f.write(img_response.content)
+        # Stream the image to disk with a unique filename
+        artifact = await _download_generated_image(image_url)
         
-        print(f"💾 Image saved: {filepath}")
+        print(f"💾 Image saved: {artifact['local_path']}")
         
         return {
             "success": True,
             "image_url": image_url,
-            "local_path": str(filepath),
-            "filename": filename,
-            "web_path": f"/uploads/ai_generated/{filename}",
+            **artifact,
             "provider": "fal-ai",
             "model": "nano-banana"
         }
@@ -365,7 +573,403 @@ async def generate_image_with_fal(prompt_style: str, topic: str, enhanced_image_
         )
 
 
-async def generate_platform_content(topic: str, tone: str = "casual", image_style: str = "realistic", generate_image: bool = True, use_prompt_enhancer: bool = True, image_provider: str = "dalle") -> dict:
+async def _generate_image_with_provider(provider: str, prompt_style: str, topic: str, enhanced_image_prompt: str = None, content_context: str = None) -> dict:
+    """
+    Generate an image with one provider, recording its latency and outcome
+    
+    Raises:
+        HTTPException: 503 if the provider's circuit is open (nothing is attempted)
+        Exception: If the provider failed (including DALL-E's unsuccessful results)
+    """
+    if not image_router.allow(provider):
+        raise HTTPException(status_code=503, detail=f"{provider} is temporarily unavailable (circuit open)")
+    
+    try:
+        # Batch jobs pay a token for each provider actually called (hedged races and fallbacks included)
+        await throttle(provider)
+    except BaseException:
+        # Cancelled while waiting: give back a half-open trial claimed above
+        image_router.release(provider)
+        raise
+    
+    generate = generate_image_with_fal if provider == "nano-banana" else generate_image_with_dalle
+    started = time.perf_counter()
+    try:
+        image_data = await generate(
+            prompt_style,
+            topic,
+            enhanced_image_prompt=enhanced_image_prompt,
+            content_context=content_context
+        )
+        if not image_data.get("success"):
+            raise Exception(image_data.get("error") or f"{provider} returned no image")
+    except asyncio.CancelledError:
+        image_router.record_cancelled(provider)
+        raise
+    except Exception:
+        image_router.record(provider, time.perf_counter() - started, success=False)
+        usage_meter.record(IMAGE_MODELS[provider], latency=time.perf_counter() - started, success=False)
+        raise
+    
+    image_router.record(provider, time.perf_counter() - started, success=True)
+    usage_meter.record(IMAGE_MODELS[provider], images=1, latency=time.perf_counter() - started)
+    return image_data
+
+
+def _image_provider_order(image_provider: str) -> list:
+    """
+    Decide which image providers to try, in order
+    
+    Args:
+        image_provider: "dalle", "nano-banana", "hedged" or "auto"
+        
+    Returns:
+        list: Providers whose circuit is not open, preferred first
+    """
+    if image_provider == "auto":
+        order = image_router.rank(IMAGE_PROVIDERS)
+    else:
+        preferred = settings.AI_IMAGE_HEDGE_PRIMARY if image_provider == "hedged" else image_provider
+        order = [preferred] + [provider for provider in IMAGE_PROVIDERS if provider != preferred]
+    
+    available = [provider for provider in order if image_router.available(provider)]
+    skipped = [provider for provider in order if provider not in available]
+    if skipped:
+        print(f"⏭️ Skipping image providers with open circuits: {', '.join(skipped)}")
+    return available
+
+
+async def _generate_image_hedged(providers: list, prompt_style: str, topic: str, enhanced_image_prompt: str = None, content_context: str = None) -> dict:
+    """
+    Race the image providers: start the first, add the second after a delay, keep the first success
+    
+    The second provider starts after AI_IMAGE_HEDGE_DELAY seconds (0 = straight away)
+    or as soon as the first fails. The loser is cancelled.
+    
+    Args:
+        providers: Providers to race, primary first (from _image_provider_order)
+        
+    Returns:
+        dict: Image data from the winning provider
+    """
+    # Only providers that were actually started took part in the race
+    entrants = []
+    
+    def start(provider: str) -> asyncio.Task:
+        print(f"🏁 Hedged image generation: starting {provider}")
+        entrants.append(provider)
+        return asyncio.create_task(_generate_image_with_provider(
+            provider,
+            prompt_style,
+            topic,
+            enhanced_image_prompt=enhanced_image_prompt,
+            content_context=content_context
+        ))
+    
+    waiting = list(providers[1:])
+    tasks = {start(providers[0]): providers[0]}
+    errors = {}
+    delay = settings.AI_IMAGE_HEDGE_DELAY
+    
+    try:
+        while True:
+            # The next provider waits for the hedge delay unless everything running has failed
+            if waiting and (delay <= 0 or not tasks):
+                provider = waiting.pop(0)
+                tasks[start(provider)] = provider
+            if not tasks:
+                break
+            
+            done, _ = await asyncio.wait(
+                tasks,
+                timeout=delay if waiting else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                delay = 0
+                continue
+            
+            for task in done:
+                provider = tasks.pop(task)
+                if task.exception() is None:
+                    image_provider_stats.record_race(provider, entrants)
+                    print(f"✅ Hedged image generation won by {provider}")
+                    return task.result()
+                errors[provider] = task.exception()
+                print(f"⚠️ Hedged image generation: {provider} failed: {errors[provider]}")
+    finally:
+        for task in tasks:
+            task.cancel()
+    
+    image_provider_stats.record_race(None, entrants)
+    raise HTTPException(
+        status_code=500,
+        detail="Image generation failed with every available provider. " + ", ".join(f"{provider}: {error}" for provider, error in errors.items())
+    )
+
+
+async def _generate_image_with_fallback(image_provider: str, prompt_style: str, topic: str, enhanced_image_prompt: str = None, content_context: str = None) -> dict:
+    """
+    Generate an image with the selected provider, falling back to the other one
+    
+    Providers whose circuit is open are skipped instead of being retried. Once the
+    daily image budget is used up no provider is called and an unsuccessful
+    result with skipped=True is returned instead of an error.
+    
+    Args:
+        image_provider: "dalle", "nano-banana", "hedged" (race both providers)
+            or "auto" (fastest provider by live latency and error rate first)
+        prompt_style: Style additions based on tone and image style
+        topic: Original topic
+        enhanced_image_prompt: Enhanced or coordinated image prompt (optional)
+        content_context: Summary of generated content to ensure image matches (optional)
+        
+    Returns:
+        dict: Image data from whichever provider succeeded
+    """
+    if not usage_meter.policy()["generate_images"]:
+        print("💸 Daily image budget reached, skipping image generation")
+        return {"success": False, "skipped": True, "error": "Daily image budget reached"}
+    
+    providers = _image_provider_order(image_provider)
+    if not providers:
+        raise HTTPException(
+            status_code=503,
+            detail="All image providers are temporarily unavailable (circuits open). Please try again shortly."
+        )
+    
+    if image_provider == "hedged":
+        return await _generate_image_hedged(
+            providers,
+            prompt_style,
+            topic,
+            enhanced_image_prompt=enhanced_image_prompt,
+            content_context=content_context
+        )
+    
+    errors = {}
+    for provider in providers:
+        if provider == "nano-banana":
+            print("🍌 Using Nano Banana (Fal.ai) for ultra-fast image generation...")
+        else:
+            print("🎨 Using DALL-E 3 for image generation...")
+        try:
+            image_data = await _generate_image_with_provider(
+                provider,
+                prompt_style, 
+                topic,
+                enhanced_image_prompt=enhanced_image_prompt,
+                content_context=content_context
+            )
+            if errors:
+                print(f"✅ Successfully generated with fallback provider: {provider}")
+            return image_data
+        except Exception as e:
+            # Fall back to the next provider
+            errors[provider] = e
+            print(f"⚠️ {provider} failed: {e}. Trying fallback provider...")
+    
+    print(f"❌ All image providers failed: {errors}")
+    raise HTTPException(
+        status_code=500,
+        detail="Image generation failed with every available provider. " + ", ".join(f"{provider}: {error}" for provider, error in errors.items())
+    )
+
+
+@metered()
+async def _generate_platform_caption(platform: str, content_topic: str, tone: str, templates, on_event=None) -> dict:
+    """
+    Generate the caption for a single platform
+    
+    Args:
+        platform: Target platform
+        content_topic: Topic or enhanced content prompt
+        tone: Writing tone
+        templates: PromptTemplates snapshot for this request
+        on_event: Optional async callback; when set the caption is token-streamed
+            as "caption_delta" events
+        
+    Returns:
+        dict: Generated content, or the error if generation failed or timed out
+    """
+    system_prompt, prompt = templates.caption_prompt(platform, tone, content_topic)
+    
+    request = {
+        "model": _text_model(),
+        "messages": [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.8,
+        "max_tokens": settings.AI_CAPTION_MAX_TOKENS
+    }
+    
+    async def complete() -> str:
+        if not on_event:
+            response = await _create_chat_completion(timeout=settings.AI_PLATFORM_TIMEOUT, **request)
+            return response.choices[0].message.content
+        
+        parts = []
+        async for delta in _stream_chat_completion(timeout=settings.AI_PLATFORM_TIMEOUT, **request):
+            parts.append(delta)
+            await on_event("caption_delta", {"platform": platform, "delta": delta})
+        return "".join(parts)
+    
+    try:
+        generated_text = (await complete()).strip()
+        
+        return {
+            "content": generated_text,
+            "success": True,
+            "character_count": len(generated_text)
+        }
+        
+    except asyncio.TimeoutError:
+        return {
+            "content": "",
+            "success": False,
+            "error": f"{platform} generation timed out after {settings.AI_PLATFORM_TIMEOUT:g}s"
+        }
+    except Exception as e:
+        return {
+            "content": "",
+            "success": False,
+            "error": str(e)
+        }
+
+
+async def _generate_batched_captions(platforms: list, content_topic: str, tone: str, templates) -> dict:
+    """
+    Generate captions for every platform with a single structured completion
+    
+    Args:
+        platforms: Platforms to write captions for
+        content_topic: Topic or enhanced content prompt
+        tone: Writing tone
+        templates: PromptTemplates snapshot for this request
+        
+    Returns:
+        dict: Content for each platform that came back valid. Platforms that are
+        missing, empty or over the platform's hard limit are left out so the
+        caller can regenerate them individually.
+    """
+    prompt = templates.batched_prompt(tone, content_topic)
+    
+    response_format = {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "platform_posts",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {platform: {"type": "string"} for platform in platforms},
+                "required": list(platforms),
+                "additionalProperties": False
+            }
+        }
+    }
+    
+    try:
+        response = await _create_chat_completion(
+            timeout=settings.AI_PLATFORM_TIMEOUT,
+            model=_text_model(),
+            messages=[
+                {
+                    "role": "system",
+                    "content": BATCHED_SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            response_format=response_format,
+            temperature=0.8,
+            max_tokens=settings.AI_CAPTION_MAX_TOKENS * len(platforms)
+        )
+        
+        import json
+        posts = json.loads(response.choices[0].message.content)
+    except Exception as e:
+        print(f"⚠️ Batched generation failed, falling back to per-platform: {e}")
+        return {}
+    
+    platform_configs = get_platform_configs()
+    results = {}
+    
+    for platform in platforms:
+        text = posts.get(platform)
+        if not isinstance(text, str) or not text.strip():
+            print(f"⚠️ Batched response missing {platform}, regenerating individually")
+            continue
+        
+        text = text.strip()
+        max_length = platform_configs.get(platform, {}).get("max_length")
+        if max_length and len(text) > max_length:
+            print(f"⚠️ Batched {platform} post too long ({len(text)} > {max_length}), regenerating individually")
+            continue
+        
+        results[platform] = {
+            "content": text,
+            "success": True,
+            "character_count": len(text)
+        }
+    
+    return results
+
+
+async def _generate_captions(content_topic: str, tone: str, generation_mode: str, templates, on_event=None) -> dict:
+    """
+    Generate captions for all platforms
+    
+    Args:
+        content_topic: Topic or enhanced content prompt
+        tone: Writing tone
+        generation_mode: "per_platform" or "batched"
+        templates: PromptTemplates snapshot for this request
+        on_event: Optional async callback for "caption_delta" and "caption" events
+        
+    Returns:
+        dict: Generated content for each platform, in template platform order
+    """
+    platforms = list(templates.platforms(tone))
+    
+    # Batched mode asks for every platform in one completion; any platform it
+    # gets wrong is regenerated through the per-platform path below
+    results = {}
+    if generation_mode == "batched":
+        results = await _generate_batched_captions(platforms, content_topic, tone, templates)
+        for platform, data in results.items():
+            await _emit(on_event, "caption", {"platform": platform, **data})
+    
+    pending = [platform for platform in platforms if platform not in results]
+    
+    # Generate remaining platforms concurrently, capped so one request can't flood the API
+    semaphore = asyncio.Semaphore(max(1, settings.AI_PLATFORM_CONCURRENCY))
+    
+    async def generate_with_limit(platform: str) -> dict:
+        async with semaphore:
+            data = await _generate_platform_caption(platform, content_topic, tone, templates, on_event=on_event)
+        await _emit(on_event, "caption", {"platform": platform, **data})
+        return data
+    
+    captions = await asyncio.gather(
+        *(generate_with_limit(platform) for platform in pending)
+    )
+    results.update(zip(pending, captions))
+    
+    return {platform: results[platform] for platform in platforms}
+
+
+@metered("generate")
+@single_flight(inflight, "generate")
+async def generate_platform_content(topic: str, tone: str = "casual", image_style: str = "realistic", generate_image: bool = True, use_prompt_enhancer: bool = True, image_provider: str = "dalle", generation_mode: str = None, bypass_cache: bool = False, on_event=None) -> dict:
     """
     Generate platform-specific content for all social media platforms
     
@@ -375,155 +979,96 @@ async def generate_platform_content(topic: str, tone: str = "casual", image_styl
         image_style: Visual style for DALL-E (realistic, anime, 2d, comics, sketch, vintage, disney, 3d)
         generate_image: Whether to generate an image
         use_prompt_enhancer: Whether to enhance the user's prompt first (default: True)
+        image_provider: "dalle", "nano-banana" or "hedged" (race both providers)
+        generation_mode: "per_platform" (one completion per platform) or "batched"
+            (one structured completion for all platforms). Defaults to AI_GENERATION_MODE.
+        bypass_cache: Skip the response cache and always generate fresh content
+        on_event: Optional async callback ``(event, data)`` called as each stage
+            finishes: "enhanced", "caption_delta", "caption" and "image".
+            Cache hits return immediately without intermediate events.
         
     Returns:
-        dict: Generated content for each platform
+        dict: Generated content for each platform. When the daily token budget
+        runs low the prompt enhancer is skipped and a cheaper model or batched
+        mode is used; budget_level says which.
     """
+    # Degrade rather than fail once today's token budget runs low
+    policy = usage_meter.policy()
+    if not policy["use_prompt_enhancer"] and use_prompt_enhancer:
+        print(f"💸 Skipping prompt enhancer (AI budget {policy['level']})")
+        use_prompt_enhancer = False
+    generation_mode = policy["generation_mode"] or generation_mode or settings.AI_GENERATION_MODE
+    
     if not client:
         raise HTTPException(
             status_code=500, 
             detail="OpenAI API key not configured"
         )
     
+    # One templates snapshot per request so a reload can't mix versions mid-generation
+    templates = prompt_templates.get()
+    
+    cache_key = make_cache_key(
+        "generate",
+        model=_text_model(),
+        templates=templates.version,
+        topic=topic,
+        tone=tone,
+        image_style=image_style,
+        generate_image=generate_image,
+        use_prompt_enhancer=use_prompt_enhancer,
+        image_provider=image_provider,
+        generation_mode=generation_mode
+    )
+    cached = response_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
+    
     # Step 1: Enhance the user's prompt if enabled
     enhanced_prompts = None
     if use_prompt_enhancer:
-        enhanced_prompts = await enhance_user_prompt(topic, tone, image_style)
+        enhanced_prompts = await enhance_user_prompt(topic, tone, image_style, bypass_cache=bypass_cache)
         content_topic = enhanced_prompts["content_prompt"]
         image_topic = enhanced_prompts["image_prompt"]
+        await _emit(on_event, "enhanced", enhanced_prompts)
     else:
         content_topic = topic
         image_topic = topic
     
-    # Platform-specific prompts
-    platforms_info = {
-        "facebook": {
-            "max_length": 500 if tone != "corporate" else 150,
-            "style": "conversational and friendly, can be longer" if tone != "corporate" else "ultra-brief, minimal, clean",
-            "hashtags": "optional, 2-3 max" if tone != "corporate" else "NO hashtags"
-        },
-        "instagram": {
-            "max_length": 400 if tone != "corporate" else 100,
-            "style": "visual and engaging with emojis" if tone != "corporate" else "minimal caption, let image speak",
-            "hashtags": "5-10 relevant hashtags" if tone != "corporate" else "1-2 minimal hashtags max"
-        },
-        "twitter": {
-            "max_length": 260 if tone != "corporate" else 100,
-            "style": "concise and punchy" if tone != "corporate" else "extremely brief and impactful",
-            "hashtags": "1-3 hashtags" if tone != "corporate" else "NO hashtags"
-        },
-        "reddit": {
-            "max_length": 300 if tone != "corporate" else 150,
-            "style": "authentic and community-focused, no spam" if tone != "corporate" else "simple, direct, no fluff",
-            "hashtags": "avoid hashtags, focus on genuine content"
-        }
-    }
-    
-    results = {}
-    
-    # STEP 1: Generate content FIRST for all platforms
-    # Enhanced tone descriptions for content
-    tone_instructions = {
-        "casual": "Be conversational, friendly, and approachable like talking to a friend",
-        "professional": "Be formal, polished, and business-appropriate with expertise",
-        "corporate": "Be EXTREMELY brief and minimal. Use only 1-2 short sentences MAX. Clean, simple language. Think Apple or Tesla - minimal text, maximum impact. NO hashtags. NO emojis unless absolutely essential. Pure corporate minimalism.",
-        "funny": "Be hilarious, witty, and entertaining with humor that makes people laugh out loud",
-        "inspirational": "Be deeply motivational, uplifting, and empowering with powerful impact",
-        "educational": "Be informative, clear, and teaching-focused with valuable insights",
-        "storytelling": "Be narrative-driven, engaging, and emotionally compelling like a great story",
-        "promotional": "Be persuasive, sales-focused, and action-oriented with strong call-to-action"
-    }
+    combined_prompt = templates.image_prompt_style(tone, image_style)
     
-    tone_instruction = tone_instructions.get(tone, "Be engaging and authentic")
+    # An enhanced image prompt doesn't depend on the captions, so start the image
+    # now and let it overlap caption generation instead of waiting for it
+    image_task = None
+    if generate_image and enhanced_prompts and enhanced_prompts.get("enhanced"):
+        image_task = asyncio.create_task(_generate_image_with_fallback(
+            image_provider,
+            combined_prompt,
+            topic,
+            enhanced_image_prompt=enhanced_prompts["image_prompt"]
+        ))
     
-    for platform, info in platforms_info.items():
-        prompt = f"""Create a {tone} social media post about: {content_topic}
-
-Platform: {platform.upper()}
-Style: {info['style']}
-Max length: {info['max_length']} characters
-Hashtags: {info['hashtags']}
-
-TONE INSTRUCTION: {tone_instruction}
-
-Requirements:
-- Make it HIGHLY engaging and scroll-stopping
-- Optimize for {platform}'s specific audience
-- Include appropriate emojis that enhance the message
-- Return ONLY the post text, nothing else
-
-Post:"""
-
-        try:
-            response = client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": f"You are a professional social media content creator specializing in {platform}. Create engaging, authentic posts optimized for {platform}'s unique audience and format."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.8,
-                max_tokens=300
-            )
-            
-            generated_text = response.choices[0].message.content.strip()
-            
-            results[platform] = {
-                "content": generated_text,
-                "success": True,
-                "character_count": len(generated_text)
-            }
-            
-        except Exception as e:
-            results[platform] = {
-                "content": "",
-                "success": False,
-                "error": str(e)
-            }
+    # STEP 1: Generate content for all platforms
+    try:
+        results = await _generate_captions(content_topic, tone, generation_mode, templates, on_event=on_event)
+    except BaseException:
+        if image_task:
+            image_task.cancel()
+        raise
     
     # STEP 2: Generate image BASED ON the actual generated content
     # This ensures the image matches what the content is actually talking about
+    # (unless it was already started from the enhanced prompt above)
     image_data = None
-    if generate_image:
+    if image_task:
+        image_data = await image_task
+    elif generate_image:
         # Extract key themes from generated content to create a better image prompt
         content_summary = ""
         if results.get("facebook", {}).get("success"):
             # Use Facebook content as base since it's usually the most detailed
             content_summary = results["facebook"]["content"][:300]
         
-        # Enhanced tone descriptions for image
-        tone_styles = {
-            "casual": "friendly and approachable, warm and inviting atmosphere",
-            "professional": "sleek, corporate, and polished with sophisticated elegance",
-            "corporate": "ultra-clean, minimalist corporate aesthetic, extreme simplicity with maximum impact",
-            "funny": "hilarious, playful, vibrant and whimsical with comedic flair",
-            "inspirational": "motivational, uplifting, dramatic and empowering with cinematic quality",
-            "educational": "clear, informative, well-structured with visual learning elements",
-            "storytelling": "narrative-driven, emotional, engaging with story-like composition",
-            "promotional": "eye-catching, sales-focused, bold and attention-grabbing"
-        }
-        
-        # Image style mappings for DALL-E
-        style_prompts = {
-            "realistic": "professional photography style, high quality, well-lit, sharp focus, beautiful composition, commercial photography aesthetic",
-            "minimal": "ultra-minimalist design, clean white space, single focal point, Apple-style simplicity, corporate clean aesthetic, NO text overlays, pure visual impact, negative space emphasis",
-            "anime": "Japanese anime art style, vibrant colors, cel-shaded illustration, manga-inspired",
-            "2d": "flat 2D vector illustration, modern graphic design, clean shapes",
-            "comics": "comic book art style, bold outlines, dynamic panels, graphic novel aesthetic",
-            "sketch": "hand-drawn pencil sketch, artistic linework, sketchy texture",
-            "vintage": "retro vintage style, nostalgic feel, classic poster design, aged aesthetic",
-            "disney": "Disney Pixar animation style, 3D cartoon, whimsical character design"
-        }
-        
-        tone_desc = tone_styles.get(tone, "clean and modern")
-        style_desc = style_prompts.get(image_style, "photorealistic")
-        combined_prompt = f"{style_desc}, {tone_desc}"
-        
         # Create a coordinated image prompt that matches the content
         # If we have enhanced prompts, use them; otherwise use the topic + content summary
         coordinated_image_prompt = None
@@ -533,68 +1078,74 @@ Post:"""
             # Create an image prompt that matches the actual content
             coordinated_image_prompt = f"Visual representation of: {topic}. Related to this content: {content_summary[:200]}"
         
-        # Generate image that matches the content
-        # Choose provider based on user selection with fallback
-        image_data = None
-        primary_provider = image_provider
-        fallback_provider = "dalle" if image_provider == "nano-banana" else "nano-banana"
-        
-        try:
-            if image_provider == "nano-banana":
-                print("🍌 Using Nano Banana (Fal.ai) for ultra-fast image generation...")
-                image_data = await generate_image_with_fal(
-                    combined_prompt, 
-                    topic,
-                    enhanced_image_prompt=coordinated_image_prompt,
-                    content_context=content_summary
-                )
-            else:
-                print("🎨 Using DALL-E 3 for image generation...")
-                image_data = await generate_image_with_dalle(
-                    combined_prompt, 
-                    topic,
-                    enhanced_image_prompt=coordinated_image_prompt,
-                    content_context=content_summary
-                )
-        except Exception as primary_error:
-            # Fallback to alternative provider
-            print(f"⚠️ {primary_provider} failed: {primary_error}. Trying fallback provider...")
-            
-            try:
-                if fallback_provider == "nano-banana":
-                    print("🍌 Fallback: Using Nano Banana...")
-                    image_data = await generate_image_with_fal(
-                        combined_prompt, 
-                        topic,
-                        enhanced_image_prompt=coordinated_image_prompt,
-                        content_context=content_summary
-                    )
-                else:
-                    print("🎨 Fallback: Using DALL-E 3...")
-                    image_data = await generate_image_with_dalle(
-                        combined_prompt, 
-                        topic,
-                        enhanced_image_prompt=coordinated_image_prompt,
-                        content_context=content_summary
-                    )
-                print(f"✅ Successfully generated with fallback provider: {fallback_provider}")
-            except Exception as fallback_error:
-                print(f"❌ Both providers failed. Primary: {primary_error}, Fallback: {fallback_error}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Image generation failed with both providers. Primary ({primary_provider}): {str(primary_error)}, Fallback ({fallback_provider}): {str(fallback_error)}"
-                )
+        image_data = await _generate_image_with_fallback(
+            image_provider,
+            combined_prompt,
+            topic,
+            enhanced_image_prompt=coordinated_image_prompt,
+            content_context=content_summary
+        )
     
-    return {
+    if image_data:
+        await _emit(on_event, "image", image_data)
+    
+    result = {
         "success": True,
         "platforms": results,
         "image": image_data,
         "topic": topic,
         "tone": tone,
-        "enhanced_prompts": enhanced_prompts if use_prompt_enhancer else None
+        "generation_mode": generation_mode,
+        "enhanced_prompts": enhanced_prompts if use_prompt_enhancer else None,
+        "budget_level": policy["level"]
     }
+    
+    # Only cache complete results so a partial failure is retried next time
+    image_ok = not generate_image or bool(image_data and image_data.get("success"))
+    if image_ok and all(data["success"] for data in results.values()):
+        response_cache.set(cache_key, result)
+    
+    return result
 
 
+async def stream_platform_content(**kwargs):
+    """
+    Run generate_platform_content and yield its progress events as they happen
+    
+    Args:
+        **kwargs: Arguments for generate_platform_content
+        
+    Yields:
+        tuple: (event, data) pairs, ending with ("complete", result) or
+        ("error", {"detail": ...}). Closing the generator cancels the generation.
+    """
+    queue = asyncio.Queue()
+    
+    async def on_event(event: str, data: dict) -> None:
+        await queue.put((event, data))
+    
+    async def run() -> None:
+        try:
+            result = await generate_platform_content(**kwargs, on_event=on_event)
+            await queue.put(("complete", result))
+        except Exception as e:
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            await queue.put(("error", {"detail": detail}))
+    
+    task = asyncio.create_task(run())
+    try:
+        while True:
+            event, data = await queue.get()
+            yield event, data
+            if event in ("complete", "error"):
+                break
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+@metered("regenerate-image")
+@single_flight(inflight, "regenerate-image")
 async def regenerate_image(topic: str, tone: str = "casual", image_style: str = "realistic", image_provider: str = "dalle") -> dict:
     """
     Regenerate a new image for the same topic with selected provider
@@ -603,69 +1154,21 @@ async def regenerate_image(topic: str, tone: str = "casual", image_style: str =
         topic: Original topic
         tone: Tone for styling
         image_style: Visual style (realistic, anime, 2d, comics, sketch, vintage, disney, 3d)
-        image_provider: "dalle" or "nano-banana"
+        image_provider: "dalle", "nano-banana" or "hedged"
         
     Returns:
         dict: New image data
     """
-    # Enhanced tone descriptions
-    tone_styles = {
-        "casual": "friendly and approachable, warm and inviting atmosphere",
-        "professional": "sleek, corporate, and polished with sophisticated elegance",
-        "corporate": "ultra-clean, minimalist corporate aesthetic, extreme simplicity with maximum impact",
-        "funny": "hilarious, playful, vibrant and whimsical with comedic flair",
-        "inspirational": "motivational, uplifting, dramatic and empowering with cinematic quality",
-        "educational": "clear, informative, well-structured with visual learning elements",
-        "storytelling": "narrative-driven, emotional, engaging with story-like composition",
-        "promotional": "eye-catching, sales-focused, bold and attention-grabbing"
-    }
-    
-    # Image style mappings for DALL-E
-    style_prompts = {
-        "realistic": "professional photography style, high quality, well-lit, sharp focus, beautiful composition, commercial photography aesthetic",
-        "minimal": "ultra-minimalist design, clean white space, single focal point, Apple-style simplicity, corporate clean aesthetic, NO text overlays, pure visual impact, negative space emphasis",
-        "anime": "Japanese anime art style, vibrant colors, cel-shaded illustration, manga-inspired",
-        "2d": "flat 2D vector illustration, modern graphic design, clean shapes",
-        "comics": "comic book art style, bold outlines, dynamic panels, graphic novel aesthetic",
-        "sketch": "hand-drawn pencil sketch, artistic linework, sketchy texture",
-        "vintage": "retro vintage style, nostalgic feel, classic poster design, aged aesthetic",
-        "disney": "Disney Pixar animation style, 3D cartoon, whimsical character design"
-    }
-    
-    tone_desc = tone_styles.get(tone, "clean and modern")
-    style_desc = style_prompts.get(image_style, "photorealistic")
-    combined_prompt = f"{style_desc}, {tone_desc}"
-    
-    # Choose provider based on user selection with fallback
-    primary_provider = image_provider
-    fallback_provider = "dalle" if image_provider == "nano-banana" else "nano-banana"
+    combined_prompt = prompt_templates.get().image_prompt_style(tone, image_style)
     
-    try:
-        if image_provider == "nano-banana":
-            print(f"🍌 Regenerating image with Nano Banana...")
-            return await generate_image_with_fal(combined_prompt, topic)
-        else:
-            print(f"🎨 Regenerating image with DALL-E 3...")
-            return await generate_image_with_dalle(combined_prompt, topic)
-    except Exception as primary_error:
-        # Fallback to alternative provider
-        print(f"⚠️ {primary_provider} failed during regeneration. Trying {fallback_provider}...")
-        
-        try:
-            if fallback_provider == "nano-banana":
-                print(f"🍌 Fallback: Regenerating with Nano Banana...")
-                return await generate_image_with_fal(combined_prompt, topic)
-            else:
-                print(f"🎨 Fallback: Regenerating with DALL-E 3...")
-                return await generate_image_with_dalle(combined_prompt, topic)
-        except Exception as fallback_error:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Image regeneration failed with both providers. Primary ({primary_provider}): {str(primary_error)}, Fallback ({fallback_provider}): {str(fallback_error)}"
-            )
+    # Choose provider based on user selection with fallback (or race them in hedged mode)
+    print(f"🔄 Regenerating image with {image_provider}...")
+    return await _generate_image_with_fallback(image_provider, combined_prompt, topic)
 
 
-async def regenerate_platform_content(topic: str, platform: str, tone: str = "casual", previous_content: str = "") -> dict:
+@metered("regenerate")
+@single_flight(inflight, "regenerate")
+async def regenerate_platform_content(topic: str, platform: str, tone: str = "casual", previous_content: str = "", bypass_cache: bool = False) -> dict:
     """
     Regenerate content for a single platform
     
@@ -674,6 +1177,7 @@ async def regenerate_platform_content(topic: str, platform: str, tone: str = "ca
         platform: Specific platform to regenerate
         tone: Writing tone
         previous_content: Previous content to avoid duplication
+        bypass_cache: Skip the response cache and always generate a fresh version
         
     Returns:
         dict: New generated content for the platform
@@ -684,13 +1188,21 @@ async def regenerate_platform_content(topic: str, platform: str, tone: str = "ca
             detail="OpenAI API key not configured"
         )
     
-    platforms_info = {
-        "facebook": {"max_length": 500, "style": "conversational and friendly", "hashtags": "2-3 max"},
-        "instagram": {"max_length": 400, "style": "visual with emojis", "hashtags": "5-10 hashtags"},
-        "twitter": {"max_length": 260, "style": "concise and punchy", "hashtags": "1-3 hashtags"},
-        "reddit": {"max_length": 300, "style": "authentic, no spam", "hashtags": "avoid hashtags"}
-    }
+    templates = prompt_templates.get()
+    cache_key = make_cache_key(
+        "regenerate",
+        model=_text_model(),
+        templates=templates.version,
+        topic=topic,
+        platform=platform,
+        tone=tone,
+        previous_content=previous_content
+    )
+    cached = response_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
     
+    platforms_info = templates.platforms(tone)
     info = platforms_info.get(platform, platforms_info["facebook"])
     
     prompt = f"""Create a {tone} social media post about: {topic}
@@ -706,8 +1218,8 @@ IMPORTANT: Create a DIFFERENT version from this previous attempt:
 Make it engaging and authentic. Return ONLY the post text:"""
 
     try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        response = await _create_chat_completion(
+            model=_text_model(),
             messages=[
                 {
                     "role": "system",
@@ -719,17 +1231,19 @@ Make it engaging and authentic. Return ONLY the post text:"""
                 }
             ],
             temperature=0.9,  # Higher for more variety
-            max_tokens=300
+            max_tokens=settings.AI_CAPTION_MAX_TOKENS
         )
         
         generated_text = response.choices[0].message.content.strip()
         
-        return {
+        result = {
             "success": True,
             "content": generated_text,
             "character_count": len(generated_text),
             "platform": platform
         }
+        response_cache.set(cache_key, result)
+        return result
         
     except Exception as e:
         raise HTTPException(
@@ -738,7 +1252,9 @@ Make it engaging and authentic. Return ONLY the post text:"""
         )
 
 
-async def refine_content(original_content: str, platform: str, instructions: str) -> dict:
+@metered("refine")
+@single_flight(inflight, "refine")
+async def refine_content(original_content: str, platform: str, instructions: str, bypass_cache: bool = False) -> dict:
     """
     Refine existing content based on user instructions
     
@@ -746,6 +1262,7 @@ async def refine_content(original_content: str, platform: str, instructions: str
         original_content: The current content
         platform: Target platform
         instructions: What to change
+        bypass_cache: Skip the response cache and always call OpenAI
         
     Returns:
         dict: Refined content
@@ -756,6 +1273,17 @@ async def refine_content(original_content: str, platform: str, instructions: str
             detail="OpenAI API key not configured"
         )
     
+    cache_key = make_cache_key(
+        "refine",
+        model=_text_model(),
+        original_content=original_content,
+        platform=platform,
+        instructions=instructions
+    )
+    cached = response_cache.get(cache_key, bypass=bypass_cache)
+    if cached is not None:
+        return cached
+    
     prompt = f"""Original post for {platform}:
 {original_content}
 
@@ -765,8 +1293,8 @@ Rewrite the post incorporating the user's feedback. Keep it optimized for {platf
 Return only the revised post text:"""
 
     try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
+        response = await _create_chat_completion(
+            model=_text_model(),
             messages=[
                 {
                     "role": "system",
@@ -778,13 +1306,15 @@ Return only the revised post text:"""
                 }
             ],
             temperature=0.7,
-            max_tokens=300
+            max_tokens=settings.AI_CAPTION_MAX_TOKENS
         )
         
-        return {
+        result = {
             "success": True,
             "content": response.choices[0].message.content.strip()
         }
+        response_cache.set(cache_key, result)
+        return result
         
     except Exception as e:
         raise HTTPException(
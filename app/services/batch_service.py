@@ -0,0 +1,288 @@
+"""
+Batch content generation for campaign calendars
+Runs many generate_platform_content calls as a persisted background job
+"""
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+from apscheduler.triggers.date import DateTrigger
+from app.config import settings
+from app.services.ai.rate_limit import ProviderRateLimiter, current_rate_limiter
+from app.services.ai_service import generate_platform_content
+from app.scheduler.scheduler import scheduler, execute_scheduled_post
+from app.scheduler.storage import load_scheduled_posts, save_scheduled_posts
+from app.services.media_store import acquire_path
+from app.services.job_leases import claim_lock, current_owner, is_orphaned
+
+# Generations in flight across every batch job in this process
+_batch_slots = asyncio.Semaphore(max(1, settings.BATCH_WORKERS))
+
+# Provider calls per minute across batch items (each OpenAI or image call takes a token)
+rate_limiter = ProviderRateLimiter({
+    "openai": settings.BATCH_OPENAI_PER_MINUTE,
+    "dalle": settings.BATCH_DALLE_PER_MINUTE,
+    "nano-banana": settings.BATCH_FAL_PER_MINUTE
+})
+
+# Jobs being worked on by this process (keeps tasks referenced until they finish)
+_running_jobs = {}
+
+
+def _job_path(job_id: str):
+    return settings.BATCH_JOBS_DIR / f"{job_id}.json"
+
+
+def _save_job(job: dict, changed: bool = True) -> None:
+    """Write a job file atomically so a crash never leaves half a job on disk; heartbeats pass changed=False"""
+    settings.BATCH_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    job["heartbeat_at"] = time.time()
+    if changed:
+        job["updated_at"] = datetime.now().isoformat()
+    path = _job_path(job["id"])
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(job, f, indent=2)
+    tmp_path.replace(path)
+
+
+def get_batch_job(job_id: str) -> Optional[dict]:
+    """
+    Load a batch job
+
+    Args:
+        job_id: Job ID returned by create_batch_job
+
+    Returns:
+        dict: The job with its items, or None if it doesn't exist
+    """
+    path = _job_path(job_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️  Error loading batch job {job_id}: {e}")
+        return None
+
+
+def list_batch_jobs() -> list:
+    """
+    List batch jobs, newest first, without their generated content
+
+    Returns:
+        list: Job summaries
+    """
+    if not settings.BATCH_JOBS_DIR.exists():
+        return []
+
+    jobs = []
+    for path in settings.BATCH_JOBS_DIR.glob("*.json"):
+        job = get_batch_job(path.stem)
+        if job:
+            jobs.append({key: value for key, value in job.items() if key != "items"})
+
+    return sorted(jobs, key=lambda job: job["created_at"], reverse=True)
+
+
+def _local_time(value: datetime) -> datetime:
+    """Naive local time, as the scheduler store and restore_scheduled_jobs compare with datetime.now()"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def create_batch_job(requests: list, schedule: dict = None) -> dict:
+    """
+    Create and persist a batch job (call start_batch_job to run it)
+
+    Args:
+        requests: generate_platform_content arguments for each item
+        schedule: Optional {"start": datetime, "interval_minutes": int, "platforms": dict}
+            to schedule each item's output, one interval apart (an aware start
+            is converted to local time)
+
+    Returns:
+        dict: The new job
+    """
+    start = _local_time(schedule["start"]) if schedule else None
+    items = []
+    for index, request in enumerate(requests):
+        item = {
+            "index": index,
+            "request": request,
+            "status": "pending",
+            "result": None,
+            "error": None
+        }
+        if schedule:
+            item["scheduled_time"] = (start + timedelta(minutes=schedule["interval_minutes"] * index)).isoformat()
+            item["scheduled_post_id"] = None
+        items.append(item)
+
+    job = {
+        "id": str(uuid.uuid4()),
+        "status": "queued",
+        "total": len(items),
+        "completed": 0,
+        "failed": 0,
+        "schedule_platforms": schedule["platforms"] if schedule else None,
+        "owner": current_owner(),
+        "created_at": datetime.now().isoformat(),
+        "items": items
+    }
+    _save_job(job)
+
+    print(f"📦 Batch job {job['id']} created with {len(items)} items")
+    return job
+
+
+def _schedule_output(item: dict, platforms: dict) -> str:
+    """Add a generated item to the scheduler store and APScheduler"""
+    result = item["result"]
+    image = result.get("image") or {}
+    if not image.get("success") or not image.get("local_path"):
+        raise ValueError("No generated image to schedule")
+
+    captions = result["platforms"]
+    caption_source = captions.get("facebook", {}) if captions.get("facebook", {}).get("success") else \
+        next((data for data in captions.values() if data.get("success")), None)
+    if not caption_source:
+        raise ValueError("No generated caption to schedule")
+
+    post_id = str(uuid.uuid4())
+    scheduled_time = _local_time(datetime.fromisoformat(item["scheduled_time"]))
+    caption = caption_source["content"]
+    image_path = image["local_path"]
+
+    # The post holds its own reference, like uploads scheduled from /api/post
+    acquire_path(image_path, f"scheduled:{post_id}")
+
+    posts = load_scheduled_posts()
+    posts.append({
+        "id": post_id,
+        "caption": caption,
+        "image_path": image_path,
+        "platforms": platforms,
+        "scheduled_time": scheduled_time.isoformat(),
+        "created_at": datetime.now().isoformat(),
+        "status": "scheduled"
+    })
+    save_scheduled_posts(posts)
+
+    scheduler.add_job(
+        func=execute_scheduled_post,
+        trigger=DateTrigger(run_date=scheduled_time),
+        args=[post_id, image_path, caption, platforms],
+        id=post_id,
+        replace_existing=True
+    )
+
+    return post_id
+
+
+async def _run_item(job: dict, item: dict) -> None:
+    """Generate (and optionally schedule) one batch item"""
+    request = item["request"]
+
+    # One item makes several provider calls (enhance, captions, image and any
+    # fallbacks); each draws its own token as it is made
+    current_rate_limiter.set(rate_limiter)
+
+    async with _batch_slots:
+        item["status"] = "running"
+        _save_job(job)
+
+        try:
+            item["result"] = await generate_platform_content(**request)
+            if job.get("schedule_platforms"):
+                item["scheduled_post_id"] = _schedule_output(item, job["schedule_platforms"])
+            item["status"] = "completed"
+            item["error"] = None
+            job["completed"] += 1
+        except Exception as e:
+            item["status"] = "failed"
+            item["error"] = getattr(e, "detail", None) or str(e)
+            job["failed"] += 1
+            print(f"❌ Batch job {job['id']} item {item['index']} failed: {item['error']}")
+
+        _save_job(job)
+
+
+async def _beat(job: dict) -> None:
+    """Refresh a running job's lease until cancelled"""
+    while True:
+        await asyncio.sleep(settings.BATCH_JOB_HEARTBEAT_SECONDS)
+        _save_job(job, changed=False)
+
+
+async def run_batch_job(job_id: str) -> dict:
+    """
+    Run every unfinished item of a batch job
+
+    Items from all jobs share BATCH_WORKERS slots and the per-provider rate limits.
+
+    Args:
+        job_id: Job to run
+
+    Returns:
+        dict: The finished job
+    """
+    job = get_batch_job(job_id)
+    if not job:
+        raise ValueError(f"Batch job not found: {job_id}")
+
+    job["status"] = "running"
+    job["owner"] = current_owner()
+    _save_job(job)
+
+    heartbeat = asyncio.create_task(_beat(job))
+    try:
+        pending = [item for item in job["items"] if item["status"] not in ("completed", "failed")]
+        await asyncio.gather(*(_run_item(job, item) for item in pending))
+    finally:
+        heartbeat.cancel()
+
+    job["status"] = "failed" if job["failed"] == job["total"] else "completed"
+    _save_job(job)
+
+    print(f"✅ Batch job {job_id} finished: {job['completed']} completed, {job['failed']} failed")
+    return job
+
+
+def start_batch_job(job_id: str) -> None:
+    """Run a batch job in the background on the current event loop"""
+    task = asyncio.create_task(run_batch_job(job_id))
+    _running_jobs[job_id] = task
+    task.add_done_callback(lambda _: _running_jobs.pop(job_id, None))
+
+
+def _is_orphaned(job: dict) -> bool:
+    return is_orphaned(job, job["id"] in _running_jobs, settings.BATCH_JOB_LEASE_SECONDS)
+
+
+def resume_batch_jobs() -> None:
+    """
+    Restart unfinished jobs whose owner is gone
+
+    Like publish jobs, batch jobs record the process running them and refresh
+    heartbeat_at every BATCH_JOB_HEARTBEAT_SECONDS. A job is taken over only if
+    its owner has exited or its lease (BATCH_JOB_LEASE_SECONDS) has expired,
+    and claims are serialized, so with several API workers each job is resumed
+    by exactly one of them.
+    """
+    for summary in list_batch_jobs():
+        if summary["status"] not in ("queued", "running") or not _is_orphaned(summary):
+            continue
+        with claim_lock(settings.BATCH_JOBS_DIR):
+            # Another worker may have claimed it since the listing
+            job = get_batch_job(summary["id"])
+            if not job or not _is_orphaned(job):
+                continue
+            job["owner"] = current_owner()
+            _save_job(job)
+        print(f"🔄 Resuming batch job {job['id']}")
+        start_batch_job(job["id"])
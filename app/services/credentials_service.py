@@ -5,6 +5,8 @@ import json
 import os
 from typing import Dict, Optional
 from pathlib import Path
+from app.services.identity_cache import invalidate_identities
+from app.clients.pool import client_pool
 
 # Storage file path
 CREDENTIALS_FILE = "data/credentials/user_credentials.json"
@@ -36,6 +38,13 @@ def save_credentials(credentials: Dict) -> bool:
         print(f"Error saving credentials: {e}")
         return False
 
+def credentials_version() -> int:
+    """Modification time of the credentials file (0 if missing), so other processes' changes can be noticed without re-reading it"""
+    try:
+        return os.stat(get_credentials_file_path()).st_mtime_ns
+    except OSError:
+        return 0
+
 def get_platform_credentials(platform: str) -> Optional[Dict]:
     """Get credentials for a specific platform"""
     credentials = load_credentials()
@@ -44,15 +53,22 @@ def get_platform_credentials(platform: str) -> Optional[Dict]:
 def update_platform_credentials(platform: str, platform_credentials: Dict) -> bool:
     """Update credentials for a specific platform"""
     credentials = load_credentials()
+    if credentials.get(platform) != platform_credentials:
+        invalidate_identities(platform)
     credentials[platform] = platform_credentials
-    return save_credentials(credentials)
+    saved = save_credentials(credentials)
+    client_pool.invalidate(platform)
+    return saved
 
 def delete_platform_credentials(platform: str) -> bool:
     """Delete credentials for a specific platform"""
     credentials = load_credentials()
     if platform in credentials:
         del credentials[platform]
-        return save_credentials(credentials)
+        invalidate_identities(platform)
+        saved = save_credentials(credentials)
+        client_pool.invalidate(platform)
+        return saved
     return False
 
 def get_all_credentials() -> Dict:
@@ -2,15 +2,20 @@
 Facebook posting service
 """
 import os
+import mimetypes
 import httpx
 from fastapi import HTTPException
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.config import settings
+from app.clients.http import get_http_client
+from app.services.identity_cache import InvalidToken, get_identity
 
 
 async def get_facebook_page_id() -> str:
     """
     Get Facebook Page ID from stored credentials or access token
+    
+    The page is looked up once per token and cached (see identity_cache).
     """
     # Lazy import to avoid circular dependency
     from app.services.credentials_service import get_platform_credentials
@@ -22,19 +27,26 @@ async def get_facebook_page_id() -> str:
     if not access_token:
         raise HTTPException(status_code=401, detail="Facebook credentials not configured")
     
-    # Fetch page ID from Facebook API using the access token
-    async with httpx.AsyncClient() as client:
+    async def fetch_page():
+        # Fetch page ID from Facebook API using the access token
         try:
-            response = await client.get(
+            response = await get_http_client("graph").get(
                 f"{settings.FACEBOOK_GRAPH_URL}/me",
                 params={"access_token": access_token}
             )
             response.raise_for_status()
-            data = response.json()
-            return data["id"]
-        except httpx.HTTPError as e:
-            print(f"Error fetching page ID: {e}")
-            raise HTTPException(status_code=401, detail="Invalid Facebook token")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 401, 403):
+                raise InvalidToken(str(e))
+            raise
+        return {"page_id": response.json()["id"]}
+    
+    try:
+        identity = await get_identity("facebook", access_token, fetch_page)
+        return identity["page_id"]
+    except (InvalidToken, httpx.HTTPError) as e:
+        print(f"Error fetching page ID: {e}")
+        raise HTTPException(status_code=401, detail="Invalid Facebook token")
 
 
 @retry(
@@ -66,31 +78,32 @@ async def post_photo_to_facebook(image_path: str, caption: str) -> dict:
         
         page_id = await get_facebook_page_id()
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            with open(image_path, "rb") as image_file:
-                files = {
-                    "source": (os.path.basename(image_path), image_file, "image/jpeg")
-                }
-                data = {
-                    "message": caption,
-                    "access_token": access_token
-                }
-                
-                response = await client.post(
-                    f"{settings.FACEBOOK_GRAPH_URL}/{page_id}/photos",
-                    files=files,
-                    data=data
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Add post URL
-                post_id = result.get("id") or result.get("post_id")
-                if post_id:
-                    result["url"] = f"https://www.facebook.com/{page_id}/posts/{post_id}"
-                
-                return result
-                
+        client = get_http_client("graph")
+        with open(image_path, "rb") as image_file:
+            files = {
+                "source": (os.path.basename(image_path), image_file, mimetypes.guess_type(image_path)[0] or "image/jpeg")
+            }
+            data = {
+                "message": caption,
+                "access_token": access_token
+            }
+            
+            response = await client.post(
+                f"{settings.FACEBOOK_GRAPH_URL}/{page_id}/photos",
+                files=files,
+                data=data,
+                timeout=30.0
+            )
+            response.raise_for_status()
+            result = response.json()
+            
+            # Add post URL
+            post_id = result.get("id") or result.get("post_id")
+            if post_id:
+                result["url"] = f"https://www.facebook.com/{page_id}/posts/{post_id}"
+            
+            return result
+            
     except httpx.HTTPError as e:
         print(f"Error posting to Facebook: {e}")
         if hasattr(e, 'response') and e.response is not None:
@@ -0,0 +1,81 @@
+"""
+Platform identity cache
+Remembers which Facebook page / Instagram account an access token belongs to, so posting doesn't re-ask the Graph API
+"""
+import hashlib
+import json
+from typing import Awaitable, Callable, Dict
+from app.config import settings
+from app.services.ai.cache import MemoryCache
+
+# One cache per platform, so changing a platform's credentials drops only its entries
+_caches: Dict[str, MemoryCache] = {}
+
+
+class InvalidToken(Exception):
+    """The platform rejected the access token (cached for IDENTITY_CACHE_NEGATIVE_TTL)"""
+
+
+def token_fingerprint(access_token: str, *scope: str) -> str:
+    """Key for a token (plus e.g. the account id it is used with) that never stores the token itself"""
+    return hashlib.sha256("\x00".join((access_token or "", *scope)).encode("utf-8")).hexdigest()
+
+
+def _cache(platform: str) -> MemoryCache:
+    cache = _caches.get(platform)
+    if cache is None:
+        cache = _caches.setdefault(platform, MemoryCache(max_entries=settings.IDENTITY_CACHE_MAX_ENTRIES))
+    return cache
+
+
+async def get_identity(
+    platform: str,
+    access_token: str,
+    fetch: Callable[[], Awaitable[dict]],
+    *scope: str
+) -> dict:
+    """
+    Get a token's identity (page id, account id, username...), fetching it on a miss
+
+    Identities are kept for IDENTITY_CACHE_TTL. Tokens the platform rejected
+    are remembered for IDENTITY_CACHE_NEGATIVE_TTL, so retries don't repeat
+    the failing call; other errors (network, 5xx) are not cached.
+
+    Args:
+        platform: "facebook" or "instagram"
+        access_token: Token the identity belongs to
+        fetch: Coroutine function that fetches the identity, raising InvalidToken if the token is rejected
+        *scope: Other values the identity depends on (e.g. the Instagram account id)
+
+    Returns:
+        dict: The identity returned by fetch
+
+    Raises:
+        InvalidToken: If the token was rejected (now or within the negative TTL)
+    """
+    cache = _cache(platform)
+    key = token_fingerprint(access_token, *scope)
+    cached = cache.get(key)
+    if cached is not None:
+        entry = json.loads(cached)
+        if "error" in entry:
+            raise InvalidToken(entry["error"])
+        return entry["identity"]
+
+    try:
+        identity = await fetch()
+    except InvalidToken as e:
+        if settings.IDENTITY_CACHE_NEGATIVE_TTL > 0:
+            cache.set(key, json.dumps({"error": str(e)}), settings.IDENTITY_CACHE_NEGATIVE_TTL)
+        raise
+
+    if settings.IDENTITY_CACHE_TTL > 0:
+        cache.set(key, json.dumps({"identity": identity}), settings.IDENTITY_CACHE_TTL)
+    return identity
+
+
+def invalidate_identities(platform: str = None) -> None:
+    """Forget cached identities for one platform (or all of them)"""
+    for name, cache in list(_caches.items()):
+        if platform is None or name == platform:
+            cache.clear()
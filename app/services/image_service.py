@@ -0,0 +1,142 @@
+"""
+Image preparation service
+Produces platform-optimal derivatives (format, size, quality, no metadata) before a post fans out
+"""
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from app.config import settings
+from app.utils.images import file_sha256, render_derivative
+
+# Per-platform output. max_side bounds the long edge; aspect is the allowed
+# width/height range (images outside it are center-cropped to fit).
+PLATFORM_IMAGE_SPECS = {
+    "facebook": {"format": "JPEG", "max_side": 2048, "quality": 85},
+    "instagram": {"format": "JPEG", "max_side": 1080, "quality": 85, "aspect": (0.8, 1.91)},
+    "twitter": {"format": "JPEG", "max_side": 2048, "quality": 85},
+    "reddit": {"format": "JPEG", "max_side": 2048, "quality": 85}
+}
+
+_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+# Derivatives being rendered, shared by every post (and event loop) that needs them
+_pending: Dict[Path, Future] = {}
+_pending_lock = threading.Lock()
+
+
+def spec_id(spec: dict) -> str:
+    """Short stable id of a spec, part of every derivative's file name"""
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()[:10]
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """
+    Get the shared worker pool
+    
+    Workers are spawned rather than forked (no inherited threads or sockets)
+    and only import app.utils.images, so they start quickly.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.IMAGE_WORKERS),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _pool
+
+
+def _submit(source: str, destination: Path, spec: dict) -> Future:
+    global _pool
+    try:
+        return _get_pool().submit(render_derivative, source, str(destination), spec)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool once
+        print("⚠️  Image worker pool broke, restarting it")
+        with _pool_lock:
+            _pool = None
+        return _get_pool().submit(render_derivative, source, str(destination), spec)
+
+
+def _derivative_future(source: str, destination: Path, spec: dict) -> Future:
+    with _pending_lock:
+        future = _pending.get(destination)
+        if future is None:
+            future = _submit(source, destination, spec)
+            _pending[destination] = future
+            future.add_done_callback(lambda _: _forget(destination, future))
+        return future
+
+
+def _forget(destination: Path, future: Future) -> None:
+    with _pending_lock:
+        if _pending.get(destination) is future:
+            del _pending[destination]
+
+
+async def prepare_platform_images(image_path: str, platforms: Iterable[str]) -> Dict[str, str]:
+    """
+    Produce each platform's derivative of an image, once per post, before fan-out
+
+    Derivatives are cached on disk by source content hash and spec, so the
+    same image is only ever converted once per spec, and platforms with
+    identical specs share one file.
+
+    Args:
+        image_path: Original image (generated or uploaded)
+        platforms: Platforms the post goes to
+
+    Returns:
+        dict: platform -> path to upload. Platforms without a spec, or whose
+        conversion failed, get the original path.
+    """
+    platforms = list(platforms)
+    paths = {platform: image_path for platform in platforms}
+    specs = {platform: PLATFORM_IMAGE_SPECS[platform] for platform in platforms if platform in PLATFORM_IMAGE_SPECS}
+    if not specs or not image_path or not settings.IMAGE_DERIVATIVES_ENABLED:
+        return paths
+
+    loop = asyncio.get_running_loop()
+    try:
+        digest = await loop.run_in_executor(None, file_sha256, image_path)
+    except OSError as e:
+        print(f"⚠️  Can't read {image_path} for derivatives: {e}")
+        return paths
+
+    settings.IMAGE_DERIVATIVES_DIR.mkdir(parents=True, exist_ok=True)
+    jobs = {}
+    for platform, spec in specs.items():
+        destination = settings.IMAGE_DERIVATIVES_DIR / f"{digest}-{spec_id(spec)}{_EXTENSIONS[spec['format']]}"
+        if destination.exists():
+            paths[platform] = str(destination)
+        else:
+            jobs[platform] = _derivative_future(image_path, destination, spec)
+
+    if jobs:
+        # Shielded: a cancelled post must not cancel a render another post is waiting on
+        results = await asyncio.gather(*(asyncio.shield(asyncio.wrap_future(future)) for future in jobs.values()), return_exceptions=True)
+        for platform, result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                print(f"⚠️  {platform} derivative failed, uploading the original: {result}")
+            else:
+                paths[platform] = result
+
+    return paths
+
+
+def shutdown_image_pool() -> None:
+    """Stop the worker processes (call on shutdown)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,18 +1,22 @@
 """
 Instagram posting service
 """
-import httpx
 import asyncio
-import cloudinary.uploader
+import httpx
 from fastapi import HTTPException
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.config import settings
+from app.clients.http import get_http_client
+from app.clients.cloudinary import upload_image
+from app.services.identity_cache import InvalidToken, get_identity
 
 
 async def get_instagram_account_info() -> tuple:
     """
     Get Instagram account information
     
+    The username is looked up once per token and account and cached (see identity_cache).
+    
     Returns:
         tuple: (instagram_account_id, username)
     """
@@ -27,9 +31,9 @@ async def get_instagram_account_info() -> tuple:
     if not account_id:
         raise HTTPException(status_code=500, detail="Instagram Account ID not configured")
     
-    async with httpx.AsyncClient() as client:
+    async def fetch_account():
         try:
-            response = await client.get(
+            response = await get_http_client("graph").get(
                 f"{settings.INSTAGRAM_GRAPH_URL}/{account_id}",
                 params={
                     "fields": "username",
@@ -37,11 +41,18 @@ async def get_instagram_account_info() -> tuple:
                 }
             )
             response.raise_for_status()
-            data = response.json()
-            return account_id, data.get("username", "Instagram")
-        except Exception as e:
-            print(f"Error fetching Instagram info: {e}")
-            return account_id, "Instagram"
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (400, 401, 403):
+                raise InvalidToken(str(e))
+            raise
+        return {"account_id": account_id, "username": response.json().get("username", "Instagram")}
+    
+    try:
+        identity = await get_identity("instagram", access_token, fetch_account, account_id)
+        return account_id, identity["username"]
+    except Exception as e:
+        print(f"Error fetching Instagram info: {e}")
+        return account_id, "Instagram"
 
 
 @retry(
@@ -74,81 +85,73 @@ async def post_photo_to_instagram(image_path: str, caption: str) -> dict:
         if not access_token:
             raise Exception("Instagram Access Token not configured")
 
-        # Upload to Cloudinary to get a permanent HTTPS URL
-        if not all([settings.CLOUDINARY_CLOUD_NAME, settings.CLOUDINARY_API_KEY, settings.CLOUDINARY_API_SECRET]):
-            raise Exception("Cloudinary is not configured. Please set CLOUDINARY_* env vars.")
+        # Upload to Cloudinary to get a permanent HTTPS URL (the SDK blocks, so off the loop)
+        public_image_url = await asyncio.get_running_loop().run_in_executor(None, upload_image, image_path)
 
-        upload_result = cloudinary.uploader.upload(
-            image_path,
-            folder=settings.CLOUDINARY_FOLDER,
-            overwrite=True,
-            resource_type="image"
+        client = get_http_client("graph")
+        # Create media container with image_url
+        container_response = await client.post(
+            f"{settings.INSTAGRAM_GRAPH_URL}/{ig_account_id}/media",
+            data={
+                "image_url": public_image_url,
+                "caption": caption,
+                "access_token": access_token
+            },
+            timeout=60.0
         )
-        public_image_url = upload_result.get("secure_url")
-        if not public_image_url:
-            raise Exception("Failed to obtain secure_url from Cloudinary upload")
 
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # Create media container with image_url
-            container_response = await client.post(
-                f"{settings.INSTAGRAM_GRAPH_URL}/{ig_account_id}/media",
-                data={
-                    "image_url": public_image_url,
-                    "caption": caption,
-                    "access_token": access_token
-                }
-            )
+        if container_response.status_code != 200:
+            error_data = container_response.json() if container_response.text else {}
+            print(f"Instagram container creation failed: {error_data}")
+            raise Exception(f"Failed to create media container: {error_data}")
 
-            if container_response.status_code != 200:
-                error_data = container_response.json() if container_response.text else {}
-                print(f"Instagram container creation failed: {error_data}")
-                raise Exception(f"Failed to create media container: {error_data}")
+        container_data = container_response.json()
+        container_id = container_data.get("id")
+        if not container_id:
+            raise Exception("No container ID returned from Instagram")
 
-            container_data = container_response.json()
-            container_id = container_data.get("id")
-            if not container_id:
-                raise Exception("No container ID returned from Instagram")
-
-            # Poll container status until FINISHED (or fail after timeout)
-            for _ in range(20):  # ~20 seconds max wait
-                status_resp = await client.get(
-                    f"{settings.INSTAGRAM_GRAPH_URL}/{container_id}",
-                    params={
-                        "fields": "status_code",
-                        "access_token": access_token
-                    }
-                )
-                status_resp.raise_for_status()
-                status = status_resp.json().get("status_code")
-                if status == "FINISHED":
-                    break
-                elif status in ("ERROR", "FAILED"):
-                    raise Exception(f"Instagram media processing failed: {status}")
-                await asyncio.sleep(1)
-
-            # Publish the container
-            publish_response = await client.post(
-                f"{settings.INSTAGRAM_GRAPH_URL}/{ig_account_id}/media_publish",
-                data={
-                    "creation_id": container_id,
+        # Poll container status until FINISHED (or fail after timeout)
+        for _ in range(20):  # ~20 seconds max wait
+            status_resp = await client.get(
+                f"{settings.INSTAGRAM_GRAPH_URL}/{container_id}",
+                params={
+                    "fields": "status_code",
                     "access_token": access_token
-                }
+                },
+                timeout=60.0
             )
+            status_resp.raise_for_status()
+            status = status_resp.json().get("status_code")
+            if status == "FINISHED":
+                break
+            elif status in ("ERROR", "FAILED"):
+                raise Exception(f"Instagram media processing failed: {status}")
+            await asyncio.sleep(1)
 
-            if publish_response.status_code != 200:
-                error_data = publish_response.json() if publish_response.text else {}
-                print(f"Instagram publish failed: {error_data}")
-                raise Exception(f"Failed to publish media: {error_data}")
+        # Publish the container
+        publish_response = await client.post(
+            f"{settings.INSTAGRAM_GRAPH_URL}/{ig_account_id}/media_publish",
+            data={
+                "creation_id": container_id,
+                "access_token": access_token
+            },
+            timeout=60.0
+        )
+
+        if publish_response.status_code != 200:
+            error_data = publish_response.json() if publish_response.text else {}
+            print(f"Instagram publish failed: {error_data}")
+            raise Exception(f"Failed to publish media: {error_data}")
 
-            result = publish_response.json()
-            
-            # Add media ID info (Instagram doesn't provide direct post URL easily)
-            media_id = result.get("id")
-            if media_id:
-                result["media_id"] = media_id
-                result["info"] = f"Media ID: {media_id}"
-            
-            return result
+        result = publish_response.json()
+        
+        # Add media ID info (Instagram doesn't provide direct post URL easily)
+        media_id = result.get("id")
+        if media_id:
+            result["media_id"] = media_id
+            result["info"] = f"Media ID: {media_id}"
+        
+        return result
 
     except Exception as e:
         error_msg = str(e)
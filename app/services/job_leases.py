@@ -0,0 +1,75 @@
+"""
+Job leases
+Lets processes sharing persisted jobs (API workers, the bot) tell a running job from one whose owner is gone
+"""
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+_claim_lock = threading.Lock()
+
+
+def current_owner() -> dict:
+    """Owner record for jobs this process runs"""
+    return {"pid": os.getpid(), "host": socket.gethostname()}
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def is_orphaned(job: dict, held: bool, lease_seconds: float) -> bool:
+    """
+    Whether no live process owns a job: its owner has exited, or its lease ran out
+
+    Args:
+        job: Persisted job with "owner" ({pid, host}) and "heartbeat_at"
+        held: Whether this process is running the job
+        lease_seconds: Seconds without a heartbeat after which the job is up for grabs
+    """
+    owner = job.get("owner")
+    if not owner:
+        return True
+    if owner.get("host") == socket.gethostname():
+        # Our own pid on a job we don't hold is a previous run (e.g. pid 1 in a restarted container)
+        if owner["pid"] == os.getpid():
+            return not held
+        # Signal 0 only probes the process on POSIX (on Windows os.kill terminates it)
+        if os.name != "nt" and not _pid_alive(owner["pid"]):
+            return True
+    return time.time() - job.get("heartbeat_at", 0) > lease_seconds
+
+
+@contextmanager
+def claim_lock(directory: Path):
+    """
+    Serialize claiming jobs in a directory across processes
+
+    Hold it while checking that a job is orphaned and recording the new owner,
+    so two workers starting together don't both take the same job.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    with _claim_lock, open(directory / ".claim.lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,245 @@
+"""
+Media garbage collector
+Mark-and-sweep over UPLOAD_DIR: keeps images that scheduled posts, chat sessions or recent work still use
+"""
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Set
+from apscheduler.triggers.interval import IntervalTrigger
+from app.config import settings
+from app.scheduler.storage import load_scheduled_posts
+from app.services.media_store import get_media_store
+from app.services.publish_jobs import FINISHED, list_publish_jobs
+
+# Deleted files listed in a report (the counts always cover everything)
+REPORT_LIMIT = 200
+
+_gc_lock = threading.Lock()
+
+
+def _resolve(path: str) -> str:
+    return str(Path(path).resolve())
+
+
+def _live_image_paths() -> Iterable[str]:
+    """Images something still points at: pending scheduled posts, unfinished publish jobs and open bot sessions"""
+    for post in load_scheduled_posts():
+        if post.get("status") != "posted" and post.get("image_path"):
+            yield post["image_path"]
+
+    for job in list_publish_jobs():
+        if job["status"] not in FINISHED and job.get("image_path"):
+            yield job["image_path"]
+
+    # Sessions are only visible when the bot runs in this process; the bot's
+    # own uploads are also protected by the retention window
+    bot = sys.modules.get("app.services.telegram_bot_service")
+    if bot is not None:
+        for session in list(bot.user_sessions.values()):
+            for key in ("image_path", "temp_image_path"):
+                if session.get(key):
+                    yield session[key]
+
+
+def _ref_owners() -> dict:
+    """What each kind of media reference points at, to tell held references from leaked ones"""
+    bot = sys.modules.get("app.services.telegram_bot_service")
+    sessions = None
+    application = getattr(getattr(bot, "telegram_bot", None), "application", None)
+    if application is not None and application.running:
+        # Only one process can poll the bot, so if it runs here its sessions are complete
+        sessions = {}
+        for user_id, session in list(bot.user_sessions.items()):
+            paths = sessions.setdefault(str(user_id), set())
+            for key in ("image_path", "temp_image_path"):
+                if session.get(key):
+                    paths.add(_resolve(session[key]))
+
+    return {
+        "scheduled": {post.get("id") for post in load_scheduled_posts() if post.get("status") != "posted"},
+        "jobs": {job["id"]: job["status"] for job in list_publish_jobs()},
+        "telegram": sessions
+    }
+
+
+def _is_stale(ref: str, path: str, owners: dict) -> bool:
+    """
+    Whether a reference's owner is provably gone
+
+    "generated" references only mark fresh AI images; a scheduled post that
+    was posted or removed, a finished (or missing) publish job and a bot
+    session that moved on no longer need theirs. Anything else, including
+    bot sessions in another process, is assumed to still be held.
+    """
+    kind, _, owner = ref.partition(":")
+    if kind == "generated":
+        return True
+    if kind == "scheduled":
+        return owner not in owners["scheduled"]
+    if kind == "post":
+        return owners["jobs"].get(owner, "completed") in FINISHED
+    if kind == "telegram":
+        return owners["telegram"] is not None and path not in owners["telegram"].get(owner, ())
+    return False
+
+
+def _walk(directory: Path):
+    """Yield (path, stat) for every regular file under directory"""
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in files:
+            if name.startswith("."):
+                continue
+            path = os.path.join(root, name)
+            try:
+                yield _resolve(path), os.stat(path)
+            except OSError:
+                continue
+
+
+def _mark(live_paths: Set[str]) -> list:
+    """Every file under UPLOAD_DIR, flagged live or not, with its last use time"""
+    store = get_media_store()
+    owners = _ref_owners()
+    live_shas = {Path(path).stem for path in live_paths}
+    derivatives_dir = _resolve(settings.IMAGE_DERIVATIVES_DIR)
+    entries = []
+    indexed = set()
+
+    for blob in store.blobs():
+        path = _resolve(blob["path"])
+        indexed.add(path)
+        if os.path.exists(path):
+            stale_refs = [ref for ref in blob["refs"] if _is_stale(ref, path, owners)]
+            live = len(stale_refs) < len(blob["refs"]) or blob["sha256"] in live_shas or path in live_paths
+            if live:
+                live_shas.add(blob["sha256"])
+            entries.append({
+                "path": path,
+                "sha256": blob["sha256"],
+                "size_bytes": blob["size_bytes"],
+                "last_used": blob["last_used"],
+                "stale_refs": stale_refs,
+                "live": live
+            })
+
+    for path, stat in _walk(settings.UPLOAD_DIR):
+        if path in indexed:
+            continue
+        live = path in live_paths
+        if os.path.dirname(path) == derivatives_dir:
+            # Derivatives are named <source sha256>-<spec id>
+            live = live or Path(path).name.split("-", 1)[0] in live_shas
+        entries.append({
+            "path": path,
+            "sha256": None,
+            "size_bytes": stat.st_size,
+            "last_used": stat.st_mtime,
+            "live": live
+        })
+
+    return entries
+
+
+def _delete(entry: dict) -> bool:
+    """Delete a swept file, unless it was used again since the mark phase"""
+    if entry["sha256"]:
+        return get_media_store().purge(entry["sha256"], entry["stale_refs"], unused_since=entry["last_used"])
+    try:
+        if os.stat(entry["path"]).st_mtime > entry["last_used"]:
+            return False
+        os.remove(entry["path"])
+        return True
+    except OSError:
+        return False
+
+
+def collect_garbage(dry_run: bool = False) -> dict:
+    """
+    Delete media nothing references any more
+
+    Unreferenced files older than MEDIA_GC_RETENTION_HOURS are swept. If
+    UPLOAD_DIR is still above MEDIA_GC_QUOTA_MB, more unreferenced files are
+    evicted, least recently used first, down to MEDIA_GC_LOW_WATERMARK of the
+    quota. Stored images are deleted only once every reference on them is
+    provably stale (see _is_stale), so images of pending scheduled posts,
+    unfinished publish jobs and bot sessions - including a bot running in
+    another process - are never deleted.
+
+    Args:
+        dry_run: Only report what would be deleted
+
+    Returns:
+        dict: Counts, bytes and the (first REPORT_LIMIT) files deleted
+    """
+    with _gc_lock:
+        started = time.time()
+        cutoff = started - settings.MEDIA_GC_RETENTION_HOURS * 3600
+        quota = int(settings.MEDIA_GC_QUOTA_MB * 1024 * 1024)
+
+        live_paths = {_resolve(path) for path in _live_image_paths()}
+        entries = _mark(live_paths)
+        total = sum(entry["size_bytes"] for entry in entries)
+
+        victims = [(entry, "expired") for entry in entries if not entry["live"] and entry["last_used"] < cutoff]
+        remaining = total - sum(entry["size_bytes"] for entry, _ in victims)
+        if quota and remaining > quota:
+            recent = sorted(
+                (entry for entry in entries if not entry["live"] and entry["last_used"] >= cutoff),
+                key=lambda entry: entry["last_used"]
+            )
+            for entry in recent:
+                if remaining <= quota * settings.MEDIA_GC_LOW_WATERMARK:
+                    break
+                victims.append((entry, "quota"))
+                remaining -= entry["size_bytes"]
+
+        deleted = []
+        freed = 0
+        for entry, reason in victims:
+            if not dry_run and not _delete(entry):
+                continue
+            freed += entry["size_bytes"]
+            deleted.append({"path": entry["path"], "size_bytes": entry["size_bytes"], "reason": reason})
+
+        return {
+            "dry_run": dry_run,
+            "scanned_files": len(entries),
+            "scanned_bytes": total,
+            "live_files": sum(1 for entry in entries if entry["live"]),
+            "deleted_count": len(deleted),
+            "freed_bytes": freed,
+            "remaining_bytes": total - freed,
+            "quota_bytes": quota or None,
+            "over_quota": bool(quota) and total - freed > quota,
+            "duration_ms": round((time.time() - started) * 1000, 1),
+            "deleted": deleted[:REPORT_LIMIT]
+        }
+
+
+def run_media_gc() -> None:
+    """Scheduled collection"""
+    try:
+        report = collect_garbage()
+        if report["deleted_count"]:
+            print(f"🧹 Media GC freed {report['freed_bytes'] / 1024 / 1024:.1f} MB ({report['deleted_count']} files)")
+        if report["over_quota"]:
+            print(f"⚠️  Uploads still over quota: {report['remaining_bytes'] / 1024 / 1024:.1f} MB in use")
+    except Exception as e:
+        print(f"❌ Media GC failed: {e}")
+
+
+def schedule_media_gc(scheduler) -> None:
+    """Run the collector every MEDIA_GC_INTERVAL_MINUTES on the given APScheduler scheduler"""
+    if not settings.MEDIA_GC_ENABLED or settings.MEDIA_GC_INTERVAL_MINUTES <= 0:
+        return
+    scheduler.add_job(
+        run_media_gc,
+        IntervalTrigger(minutes=settings.MEDIA_GC_INTERVAL_MINUTES),
+        id="media_gc",
+        replace_existing=True
+    )
+    print(f"✅ Media GC scheduled every {settings.MEDIA_GC_INTERVAL_MINUTES:g} minutes")
@@ -0,0 +1,316 @@
+"""
+Content-addressed media store
+Keeps every image once, under its sha256, with references from the posts and sessions that use it
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+from app.config import settings
+
+
+class MediaStore:
+    """
+    Deduplicated image store shared by the API, the scheduler and the Telegram bot
+
+    Blobs live at root/ab/cd/<sha256><ext>. A SQLite index records each blob and
+    the references held on it ("post:<id>", "scheduled:<id>", "telegram:<user>",
+    "generated"); a blob is deleted when its last reference is released. Index
+    updates run in IMMEDIATE transactions so the bot and server processes can
+    share one store.
+    """
+
+    def __init__(self, root: Path, index_path: Path):
+        self.root = Path(root)
+        self.incoming_dir = self.root / "incoming"
+        self.incoming_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = Path(index_path)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS media (
+                sha256 TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                content_type TEXT,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS media_refs (
+                sha256 TEXT NOT NULL,
+                ref TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (sha256, ref)
+            )"""
+        )
+
+    def blob_path(self, sha256: str, extension: str) -> Path:
+        """Sharded location of a blob"""
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}{extension}"
+
+    def _register(self, sha256: str, path: Path, size: int, content_type: Optional[str], ref: str) -> Path:
+        """Record the blob (first extension wins) and the reference; returns the blob's path"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO media (sha256, path, size_bytes, content_type, created_at, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                    (sha256, str(path), size, content_type, now, now)
+                )
+                self._conn.execute("UPDATE media SET last_used = ? WHERE sha256 = ?", (now, sha256))
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO media_refs (sha256, ref, created_at) VALUES (?, ?, ?)",
+                    (sha256, ref, now)
+                )
+                stored = self._conn.execute("SELECT path FROM media WHERE sha256 = ?", (sha256,)).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Path(stored)
+
+    def put_bytes(self, data: bytes, ref: str, extension: str = ".png", content_type: str = None) -> dict:
+        """
+        Store image bytes and take a reference on them
+
+        Identical bytes already in the store are not written again.
+
+        Args:
+            data: Image contents
+            ref: Reference to hold (e.g. "post:<id>")
+            extension: File extension for a new blob
+            content_type: MIME type, if known
+
+        Returns:
+            dict: sha256, local_path, size_bytes, content_type and deduplicated
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._register(sha256, self.blob_path(sha256, extension.lower()), len(data), content_type, ref)
+        deduplicated = path.exists()
+        if not deduplicated:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            partial = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.part")
+            partial.write_bytes(data)
+            os.replace(partial, path)
+        return self._describe(sha256, path, len(data), content_type, deduplicated)
+
+    def put_file(self, source: Path, ref: str, sha256: str = None, content_type: str = None, extension: str = None) -> dict:
+        """
+        Move a file (e.g. a finished download in incoming_dir) into the store
+
+        The source is consumed either way: renamed into place for new content,
+        deleted when the store already holds the same bytes.
+
+        Args:
+            source: File on the same filesystem as the store
+            ref: Reference to hold
+            sha256: Digest if already computed while writing the file
+            content_type: MIME type, if known
+            extension: File extension for a new blob (defaults to the source's)
+        """
+        source = Path(source)
+        if sha256 is None:
+            digest = hashlib.sha256()
+            with open(source, "rb") as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+            sha256 = digest.hexdigest()
+
+        size = source.stat().st_size
+        path = self._register(sha256, self.blob_path(sha256, (extension or source.suffix).lower()), size, content_type, ref)
+        deduplicated = path.exists()
+        if deduplicated:
+            source.unlink(missing_ok=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(source, path)
+        return self._describe(sha256, path, size, content_type, deduplicated)
+
+    @staticmethod
+    def _describe(sha256: str, path: Path, size: int, content_type: Optional[str], deduplicated: bool) -> dict:
+        return {
+            "sha256": sha256,
+            "local_path": str(path),
+            "size_bytes": size,
+            "content_type": content_type,
+            "deduplicated": deduplicated
+        }
+
+    def sha_for_path(self, path: str) -> Optional[str]:
+        """Digest of a stored blob given its path, or None for files outside the store"""
+        if not path:
+            return None
+        candidate = Path(path)
+        try:
+            candidate.resolve().relative_to(self.root.resolve())
+        except ValueError:
+            return None
+        with self._lock:
+            row = self._conn.execute("SELECT sha256 FROM media WHERE sha256 = ?", (candidate.stem,)).fetchone()
+        return row[0] if row else None
+
+    def acquire(self, sha256: str, ref: str) -> bool:
+        """
+        Take another reference on a stored blob (idempotent per ref)
+
+        Returns:
+            bool: False if the blob is not in the store
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self._conn.execute("SELECT 1 FROM media WHERE sha256 = ?", (sha256,)).fetchone()
+                if exists:
+                    now = time.time()
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO media_refs (sha256, ref, created_at) VALUES (?, ?, ?)",
+                        (sha256, ref, now)
+                    )
+                    self._conn.execute("UPDATE media SET last_used = ? WHERE sha256 = ?", (now, sha256))
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return bool(exists)
+
+    def release(self, sha256: str, ref: str) -> bool:
+        """
+        Drop a reference, deleting the blob once nothing references it
+
+        Returns:
+            bool: True if the blob was deleted
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM media_refs WHERE sha256 = ? AND ref = ?", (sha256, ref))
+                remaining = self._conn.execute("SELECT COUNT(*) FROM media_refs WHERE sha256 = ?", (sha256,)).fetchone()[0]
+                row = self._conn.execute("SELECT path FROM media WHERE sha256 = ?", (sha256,)).fetchone()
+                deleted = row is not None and remaining == 0
+                if deleted:
+                    # Unlink inside the transaction so a concurrent put re-creates the file
+                    self._conn.execute("DELETE FROM media WHERE sha256 = ?", (sha256,))
+                    Path(row[0]).unlink(missing_ok=True)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def blobs(self) -> list:
+        """Every indexed blob as dicts of sha256, path, size_bytes, last_used and refs"""
+        with self._lock:
+            rows = self._conn.execute("SELECT sha256, path, size_bytes, last_used FROM media").fetchall()
+            refs = self._conn.execute("SELECT sha256, ref FROM media_refs").fetchall()
+        held = {}
+        for sha256, ref in refs:
+            held.setdefault(sha256, []).append(ref)
+        return [
+            {"sha256": sha256, "path": path, "size_bytes": size, "last_used": last_used, "refs": held.get(sha256, [])}
+            for sha256, path, size, last_used in rows
+        ]
+
+    def purge(self, sha256: str, refs, unused_since: float) -> bool:
+        """
+        Drop references whose owners are gone, deleting the blob if no others remain
+
+        Used by the garbage collector for references that leaked (e.g. a
+        finished publish job or an abandoned chat session). Nothing happens if
+        the blob was used after unused_since; the check and delete are one
+        transaction, so a blob picked up again mid-collection survives.
+
+        Returns:
+            bool: True if the blob was deleted
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT path FROM media WHERE sha256 = ? AND last_used <= ?", (sha256, unused_since)
+                ).fetchone()
+                deleted = False
+                if row:
+                    self._conn.executemany(
+                        "DELETE FROM media_refs WHERE sha256 = ? AND ref = ?", [(sha256, ref) for ref in refs]
+                    )
+                    remaining = self._conn.execute("SELECT COUNT(*) FROM media_refs WHERE sha256 = ?", (sha256,)).fetchone()[0]
+                    deleted = remaining == 0
+                    if deleted:
+                        self._conn.execute("DELETE FROM media WHERE sha256 = ?", (sha256,))
+                        Path(row[0]).unlink(missing_ok=True)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def refcount(self, sha256: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM media_refs WHERE sha256 = ?", (sha256,)).fetchone()[0]
+
+    def stats(self) -> dict:
+        """Blob count, bytes on disk and bytes saved by deduplication"""
+        with self._lock:
+            blobs, stored_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM media").fetchone()
+            refs, referenced_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(m.size_bytes), 0) FROM media_refs r JOIN media m ON m.sha256 = r.sha256"
+            ).fetchone()
+        return {
+            "blobs": blobs,
+            "references": refs,
+            "stored_bytes": stored_bytes,
+            "saved_bytes": max(0, referenced_bytes - stored_bytes)
+        }
+
+
+_store: Optional[MediaStore] = None
+_store_lock = threading.Lock()
+
+
+def get_media_store() -> MediaStore:
+    """Get the process-wide media store (opened on first use)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MediaStore(settings.MEDIA_STORE_DIR, settings.MEDIA_INDEX_FILE)
+        return _store
+
+
+def acquire_path(path: str, ref: str) -> bool:
+    """
+    Take a reference on the stored image at path
+
+    Returns:
+        bool: False if path is not in the media store (nothing to track)
+    """
+    store = get_media_store()
+    sha256 = store.sha_for_path(path)
+    return sha256 is not None and store.acquire(sha256, ref)
+
+
+def discard(path: str, ref: str) -> None:
+    """
+    Let go of an image a post or session no longer needs
+
+    Stored images lose the reference (and are deleted if it was the last one);
+    files from before the media store existed are deleted as before.
+    """
+    if not path:
+        return
+    store = get_media_store()
+    sha256 = store.sha_for_path(path)
+    if sha256 is not None:
+        if store.release(sha256, ref):
+            print(f"🗑️  Deleted unreferenced media {sha256[:12]}")
+    elif os.path.exists(path):
+        os.remove(path)
+        print(f"✅ Deleted image file: {path}")
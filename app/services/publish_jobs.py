@@ -0,0 +1,319 @@
+"""
+Publish jobs
+Runs publish_post as a persisted background job so requests return at once and progress can be polled
+"""
+import asyncio
+import copy
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, Optional, Union
+from app.config import settings
+from app.services.publish_service import publish_post
+from app.services.media_store import discard
+from app.services.job_leases import current_owner, is_orphaned
+
+FINISHED = ("completed", "failed")
+
+# Error for a platform that was mid-request when its job stopped: it may or may not have posted
+INTERRUPTED_ERROR = "Interrupted while posting; it may already be live, so it was not posted again"
+
+# Jobs owned by this process; the JSON files are the durable copy (the API and the bot share them)
+_jobs: Dict[str, dict] = {}
+_jobs_lock = threading.Lock()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Each worker thread keeps one event loop, so its pooled HTTP connections are reused across jobs
+_worker_state = threading.local()
+
+_heartbeat: Optional[threading.Thread] = None
+
+
+def _job_path(job_id: str):
+    return settings.PUBLISH_JOBS_DIR / f"{job_id}.json"
+
+
+def _save_job(job: dict, changed: bool = True) -> None:
+    """Write a job file atomically (call with _jobs_lock held); heartbeats pass changed=False"""
+    settings.PUBLISH_JOBS_DIR.mkdir(parents=True, exist_ok=True)
+    job["heartbeat_at"] = time.time()
+    if changed:
+        job["updated_at"] = datetime.now().isoformat()
+        job["version"] = job.get("version", 0) + 1
+    path = _job_path(job["id"])
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(job, f, indent=2, default=str)
+    tmp_path.replace(path)
+
+
+def _is_orphaned(job: dict) -> bool:
+    """Whether no live process owns a job: its owner has exited, or its lease ran out"""
+    with _jobs_lock:
+        held = job["id"] in _jobs
+    return is_orphaned(job, held, settings.PUBLISH_JOB_LEASE_SECONDS)
+
+
+def _beat() -> None:
+    """Refresh the lease on every job this process owns, queued or running"""
+    while True:
+        time.sleep(settings.PUBLISH_JOB_HEARTBEAT_SECONDS)
+        with _jobs_lock:
+            for job in _jobs.values():
+                try:
+                    _save_job(job, changed=False)
+                except Exception as e:
+                    print(f"⚠️  Error refreshing publish job {job['id']}: {e}")
+
+
+def _start_heartbeat() -> None:
+    global _heartbeat
+    with _executor_lock:
+        if _heartbeat is None:
+            _heartbeat = threading.Thread(target=_beat, name="publish-heartbeat", daemon=True)
+            _heartbeat.start()
+
+
+def _update_job(job_id: str, change) -> dict:
+    """Apply change(job) to the live job, persist it and return a snapshot"""
+    with _jobs_lock:
+        job = _jobs[job_id]
+        change(job)
+        _save_job(job)
+        return copy.deepcopy(job)
+
+
+def get_publish_job(job_id: str) -> Optional[dict]:
+    """
+    Load a publish job
+
+    Args:
+        job_id: Job ID returned by create_publish_job
+
+    Returns:
+        dict: A snapshot of the job, or None if it doesn't exist
+    """
+    with _jobs_lock:
+        if job_id in _jobs:
+            return copy.deepcopy(_jobs[job_id])
+
+    path = _job_path(job_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️  Error loading publish job {job_id}: {e}")
+        return None
+
+
+def list_publish_jobs() -> list:
+    """List persisted publish jobs, newest first"""
+    if not settings.PUBLISH_JOBS_DIR.exists():
+        return []
+    jobs = [get_publish_job(path.stem) for path in settings.PUBLISH_JOBS_DIR.glob("*.json")]
+    return sorted((job for job in jobs if job), key=lambda job: job["created_at"], reverse=True)
+
+
+def create_publish_job(
+    image_path: str,
+    caption: Union[str, Dict[str, str]],
+    platforms: Iterable[str],
+    media_ref: str = None,
+    job_id: str = None
+) -> dict:
+    """
+    Create and persist a publish job (call start_publish_job to run it)
+
+    Args:
+        image_path: Image to post
+        caption: One caption, or a caption per platform
+        platforms: Platforms to post to
+        media_ref: Media store reference to release when the job finishes
+        job_id: ID to use (defaults to a new uuid)
+
+    Returns:
+        dict: The new job
+    """
+    platforms = list(dict.fromkeys(platforms))
+    job = {
+        "id": job_id or str(uuid.uuid4()),
+        "status": "queued",
+        "image_path": image_path,
+        "caption": caption,
+        "media_ref": media_ref,
+        "total": len(platforms),
+        "completed": 0,
+        "failed": 0,
+        "platforms": {platform: {"status": "pending"} for platform in platforms},
+        "owner": current_owner(),
+        "created_at": datetime.now().isoformat()
+    }
+    with _jobs_lock:
+        _jobs[job["id"]] = job
+        _save_job(job)
+        return copy.deepcopy(job)
+
+
+async def run_publish_job(job_id: str) -> dict:
+    """
+    Publish every platform of a job that hasn't finished yet
+
+    Only pending platforms are posted. Platforms that finished before a
+    restart are kept, and platforms that were mid-request are marked failed
+    with outcome_unknown instead of being posted a second time.
+
+    Args:
+        job_id: Job to run
+
+    Returns:
+        dict: The finished job
+    """
+    job = get_publish_job(job_id)
+    if not job:
+        raise ValueError(f"Publish job not found: {job_id}")
+
+    with _jobs_lock:
+        job = _jobs.setdefault(job_id, job)
+        pending = [platform for platform, state in job["platforms"].items() if state["status"] == "pending"]
+        interrupted = [platform for platform, state in job["platforms"].items() if state["status"] == "running"]
+
+    def started(job):
+        job["status"] = "running"
+        job["owner"] = current_owner()
+        for platform in interrupted:
+            print(f"⚠️  {platform.title()} was mid-request when publish job {job_id} stopped; not posting it again")
+            job["platforms"][platform] = {
+                "status": "failed",
+                "success": False,
+                "result": None,
+                "error": INTERRUPTED_ERROR,
+                "timed_out": False,
+                "outcome_unknown": True
+            }
+            job["failed"] += 1
+        for platform in pending:
+            job["platforms"][platform] = {"status": "running"}
+
+    snapshot = _update_job(job_id, started)
+
+    async def on_result(platform: str, outcome: dict):
+        def record(job):
+            job["platforms"][platform] = {"status": "completed" if outcome["success"] else "failed", **outcome}
+            job["completed" if outcome["success"] else "failed"] += 1
+        _update_job(job_id, record)
+
+    try:
+        if pending:
+            await publish_post(snapshot["image_path"], snapshot["caption"], pending, on_result=on_result)
+    except Exception as e:
+        print(f"❌ Publish job {job_id} crashed: {e}")
+
+    def finished(job):
+        for state in job["platforms"].values():
+            if state["status"] not in FINISHED:
+                state.update({"status": "failed", "success": False, "error": "Publishing was interrupted"})
+                job["failed"] += 1
+        job["status"] = "completed" if job["completed"] else "failed"
+
+    snapshot = _update_job(job_id, finished)
+    if snapshot.get("media_ref"):
+        discard(snapshot["image_path"], snapshot["media_ref"])
+
+    with _jobs_lock:
+        _jobs.pop(job_id, None)
+
+    print(f"✅ Publish job {job_id} finished: {snapshot['completed']} posted, {snapshot['failed']} failed")
+    return snapshot
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, settings.PUBLISH_WORKERS), thread_name_prefix="publish")
+        return _executor
+
+
+def _worker_loop() -> asyncio.AbstractEventLoop:
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _worker_state.loop = asyncio.new_event_loop()
+    return loop
+
+
+def _run_in_worker(job_id: str) -> None:
+    try:
+        _worker_loop().run_until_complete(run_publish_job(job_id))
+    except Exception as e:
+        print(f"❌ Publish job {job_id} failed to run: {e}")
+
+
+def start_publish_job(job_id: str) -> None:
+    """
+    Run a publish job on the worker pool
+
+    Each worker runs the job on its own event loop, so platform SDKs that
+    block (tweepy's rate-limit sleeps, praw) never stall the caller's loop.
+    """
+    _start_heartbeat()
+    _get_executor().submit(_run_in_worker, job_id)
+
+
+async def watch_publish_job(job_id: str, interval: float = 0.5) -> AsyncIterator[dict]:
+    """
+    Yield a job snapshot whenever it changes, ending with the finished job
+
+    Args:
+        job_id: Job to follow
+        interval: Seconds between checks
+    """
+    version = None
+    while True:
+        job = get_publish_job(job_id)
+        if job is None:
+            return
+        if job.get("version") != version:
+            version = job.get("version")
+            yield job
+        if job["status"] in FINISHED:
+            return
+        await asyncio.sleep(interval)
+
+
+def resume_publish_jobs() -> None:
+    """
+    Re-queue unfinished jobs whose owner is gone
+
+    Jobs record the pid and host of the process running them, and that
+    process refreshes heartbeat_at every PUBLISH_JOB_HEARTBEAT_SECONDS. A job
+    is taken over only if its owner has exited or its lease
+    (PUBLISH_JOB_LEASE_SECONDS) has expired, so restarting the API never
+    re-runs a job the bot is still publishing.
+    """
+    for job in list_publish_jobs():
+        if job["status"] in FINISHED or not _is_orphaned(job):
+            continue
+        with _jobs_lock:
+            if job["id"] in _jobs:
+                continue
+            job["owner"] = current_owner()
+            _jobs[job["id"]] = job
+            _save_job(job)
+        print(f"🔄 Resuming publish job {job['id']}")
+        start_publish_job(job["id"])
+
+
+def shutdown_publish_workers() -> None:
+    """Stop taking new jobs (unfinished ones resume on next start)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
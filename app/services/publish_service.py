@@ -0,0 +1,102 @@
+"""
+Publish orchestrator
+Fans a post out to every selected platform concurrently, so a post takes as long as the slowest platform
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Union
+from fastapi import HTTPException
+from app.config import settings
+from app.services.facebook_service import post_photo_to_facebook
+from app.services.instagram_service import post_photo_to_instagram
+from app.services.twitter_service import post_photo_to_twitter
+from app.services.reddit_service import post_photo_to_reddit
+from app.services.image_service import prepare_platform_images
+
+PUBLISHERS = {
+    "facebook": post_photo_to_facebook,
+    "instagram": post_photo_to_instagram,
+    "twitter": post_photo_to_twitter,
+    "reddit": post_photo_to_reddit
+}
+
+
+def platform_timeout(platform: str) -> float:
+    """Seconds one platform may take (Instagram polls until its media container is ready)"""
+    if platform == "instagram":
+        return settings.INSTAGRAM_PUBLISH_TIMEOUT
+    return settings.PUBLISH_TIMEOUT
+
+
+async def _publish_one(platform: str, image_path: str, caption: str) -> dict:
+    """Post to one platform, turning every failure into an outcome instead of an exception"""
+    started = time.perf_counter()
+    outcome = {"success": False, "result": None, "error": None, "timed_out": False}
+    timeout = platform_timeout(platform)
+    try:
+        outcome["result"] = await asyncio.wait_for(PUBLISHERS[platform](image_path, caption), timeout=timeout)
+        outcome["success"] = True
+        print(f"✅ Posted to {platform.title()} successfully")
+    except asyncio.TimeoutError:
+        outcome["error"] = f"Request timeout ({timeout:g}s)"
+        outcome["timed_out"] = True
+        print(f"⏱️ {platform.title()} timed out after {timeout:g}s")
+    except HTTPException as e:
+        outcome["error"] = str(e.detail)
+        print(f"❌ {platform.title()} posting failed: {e.detail}")
+    except Exception as e:
+        outcome["error"] = str(e)
+        print(f"❌ {platform.title()} posting failed: {e}")
+    outcome["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return outcome
+
+
+async def publish_post(
+    image_path: Optional[str],
+    caption: Union[str, Dict[str, str]],
+    platforms: Iterable[str],
+    on_result: Callable[[str, dict], Awaitable[None]] = None
+) -> Dict[str, dict]:
+    """
+    Publish a photo post to several platforms at once
+
+    The image is prepared for every platform first, then all platforms are
+    posted to concurrently, each with its own timeout. One platform failing
+    or timing out never affects the others.
+
+    Args:
+        image_path: Image to post
+        caption: One caption for every platform, or a caption per platform
+        platforms: Platforms to post to
+        on_result: Optional coroutine called with (platform, outcome) as each platform finishes
+
+    Returns:
+        dict: platform -> outcome with success, result (the platform service's
+        response), error, timed_out and duration_ms
+    """
+    platforms = list(dict.fromkeys(platforms))
+    outcomes = {}
+    for platform in platforms:
+        if platform not in PUBLISHERS:
+            outcomes[platform] = {"success": False, "result": None, "error": "Platform not supported", "timed_out": False, "duration_ms": 0.0}
+        elif not image_path:
+            outcomes[platform] = {"success": False, "result": None, "error": "Missing image", "timed_out": False, "duration_ms": 0.0}
+
+    pending = [platform for platform in platforms if platform not in outcomes]
+    if not pending:
+        return outcomes
+
+    # Resize/recompress once for every platform before fanning out
+    images = await prepare_platform_images(image_path, pending)
+
+    async def run(platform: str) -> None:
+        text = caption.get(platform, "") if isinstance(caption, dict) else caption
+        outcomes[platform] = await _publish_one(platform, images.get(platform, image_path), text)
+        if on_result is not None:
+            try:
+                await on_result(platform, outcomes[platform])
+            except Exception as e:
+                print(f"⚠️  Publish progress callback failed: {e}")
+
+    await asyncio.gather(*(run(platform) for platform in pending))
+    return {platform: outcomes[platform] for platform in platforms}
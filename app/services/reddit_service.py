@@ -1,6 +1,7 @@
 """
 Reddit posting service
 """
+import asyncio
 from fastapi import HTTPException
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.clients.reddit import get_reddit_client
@@ -30,7 +31,10 @@ async def post_photo_to_reddit(image_path: str, caption: str) -> dict:
     try:
         subreddit = reddit.subreddit(settings.REDDIT_SUBREDDIT)
         title = (caption or "Untitled post")[:300]
-        submission = subreddit.submit_image(title=title, image_path=image_path)
+        # praw is synchronous, so the upload runs on a worker thread to keep the loop free
+        submission = await asyncio.get_running_loop().run_in_executor(
+            None, lambda: subreddit.submit_image(title=title, image_path=image_path)
+        )
         return {"id": submission.id, "url": submission.url}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to post to Reddit: {str(e)}")
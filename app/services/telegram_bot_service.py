@@ -2,7 +2,6 @@
 Telegram Bot service for social media management
 Complete feature parity with web frontend - ENHANCED UX WITH BACK BUTTONS
 """
-import os
 import uuid
 import asyncio
 from datetime import datetime, timedelta
@@ -17,14 +16,11 @@ from telegram.ext import (
     ContextTypes,
     filters
 )
-import httpx
-from fastapi import HTTPException
 from app.config import settings
-from app.services.ai_service import generate_platform_content, regenerate_platform_content
-from app.services.facebook_service import post_photo_to_facebook
-from app.services.instagram_service import post_photo_to_instagram
-from app.services.twitter_service import post_photo_to_twitter
-from app.services.reddit_service import post_photo_to_reddit
+from app.clients.http import close_http_clients
+from app.services.ai_service import generate_platform_content, regenerate_platform_content, stream_platform_content, close_ai_clients
+from app.services.publish_jobs import FINISHED, create_publish_job, start_publish_job, watch_publish_job
+from app.services.media_store import get_media_store, acquire_path, discard
 from app.scheduler.storage import load_scheduled_posts, save_scheduled_posts
 from app.scheduler.scheduler import scheduler, execute_scheduled_post
 from apscheduler.triggers.date import DateTrigger
@@ -40,12 +36,56 @@ from app.services.telegram_auth import telegram_auth, require_login, require_log
 user_sessions = {}
 
 
+def _publish_result(platform: str, outcome: dict) -> dict:
+    """Turn a publish outcome into the result shown in the bot's publishing summary"""
+    if not outcome["success"]:
+        return {"success": False, "message": outcome["error"]}
+    
+    api_result = outcome["result"]
+    if platform == "instagram":
+        if api_result and "id" in api_result:
+            return {
+                "success": True,
+                "message": "Posted successfully!",
+                "info": api_result.get("info", f"Media ID: {api_result.get('id')}"),
+                "id": api_result.get("id")
+            }
+    elif api_result and ("id" in api_result or "post_id" in api_result or (platform == "reddit" and "url" in api_result)):
+        return {
+            "success": True,
+            "message": "Posted successfully!",
+            "url": api_result.get("url", ""),
+            "id": api_result.get("id") or api_result.get("post_id")
+        }
+    return {"success": False, "message": str(api_result)}
+
+
 class TelegramBotService:
     """Handles all Telegram bot interactions with smooth back navigation"""
     
     def __init__(self):
         self.application = None
     
+    @staticmethod
+    async def _follow_publish_job(query, job_id: str) -> dict:
+        """Run a publish job on the worker pool, redrawing the progress bar as it changes"""
+        start_publish_job(job_id)
+        job = None
+        async for job in watch_publish_job(job_id):
+            finished = job["completed"] + job["failed"]
+            running = [platform.title() for platform, state in job["platforms"].items() if state["status"] not in FINISHED]
+            try:
+                await query.edit_message_text(
+                    f"🚀 *Publishing...*\n\n"
+                    f"[{'▓' * finished}{'░' * (job['total'] - finished)}] {finished}/{job['total']}\n"
+                    f"✅ {job['completed']} posted  ❌ {job['failed']} failed\n"
+                    f"📤 {', '.join(running) if running else 'Done'}",
+                    parse_mode='Markdown'
+                )
+            except Exception as e:
+                print(f"⚠️  Could not update publish progress: {e}")
+        return job
+    
     # ==================== COMMAND HANDLERS ====================
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -573,27 +613,37 @@ class TelegramBotService:
             parse_mode='Markdown'
         )
         
-        # Small delay for user to see the summary
-        await asyncio.sleep(0.5)
-        
         try:
-            # Update: Step 1 - Generating content
-            await loading_msg.edit_text(
-                f"⚡ *Generating...*\n\n"
-                f"[▓▓░░░░░░░░] 20%\n"
-                f"📝 Creating content...",
-                parse_mode='Markdown'
-            )
+            # Progress is driven by the generation event stream: one step per
+            # platform caption plus one for the image
+            total_steps = 5
+            completed = []
+            result = None
             
-            # Generate content using existing service
-            result = await generate_platform_content(
+            async for event, data in stream_platform_content(
                 topic=session["topic"],
                 tone=session["tone"],
                 image_style=session["image_style"],
                 generate_image=True,
                 use_prompt_enhancer=False,
                 image_provider=provider
-            )
+            ):
+                if event in ("caption", "image"):
+                    completed.append("🖼️ Image" if event == "image" else f"📝 {data['platform'].title()}")
+                    filled = len(completed) * 10 // total_steps
+                    try:
+                        await loading_msg.edit_text(
+                            f"⚡ *Generating...*\n\n"
+                            f"[{'▓' * filled}{'░' * (10 - filled)}] {len(completed) * 100 // total_steps}%\n"
+                            + "\n".join(f"✅ {step}" for step in completed),
+                            parse_mode='Markdown'
+                        )
+                    except Exception:
+                        pass  # Progress edits are best-effort (e.g. Telegram rate limits)
+                elif event == "error":
+                    raise Exception(data["detail"])
+                elif event == "complete":
+                    result = data
             
             # Update: Complete
             await loading_msg.edit_text(
@@ -602,41 +652,33 @@ class TelegramBotService:
                 f"Sending results...",
                 parse_mode='Markdown'
             )
-            await asyncio.sleep(0.3)
             
             # Store generated content in session
             session["generated"] = result
             session["approved_platforms"] = []
             session["image_approved"] = False
             
-            # Send generated image
+            # Send generated image (already saved locally by the image provider)
             if result["image"]["success"]:
-                # Download and send image
-                async with httpx.AsyncClient() as client:
-                    img_response = await client.get(result["image"]["image_url"])
-                    img_path = Path(f"uploads/telegram_temp_{uuid.uuid4().hex[:8]}.png")
-                    
-                    with open(img_path, "wb") as f:
-                        f.write(img_response.content)
-                    
-                    session["temp_image_path"] = str(img_path)
-                    
-                    # Send photo with approval buttons
-                    keyboard = [
-                        [InlineKeyboardButton("✅ Approve Image", callback_data="img_approve"),
-                         InlineKeyboardButton("🔄 Regenerate", callback_data="img_regenerate")],
-                        [InlineKeyboardButton("« Back to Style", callback_data="back_provider")]
-                    ]
-                    reply_markup = InlineKeyboardMarkup(keyboard)
-                    
-                    with open(img_path, "rb") as photo:
-                        await context.bot.send_photo(
-                            chat_id=update.effective_chat.id,
-                            photo=photo,
-                            caption="🎨 *AI-Generated Image*\n\nDo you approve this image?",
-                            reply_markup=reply_markup,
-                            parse_mode='Markdown'
-                        )
+                img_path = result["image"]["local_path"]
+                session["temp_image_path"] = img_path
+                
+                # Send photo with approval buttons
+                keyboard = [
+                    [InlineKeyboardButton("✅ Approve Image", callback_data="img_approve"),
+                     InlineKeyboardButton("🔄 Regenerate", callback_data="img_regenerate")],
+                    [InlineKeyboardButton("« Back to Style", callback_data="back_provider")]
+                ]
+                reply_markup = InlineKeyboardMarkup(keyboard)
+                
+                with open(img_path, "rb") as photo:
+                    await context.bot.send_photo(
+                        chat_id=update.effective_chat.id,
+                        photo=photo,
+                        caption="🎨 *AI-Generated Image*\n\nDo you approve this image?",
+                        reply_markup=reply_markup,
+                        parse_mode='Markdown'
+                    )
             
             # Send full content for each platform (separately if needed for long content)
             await context.bot.send_message(
@@ -769,7 +811,8 @@ class TelegramBotService:
                     image_style=session["image_style"],
                     generate_image=True,
                     use_prompt_enhancer=False,
-                    image_provider=provider
+                    image_provider=provider,
+                    bypass_cache=True
                 )
                 
                 # Reset approvals since everything is new
@@ -777,36 +820,26 @@ class TelegramBotService:
                 session["approved_platforms"] = []
                 session["image_approved"] = False
                 
-                # Delete old temp image
-                if "temp_image_path" in session and os.path.exists(session["temp_image_path"]):
-                    os.remove(session["temp_image_path"])
-                
-                # Send new image
+                # Send new image (already saved locally by the image provider)
                 if result["image"]["success"]:
-                    async with httpx.AsyncClient() as client:
-                        img_response = await client.get(result["image"]["image_url"])
-                        img_path = Path(f"uploads/telegram_temp_{uuid.uuid4().hex[:8]}.png")
-                        
-                        with open(img_path, "wb") as f:
-                            f.write(img_response.content)
-                        
-                        session["temp_image_path"] = str(img_path)
-                        
-                        keyboard = [
-                            [InlineKeyboardButton("✅ Approve Image", callback_data="img_approve"),
-                             InlineKeyboardButton("🔄 Regenerate", callback_data="img_regenerate")],
-                            [InlineKeyboardButton("« Back to Menu", callback_data="back_menu")]
-                        ]
-                        reply_markup = InlineKeyboardMarkup(keyboard)
-                        
-                        with open(img_path, "rb") as photo:
-                            await context.bot.send_photo(
-                                chat_id=update.effective_chat.id,
-                                photo=photo,
-                                caption=f"🔄 *Regenerated Image ({provider_name})*\n\nDo you approve this image?",
-                                reply_markup=reply_markup,
-                                parse_mode='Markdown'
-                            )
+                    img_path = result["image"]["local_path"]
+                    session["temp_image_path"] = img_path
+                    
+                    keyboard = [
+                        [InlineKeyboardButton("✅ Approve Image", callback_data="img_approve"),
+                         InlineKeyboardButton("🔄 Regenerate", callback_data="img_regenerate")],
+                        [InlineKeyboardButton("« Back to Menu", callback_data="back_menu")]
+                    ]
+                    reply_markup = InlineKeyboardMarkup(keyboard)
+                    
+                    with open(img_path, "rb") as photo:
+                        await context.bot.send_photo(
+                            chat_id=update.effective_chat.id,
+                            photo=photo,
+                            caption=f"🔄 *Regenerated Image ({provider_name})*\n\nDo you approve this image?",
+                            reply_markup=reply_markup,
+                            parse_mode='Markdown'
+                        )
                 
                 # Send regenerated content
                 await context.bot.send_message(
@@ -969,101 +1002,15 @@ class TelegramBotService:
                 parse_mode='Markdown'
             )
             
-            # Publish to approved platforms
-            results = {}
-            for idx, platform in enumerate(session["approved_platforms"], 1):
-                # Show progress
-                await query.edit_message_text(
-                    f"🚀 *Publishing...*\n\n"
-                    f"[{'▓' * idx}{'░' * (platforms_count - idx)}] {idx}/{platforms_count}\n"
-                    f"📤 Posting to {platform.title()}...",
-                    parse_mode='Markdown'
-                )
-                try:
-                    image_path = session.get("temp_image_path")
-                    content_data = session["generated"]["platforms"][platform]
-                    caption = content_data["content"]
-                    
-                    print(f"🔄 Publishing AI content to {platform}...")
-                    
-                    # Call platform services with timeout and standardize response
-                    if platform == "facebook" and image_path:
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_facebook(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and ("id" in api_result or "post_id" in api_result):
-                            post_url = api_result.get("url", "")
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "url": post_url,
-                                "id": api_result.get("id") or api_result.get("post_id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    elif platform == "instagram" and image_path:
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_instagram(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and "id" in api_result:
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "info": api_result.get("info", f"Media ID: {api_result.get('id')}"),
-                                "id": api_result.get("id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    elif platform == "twitter" and image_path:
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_twitter(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and "id" in api_result:
-                            tweet_url = api_result.get("url", "")
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "url": tweet_url,
-                                "id": api_result.get("id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    elif platform == "reddit" and image_path:
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_reddit(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and ("id" in api_result or "url" in api_result):
-                            reddit_url = api_result.get("url", "")
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "url": reddit_url,
-                                "id": api_result.get("id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    else:
-                        results[platform] = {"success": False, "message": "Missing image"}
-                    
-                    print(f"✅ {platform} result: {results[platform]}")
-                        
-                except asyncio.TimeoutError:
-                    print(f"⏱️ {platform} timeout!")
-                    results[platform] = {"success": False, "message": "Request timeout (30s)"}
-                except HTTPException as e:
-                    print(f"❌ {platform} HTTP error: {e.detail}")
-                    results[platform] = {"success": False, "message": e.detail}
-                except Exception as e:
-                    print(f"❌ {platform} error: {str(e)}")
-                    results[platform] = {"success": False, "message": str(e)}
+            # Publish to approved platforms as a background job, drawing progress from the job's state
+            captions = {
+                platform: session["generated"]["platforms"].get(platform, {}).get("content", "")
+                for platform in session["approved_platforms"]
+            }
+            print(f"🔄 Publishing AI content to {', '.join(session['approved_platforms'])}...")
+            job = create_publish_job(session.get("temp_image_path"), captions, session["approved_platforms"])
+            job = await self._follow_publish_job(query, job["id"])
+            results = {platform: _publish_result(platform, state) for platform, state in job["platforms"].items()}
             
             # Send results with clickable links
             message = "📊 *Publishing Results:*\n\n"
@@ -1094,10 +1041,6 @@ class TelegramBotService:
                 
                 message += "\n"
             
-            # Clean up temp file
-            if "temp_image_path" in session and os.path.exists(session["temp_image_path"]):
-                os.remove(session["temp_image_path"])
-            
             keyboard = [[InlineKeyboardButton("« Back to Menu", callback_data="back_menu")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
             
@@ -1307,30 +1250,23 @@ class TelegramBotService:
         # Download the photo
         try:
             file = await photo.get_file()
-            
-            # Save to uploads directory with absolute path
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            unique_id = uuid.uuid4().hex[:8]
-            filename = f"telegram_manual_{timestamp}_{unique_id}.jpg"
-            
-            # Get absolute path to uploads directory
-            uploads_dir = Path("uploads")
-            uploads_dir.mkdir(exist_ok=True)
-            filepath = uploads_dir / filename
-            
-            await file.download_to_drive(str(filepath))
-            
-            # Verify file was downloaded
-            if not filepath.exists():
+            data = bytes(await file.download_as_bytearray())
+            if not data:
                 raise Exception("Failed to download image")
             
+            # Store in the media store, referenced by this user's session
+            stored = await asyncio.get_running_loop().run_in_executor(
+                None, lambda: get_media_store().put_bytes(data, f"telegram:{user_id}", extension=".jpg", content_type="image/jpeg")
+            )
+            filepath = Path(stored["local_path"])
+            
             print(f"✅ Image saved: {filepath}")
             
             # Store in session with absolute path
             user_sessions[user_id] = {
                 "mode": "manual",
                 "image_path": str(filepath.absolute()),
-                "filename": filename
+                "filename": filepath.name
             }
             
             keyboard = [[InlineKeyboardButton("« Back to Menu", callback_data="back_menu")]]
@@ -1503,8 +1439,7 @@ class TelegramBotService:
                 parse_mode='Markdown'
             )
             
-            # Publish to selected platforms
-            results = {}
+            # Publish to selected platforms as a background job, drawing progress from the job's state
             image_path = session.get("image_path")
             caption = session.get("caption", "")
             
@@ -1514,95 +1449,9 @@ class TelegramBotService:
             print(f"   Caption: {caption[:50] if caption else 'None'}")
             print(f"   Platforms: {session['selected_platforms']}")
             
-            for idx, platform in enumerate(session["selected_platforms"], 1):
-                # Show progress
-                await query.edit_message_text(
-                    f"🚀 *Publishing...*\n\n"
-                    f"[{'▓' * idx}{'░' * (platforms_count - idx)}] {idx}/{platforms_count}\n"
-                    f"📤 Posting to {platform.title()}...",
-                    parse_mode='Markdown'
-                )
-                try:
-                    print(f"🔄 Publishing to {platform}...")
-                    
-                    # Call platform services with timeout
-                    if platform == "facebook":
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_facebook(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and ("id" in api_result or "post_id" in api_result):
-                            post_url = api_result.get("url", "")
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "url": post_url,
-                                "id": api_result.get("id") or api_result.get("post_id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    elif platform == "instagram":
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_instagram(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and "id" in api_result:
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "info": api_result.get("info", f"Media ID: {api_result.get('id')}"),
-                                "id": api_result.get("id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    elif platform == "twitter":
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_twitter(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and "id" in api_result:
-                            tweet_url = api_result.get("url", "")
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "url": tweet_url,
-                                "id": api_result.get("id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    elif platform == "reddit":
-                        api_result = await asyncio.wait_for(
-                            post_photo_to_reddit(image_path, caption),
-                            timeout=30.0
-                        )
-                        if api_result and ("id" in api_result or "url" in api_result):
-                            reddit_url = api_result.get("url", "")
-                            results[platform] = {
-                                "success": True, 
-                                "message": "Posted successfully!",
-                                "url": reddit_url,
-                                "id": api_result.get("id")
-                            }
-                        else:
-                            results[platform] = {"success": False, "message": str(api_result)}
-                    
-                    else:
-                        results[platform] = {"success": False, "message": "Platform not supported"}
-                    
-                    print(f"✅ {platform} result: {results[platform]}")
-                        
-                except asyncio.TimeoutError:
-                    print(f"⏱️ {platform} timeout!")
-                    results[platform] = {"success": False, "message": "Request timeout (30s)"}
-                except HTTPException as e:
-                    print(f"❌ {platform} HTTP error: {e.detail}")
-                    results[platform] = {"success": False, "message": e.detail}
-                except Exception as e:
-                    print(f"❌ {platform} error: {str(e)}")
-                    results[platform] = {"success": False, "message": str(e)}
+            job = create_publish_job(image_path, caption, session["selected_platforms"])
+            job = await self._follow_publish_job(query, job["id"])
+            results = {platform: _publish_result(platform, state) for platform, state in job["platforms"].items()}
             
             # Send results with clickable links
             message = "📊 *Publishing Results:*\n\n"
@@ -1633,12 +1482,11 @@ class TelegramBotService:
                 
                 message += "\n"
             
-            # Clean up temp file
-            if session.get("image_path") and os.path.exists(session["image_path"]):
-                try:
-                    os.remove(session["image_path"])
-                except:
-                    pass
+            # Release the session's image (kept while a scheduled post uses it)
+            try:
+                discard(session.get("image_path"), f"telegram:{user_id}")
+            except Exception as e:
+                print(f"⚠️  Could not release image: {e}")
             
             keyboard = [[InlineKeyboardButton("« Back to Menu", callback_data="back_menu")]]
             reply_markup = InlineKeyboardMarkup(keyboard)
@@ -1834,6 +1682,9 @@ class TelegramBotService:
             caption = session["generated"]["platforms"]["facebook"]["content"][:100]
             image_path = session.get("temp_image_path", "")
         
+        # The post holds its own reference, so the image outlives the chat session
+        acquire_path(image_path, f"scheduled:{post_id}")
+        
         post_data = {
             "id": post_id,
             "caption": caption,
@@ -2020,6 +1871,9 @@ class TelegramBotService:
                 print("✅ Bot stopped cleanly")
             except Exception as e:
                 print(f"⚠️  Shutdown warning: {e}")
+        
+        await close_ai_clients()
+        await close_http_clients()
 
 
 # Global instance
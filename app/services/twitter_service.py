@@ -1,6 +1,7 @@
 """
 Twitter posting service
 """
+import asyncio
 from fastapi import HTTPException
 from tenacity import retry, stop_after_attempt, wait_exponential
 from app.clients.twitter import get_twitter_v1_client, get_twitter_v2_client
@@ -31,13 +32,16 @@ async def post_photo_to_twitter(image_path: str, caption: str) -> dict:
         raise HTTPException(status_code=500, detail="Twitter v2 client not configured for create_tweet")
 
     try:
+        # tweepy is synchronous, so its calls run on a worker thread to keep the loop free
+        loop = asyncio.get_running_loop()
+        
         # Upload media using v1.1 API
-        media = api_v1.media_upload(filename=image_path)
+        media = await loop.run_in_executor(None, lambda: api_v1.media_upload(filename=image_path))
         media_id = media.media_id_string
         
         # Create tweet with media using v2 API
         text = (caption or "")[:280]
-        resp = client_v2.create_tweet(text=text, media_ids=[media_id])
+        resp = await loop.run_in_executor(None, lambda: client_v2.create_tweet(text=text, media_ids=[media_id]))
         
         tweet_id = None
         if resp and hasattr(resp, "data") and resp.data:
@@ -64,7 +68,7 @@ async def post_text_to_twitter(caption: str) -> dict:
 
     try:
         text = (caption or "")[:280]
-        resp = client_v2.create_tweet(text=text)
+        resp = await asyncio.get_running_loop().run_in_executor(None, lambda: client_v2.create_tweet(text=text))
         
         tweet_id = None
         if resp and hasattr(resp, "data") and resp.data:
@@ -0,0 +1,60 @@
+"""
+Image file helpers
+Kept free of app imports: render_derivative runs in spawned worker processes
+"""
+import hashlib
+import os
+
+
+def file_sha256(path: str) -> str:
+    """sha256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_derivative(source: str, destination: str, spec: dict) -> str:
+    """
+    Write a derivative of source to destination (runs in a worker process)
+
+    EXIF orientation is applied to the pixels and nothing else is copied over,
+    so location and camera metadata never leave the server.
+
+    Returns:
+        str: destination, or source if it can't be converted (animated images)
+    """
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        if getattr(image, "is_animated", False):
+            return source
+        image = ImageOps.exif_transpose(image)
+
+        aspect = spec.get("aspect")
+        if aspect:
+            width, height = image.size
+            low, high = aspect
+            if width / height < low:
+                crop = int(width / low)
+                top = (height - crop) // 2
+                image = image.crop((0, top, width, top + crop))
+            elif width / height > high:
+                crop = int(height * high)
+                left = (width - crop) // 2
+                image = image.crop((left, 0, left + crop, height))
+
+        if max(image.size) > spec["max_side"]:
+            image.thumbnail((spec["max_side"], spec["max_side"]), Image.LANCZOS)
+
+        if spec["format"] == "JPEG" and image.mode != "RGB":
+            # Flatten transparency onto white instead of letting it turn black
+            rgba = image.convert("RGBA")
+            image = Image.new("RGB", rgba.size, (255, 255, 255))
+            image.paste(rgba, mask=rgba.getchannel("A"))
+
+        partial = f"{destination}.{os.getpid()}.part"
+        image.save(partial, spec["format"], quality=spec.get("quality", 85), optimize=True)
+    os.replace(partial, destination)
+    return destination
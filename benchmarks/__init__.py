@@ -0,0 +1,6 @@
+"""
+End-to-end benchmarks for the generate, post and schedule paths
+
+Run with `python -m benchmarks` (see benchmarks/README.md). Every external
+provider is replaced by the simulated backend (PROVIDER_BACKEND=simulated).
+"""
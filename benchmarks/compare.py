@@ -0,0 +1,82 @@
+"""
+Compare two benchmark result files (e.g. main vs. a branch)
+
+Usage:
+    python -m benchmarks.compare base.json head.json [--threshold 10]
+
+Exits with status 1 if any scenario/concurrency level got slower (p95 latency)
+or lost throughput by more than the threshold percentage.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _change(base: float, head: float) -> float:
+    """Percentage change from base to head (0 when base is 0)"""
+    return (head - base) / base * 100 if base else 0.0
+
+
+def compare(base: dict, head: dict, threshold: float = 10.0) -> list:
+    """
+    Pair up scenario/concurrency levels present in both reports
+
+    Returns:
+        list: One row per level with base/head throughput and p95 latency,
+        their percentage changes and whether it counts as a regression
+    """
+    head_levels = {
+        (scenario["scenario"], level["concurrency"]): level
+        for scenario in head["scenarios"] for level in scenario["levels"]
+    }
+    rows = []
+    for scenario in base["scenarios"]:
+        for base_level in scenario["levels"]:
+            head_level = head_levels.get((scenario["scenario"], base_level["concurrency"]))
+            if head_level is None:
+                continue
+            throughput = _change(base_level["throughput_rps"], head_level["throughput_rps"])
+            p95 = _change(base_level["latency_ms"]["p95"], head_level["latency_ms"]["p95"])
+            rows.append({
+                "scenario": scenario["scenario"],
+                "concurrency": base_level["concurrency"],
+                "throughput": (base_level["throughput_rps"], head_level["throughput_rps"], round(throughput, 1)),
+                "p95_ms": (base_level["latency_ms"]["p95"], head_level["latency_ms"]["p95"], round(p95, 1)),
+                "errors": (base_level["errors"], head_level["errors"]),
+                "regression": throughput < -threshold or p95 > threshold
+            })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare", description=__doc__.strip().splitlines()[0])
+    parser.add_argument("base", help="Baseline results JSON")
+    parser.add_argument("head", help="Results JSON to compare against the baseline")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed slowdown in percent before failing")
+    args = parser.parse_args(argv)
+
+    base = json.loads(Path(args.base).read_text())
+    head = json.loads(Path(args.head).read_text())
+    if base.get("config") != head.get("config"):
+        print("⚠️  Benchmark configs differ; numbers may not be comparable")
+
+    rows = compare(base, head, args.threshold)
+    print(f"{'scenario':18} {'conc':>4}  {'req/s base → head':>24} {'Δ%':>7}  {'p95 ms base → head':>26} {'Δ%':>7}  errors")
+    for row in rows:
+        tp, p95 = row["throughput"], row["p95_ms"]
+        flag = "  ❌" if row["regression"] else ""
+        print(
+            f"{row['scenario']:18} {row['concurrency']:>4}  {tp[0]:>10.2f} → {tp[1]:<10.2f} {tp[2]:>+7.1f}  "
+            f"{p95[0]:>11.1f} → {p95[1]:<11.1f} {p95[2]:>+7.1f}  {row['errors'][0]} → {row['errors'][1]}{flag}"
+        )
+
+    regressions = [row for row in rows if row["regression"]]
+    if regressions:
+        print(f"\n{len(regressions)} level(s) regressed by more than {args.threshold}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
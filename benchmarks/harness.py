@@ -0,0 +1,127 @@
+"""
+Load generation and measurement: latency percentiles, throughput, event-loop lag and memory
+"""
+import asyncio
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of samples (0.0 for no samples)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def summarize_ms(samples: List[float]) -> dict:
+    """p50/p95/p99/mean/max of samples in seconds, reported in milliseconds"""
+    return {
+        "p50": round(percentile(samples, 50) * 1000, 3),
+        "p95": round(percentile(samples, 95) * 1000, 3),
+        "p99": round(percentile(samples, 99) * 1000, 3),
+        "mean": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        "max": round(max(samples) * 1000, 3) if samples else 0.0
+    }
+
+
+def max_rss_mb() -> float:
+    """Process resident-set high-water mark in MB (never goes down)"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 2)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how late a task that sleeps `interval` seconds wakes up
+
+    Anything that blocks the loop (sync I/O, CPU-heavy work in a handler)
+    shows up here long before it shows up in request latency.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task = None
+        self._sleep_started = 0.0
+
+    async def _run(self) -> None:
+        while True:
+            self._sleep_started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - self._sleep_started - self.interval))
+
+    def start(self) -> None:
+        self.samples = []
+        self._sleep_started = time.perf_counter()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> dict:
+        # A sleep still pending now was overrun by however long the loop was blocked
+        overdue = time.perf_counter() - self._sleep_started - self.interval
+        if overdue > 0:
+            self.samples.append(overdue)
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return summarize_ms(self.samples)
+
+
+async def run_level(call: Callable[[int], Awaitable[bool]], concurrency: int, requests: int, first_index: int = 0) -> dict:
+    """
+    Run `requests` calls with `concurrency` of them in flight at a time
+
+    Args:
+        call: Async function taking a unique request index and returning whether it succeeded
+        concurrency: Number of concurrent workers
+        requests: Total calls to make
+        first_index: Index of the first call (keeps indexes unique across levels)
+
+    Returns:
+        dict: Throughput, latency percentiles, error count, event-loop lag and memory for the level
+    """
+    latencies: List[float] = []
+    errors = 0
+    next_index = iter(range(first_index, first_index + requests))
+
+    async def worker():
+        nonlocal errors
+        for index in next_index:
+            started = time.perf_counter()
+            try:
+                ok = await call(index)
+            except Exception as e:
+                print(f"⚠️  Benchmark request {index} raised: {e}")
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += 0 if ok else 1
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    monitor = LoopLagMonitor()
+    monitor.start()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, requests))))
+    duration = time.perf_counter() - started
+    loop_lag = await monitor.stop()
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(requests / duration, 3) if duration else 0.0,
+        "latency_ms": summarize_ms(latencies),
+        "loop_lag_ms": loop_lag,
+        "memory_mb": {
+            "peak_traced": round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2) if tracing else None,
+            "max_rss": max_rss_mb()
+        }
+    }
@@ -0,0 +1,179 @@
+"""
+Benchmark runner: drives each scenario at increasing concurrency and writes JSON results
+
+Usage:
+    python -m benchmarks --concurrency 1,4,16 --requests 40 --output results.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCENARIO_NAMES = ["generate", "post", "scheduled-posts", "scheduler-execute"]
+
+# Used only when no stored credentials exist; the simulated providers accept any value
+PLACEHOLDER_CREDENTIALS = {
+    "FACEBOOK_PAGE_ACCESS_TOKEN": "benchmark",
+    "INSTAGRAM_ACCESS_TOKEN": "benchmark",
+    "INSTAGRAM_ACCOUNT_ID": "benchmark",
+    "TWITTER_API_KEY": "benchmark",
+    "TWITTER_API_SECRET": "benchmark",
+    "TWITTER_ACCESS_TOKEN": "benchmark",
+    "TWITTER_ACCESS_TOKEN_SECRET": "benchmark",
+    "REDDIT_CLIENT_ID": "benchmark",
+    "REDDIT_CLIENT_SECRET": "benchmark",
+    "REDDIT_USERNAME": "benchmark",
+    "REDDIT_PASSWORD": "benchmark"
+}
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="End-to-end benchmarks against simulated providers")
+    parser.add_argument("--scenarios", default=",".join(SCENARIO_NAMES), help=f"Comma-separated subset of: {', '.join(SCENARIO_NAMES)}")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per concurrency level")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured requests per scenario before the first level")
+    parser.add_argument("--latency-scale", type=float, default=0.25, help="Multiplier for simulated provider latency (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=None, help="Override every simulated provider's error rate")
+    parser.add_argument("--rate-limit-rate", type=float, default=None, help="Override every simulated provider's 429 rate")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for simulated latency and failures")
+    parser.add_argument("--scheduled-posts", type=int, default=200, help="Scheduled posts in the calendar file")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the Python heap peak per level (slows the app down several times)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--verbose", action="store_true", help="Show the application's own log output")
+    args = parser.parse_args(argv)
+
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIO_NAMES]
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+    args.concurrency = [int(level) for level in args.concurrency.split(",")]
+    return args
+
+
+def configure_environment(args: argparse.Namespace, workdir: Path) -> None:
+    """
+    Point the app at the simulated providers and a throwaway working directory
+
+    Must run before anything imports app.config. Uploads, generated images and
+    the scheduled posts file live under workdir, so real data is never touched.
+    """
+    (workdir / "uploads").mkdir()
+    (workdir / "data" / "storage").mkdir(parents=True)
+
+    os.environ["PROVIDER_BACKEND"] = "simulated"
+    os.environ["SIMULATED_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ["SIMULATED_SEED"] = str(args.seed)
+    if args.error_rate is not None:
+        os.environ["SIMULATED_ERROR_RATE"] = str(args.error_rate)
+    if args.rate_limit_rate is not None:
+        os.environ["SIMULATED_RATE_LIMIT_RATE"] = str(args.rate_limit_rate)
+    # Keep the repo's provider profiles and prompt templates while running from workdir
+    os.environ.setdefault("SIMULATED_PROVIDERS_FILE", str(REPO_ROOT / "data" / "simulated_providers.json"))
+    os.environ.setdefault("AI_PROMPT_TEMPLATES_FILE", str(REPO_ROOT / "data" / "prompt_templates.json"))
+    for name, value in PLACEHOLDER_CREDENTIALS.items():
+        os.environ.setdefault(name, value)
+
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    os.chdir(workdir)
+
+
+def git_revision() -> dict:
+    def git(*command) -> str:
+        try:
+            return subprocess.run(["git", *command], cwd=REPO_ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except Exception:
+            return ""
+    return {"commit": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def _provider_delta(before: dict, after: dict) -> dict:
+    return {
+        provider: {name: value - before.get(provider, {}).get(name, 0) for name, value in counters.items()}
+        for provider, counters in after.items()
+        if counters != before.get(provider)
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace) -> list:
+    from benchmarks import scenarios
+    from benchmarks.harness import run_level
+
+    results = []
+    next_index = 0
+    async with scenarios.create_client() as client:
+        for name in args.scenarios:
+            call = scenarios.SCENARIOS[name]
+            if name in ("scheduled-posts", "scheduler-execute"):
+                scenarios.seed_scheduled_posts(args.scheduled_posts)
+
+            for _ in range(args.warmup):
+                await call(client, next_index)
+                next_index += 1
+
+            levels = []
+            for concurrency in args.concurrency:
+                before = scenarios.provider_stats()
+                level = await run_level(lambda index: call(client, index), concurrency, args.requests, first_index=next_index)
+                level["provider_calls"] = _provider_delta(before, scenarios.provider_stats())
+                next_index += args.requests
+                levels.append(level)
+                latency = level["latency_ms"]
+                print(
+                    f"{name:18} c={concurrency:<4} {level['throughput_rps']:8.2f} req/s  "
+                    f"p50={latency['p50']:.1f}ms p95={latency['p95']:.1f}ms p99={latency['p99']:.1f}ms  "
+                    f"lag max={level['loop_lag_ms']['max']:.1f}ms  errors={level['errors']}",
+                    file=sys.stderr
+                )
+            results.append({"scenario": name, "levels": levels})
+    return results
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    output = Path(args.output).resolve()
+    cwd = Path.cwd()
+    workdir = Path(tempfile.mkdtemp(prefix="socialhub-benchmark-"))
+
+    try:
+        configure_environment(args, workdir)
+        if args.tracemalloc:
+            tracemalloc.start()
+        started_at = datetime.now().isoformat()
+        with open(os.devnull, "w") as devnull, (contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull)):
+            results = asyncio.run(run_benchmarks(args))
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "version": 1,
+        "started_at": started_at,
+        "revision": git_revision(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "requests_per_level": args.requests,
+            "concurrency": args.concurrency,
+            "latency_scale": args.latency_scale,
+            "error_rate": args.error_rate,
+            "rate_limit_rate": args.rate_limit_rate,
+            "seed": args.seed,
+            "scheduled_posts": args.scheduled_posts,
+            "tracemalloc": args.tracemalloc
+        },
+        "scenarios": results
+    }
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+    return 0
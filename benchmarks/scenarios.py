@@ -0,0 +1,110 @@
+"""
+Benchmark scenarios for the generate, post and schedule paths
+
+Import this module only after benchmarks.run has configured the environment:
+app settings are read when app.config is first imported.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+import httpx
+from app.main import app, limiter as app_limiter
+from app.config import settings
+from app.clients.simulated import simulated_image, get_simulated_backend
+from app.routes import ai_content, posts, batch
+from app.scheduler.scheduler import execute_scheduled_post_async
+from app.scheduler.storage import save_scheduled_posts
+
+PLATFORMS = {"facebook": True, "instagram": True, "twitter": True, "reddit": True}
+
+# Seconds between publish job status checks
+POLL_INTERVAL = 0.05
+
+
+def create_client() -> httpx.AsyncClient:
+    """In-process client for the FastAPI app (same event loop, so loop lag covers the handlers)"""
+    # Rate limits would turn most benchmark requests into 429s
+    for route_limiter in (app_limiter, ai_content.limiter, posts.limiter, batch.limiter):
+        route_limiter.enabled = False
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=None)
+
+
+def _scheduled_post(index: int, image_path: str) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "caption": f"Benchmark scheduled post {index}",
+        "image_path": image_path,
+        "platforms": PLATFORMS,
+        "scheduled_time": (datetime.now() + timedelta(days=1, minutes=index)).isoformat(),
+        "created_at": datetime.now().isoformat(),
+        "status": "scheduled"
+    }
+
+
+def _sample_image() -> Path:
+    path = settings.UPLOAD_DIR / "benchmark_sample.png"
+    if not path.exists():
+        path.write_bytes(simulated_image("benchmark"))
+    return path
+
+
+async def generate(client: httpx.AsyncClient, index: int) -> bool:
+    """POST /api/generate-content with a unique topic (no cache hits), captions plus a DALL-E image"""
+    response = await client.post("/api/generate-content", json={
+        "topic": f"Benchmark topic number {index} about sustainable city design",
+        "tone": "professional",
+        "generate_image": True,
+        "image_provider": "dalle"
+    })
+    return response.status_code == 200 and response.json().get("success", False)
+
+
+async def post(client: httpx.AsyncClient, index: int) -> bool:
+    """POST /api/post publishing one photo immediately to all four platforms, polled until the job finishes"""
+    response = await client.post(
+        "/api/post",
+        data={"caption": f"Benchmark post {index}", "platforms": '{"facebook": true, "instagram": true, "twitter": true, "reddit": true}'},
+        files={"photo": (f"benchmark_{index}.png", simulated_image(f"post-{index}"), "image/png")}
+    )
+    if response.status_code != 202:
+        return False
+
+    status_url = response.json()["status_url"]
+    while True:
+        await asyncio.sleep(POLL_INTERVAL)
+        status = (await client.get(status_url)).json()
+        if status["status"] in ("completed", "failed"):
+            return status["success"]
+
+
+async def list_scheduled(client: httpx.AsyncClient, index: int) -> bool:
+    """GET /api/scheduled-posts"""
+    response = await client.get("/api/scheduled-posts")
+    return response.status_code == 200
+
+
+async def execute_scheduled(client: httpx.AsyncClient, index: int) -> bool:
+    """Run the scheduler's execute_scheduled_post_async for one post (what APScheduler calls at post time)"""
+    image_path = str(_sample_image())
+    await execute_scheduled_post_async(f"benchmark-{index}", image_path, f"Benchmark scheduled post {index}", PLATFORMS)
+    return True
+
+
+def seed_scheduled_posts(count: int) -> None:
+    """Fill the scheduled posts file so listing and status updates work on a realistic calendar"""
+    image_path = str(_sample_image())
+    save_scheduled_posts([_scheduled_post(index, image_path) for index in range(count)])
+
+
+SCENARIOS = {
+    "generate": generate,
+    "post": post,
+    "scheduled-posts": list_scheduled,
+    "scheduler-execute": execute_scheduled
+}
+
+
+def provider_stats() -> dict:
+    """Calls, errors and rate limits per simulated provider so far"""
+    return get_simulated_backend().stats()
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { FacebookIcon, InstagramIcon, TwitterIcon, RedditIcon } from '../components/SocialIcons'
 import { useGeneratedContent } from '../context/GeneratedContentContext'
+import { waitForPublishJob } from '../utils/publish'
 import './GeneratorPage.css'
 
 function GeneratorPage() {
@@ -80,7 +81,8 @@ function GeneratorPage() {
     setMessage(null)
 
     try {
-      const response = await fetch('/api/generate-content', {
+      // Stream server-sent events so captions appear while they are written
+      const response = await fetch('/api/generate-content/stream', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json'
@@ -95,28 +97,75 @@ function GeneratorPage() {
         })
       })
 
-      const data = await response.json()
-
-      if (response.ok) {
-        setGeneratedContent(data.platforms)
-        setEditedContent(data.platforms)
-        setGeneratedImage(data.image)
-        setImageApprovalStatus(null)
-        setOriginalTopic(prompt)
-        setOriginalTone(tone)
-        setApprovalStatus({})
-        setEnhancedPrompts(data.enhanced_prompts)  // Store enhanced prompts if available
-        
-        // Save to context for persistence
-        saveGeneratedContent(data.platforms, data.image, prompt, tone, imageStyle)
-        
-        const enhancedMsg = data.enhanced_prompts?.enhanced 
-          ? 'Prompt enhanced & content generated!' 
-          : 'Content and image generated!';
-        setMessage({ type: 'success', text: enhancedMsg })
-        setTimeout(() => setMessage(null), 3000)
-      } else {
+      if (!response.ok) {
+        const data = await response.json()
         setMessage({ type: 'error', text: `${data.detail || 'Failed to generate content'}` })
+        return
+      }
+
+      setGeneratedContent({})
+      setEditedContent({})
+      setGeneratedImage(null)
+      setImageApprovalStatus(null)
+      setApprovalStatus({})
+
+      const updateCaption = (platform, update) => {
+        const apply = prev => ({ ...prev, [platform]: update(prev?.[platform] || { content: '', success: true }) })
+        setGeneratedContent(apply)
+        setEditedContent(apply)
+      }
+
+      const handleEvent = (event, data) => {
+        if (event === 'enhanced') {
+          setEnhancedPrompts(data)
+        } else if (event === 'caption_delta') {
+          updateCaption(data.platform, prev => ({ ...prev, content: prev.content + data.delta }))
+        } else if (event === 'caption') {
+          const { platform, ...caption } = data
+          updateCaption(platform, () => caption)
+        } else if (event === 'image') {
+          setGeneratedImage(data)
+        } else if (event === 'complete') {
+          setGeneratedContent(data.platforms)
+          setEditedContent(data.platforms)
+          setGeneratedImage(data.image)
+          setOriginalTopic(prompt)
+          setOriginalTone(tone)
+          setEnhancedPrompts(data.enhanced_prompts)  // Store enhanced prompts if available
+          
+          // Save to context for persistence
+          saveGeneratedContent(data.platforms, data.image, prompt, tone, imageStyle)
+          
+          const enhancedMsg = data.enhanced_prompts?.enhanced 
+            ? 'Prompt enhanced & content generated!' 
+            : 'Content and image generated!';
+          setMessage({ type: 'success', text: enhancedMsg })
+          setTimeout(() => setMessage(null), 3000)
+        } else if (event === 'error') {
+          setMessage({ type: 'error', text: `${data.detail || 'Failed to generate content'}` })
+        }
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffer = ''
+
+      while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+        buffer += decoder.decode(value, { stream: true })
+
+        // Events are separated by a blank line
+        let boundary
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+          const block = buffer.slice(0, boundary)
+          buffer = buffer.slice(boundary + 2)
+          const event = block.match(/^event: (.*)$/m)?.[1]
+          const data = block.match(/^data: (.*)$/m)?.[1]
+          if (event && data) {
+            handleEvent(event, JSON.parse(data))
+          }
+        }
       }
     } catch (error) {
       setMessage({ type: 'error', text: `Error: ${error.message}` })
@@ -306,13 +355,20 @@ function GeneratorPage() {
             body: formData
           })
 
-          if (response.ok) {
+          const data = await response.json()
+          const result = response.status === 202
+            ? await waitForPublishJob(data.status_url, 'http://localhost:8000')
+            : data
+
+          if (response.ok && result.success) {
             successCount++
             console.log(`✅ Successfully posted to ${platform}`)
+          } else if (response.ok) {
+            failedPlatforms.push(platform)
+            console.error(`Failed to post to ${platform}:`, result.results?.[platform]?.error)
           } else {
-            const error = await response.json()
             failedPlatforms.push(platform)
-            console.error(`Failed to post to ${platform}:`, error)
+            console.error(`Failed to post to ${platform}:`, data)
           }
         } catch (err) {
           failedPlatforms.push(platform)
@@ -2,6 +2,7 @@ import { useState, useEffect } from 'react'
 import { useLocation } from 'react-router-dom'
 import { FacebookIcon, InstagramIcon, TwitterIcon, RedditIcon } from '../components/SocialIcons'
 import { useGeneratedContent } from '../context/GeneratedContentContext'
+import { waitForPublishJob } from '../utils/publish'
 import downloadImg from '../assets/rename.jpg'
 import './HomePage.css'
 
@@ -140,9 +141,14 @@ function HomePage() {
         body: formData
       })
 
-      const data = await response.json()
+      let data = await response.json()
+
+      if (response.status === 202) {
+        setMessage({ type: 'success', text: `🚀 ${data.message}` })
+        data = await waitForPublishJob(data.status_url)
+      }
 
-      if (response.ok) {
+      if (response.ok && data.success) {
         setMessage({ type: 'success', text: `🎉 ${data.message}` })
         setCaption('')
         setPhoto(null)
@@ -155,7 +161,7 @@ function HomePage() {
         
         setTimeout(() => setMessage(null), 5000)
       } else {
-        setMessage({ type: 'error', text: `❌ ${data.detail || 'Failed to post'}` })
+        setMessage({ type: 'error', text: `❌ ${data.detail || data.message || 'Failed to post'}` })
       }
     } catch (error) {
       setMessage({ type: 'error', text: `❌ Network error: ${error.message}` })
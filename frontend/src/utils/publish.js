@@ -0,0 +1,15 @@
+// Immediate posts are published in the background: /api/post answers 202 with a
+// status_url to poll until the job is completed or failed.
+export async function waitForPublishJob(statusUrl, baseUrl = '', intervalMs = 1000) {
+  while (true) {
+    await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    const response = await fetch(`${baseUrl}${statusUrl}`)
+    const job = await response.json()
+    if (!response.ok) {
+      throw new Error(job.detail || 'Failed to get publish status')
+    }
+    if (job.status === 'completed' || job.status === 'failed') {
+      return job
+    }
+  }
+}
@@ -120,6 +120,67 @@ def setup_test_files(tmp_path, test_credentials, test_auth_data, test_scheduled_
     # Files will be automatically cleaned up since using tmp_path
 
 
+@pytest.fixture(autouse=True)
+def clear_ai_response_cache():
+    """Keep cached AI responses from leaking between tests"""
+    from app.services.ai_service import response_cache
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_ai_provider_routers():
+    """Keep provider stats and open circuits from leaking between tests"""
+    from app.services.ai_service import image_router, text_router
+    image_router.reset()
+    text_router.reset()
+    yield
+    image_router.reset()
+    text_router.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_ai_usage_meter():
+    """Keep token usage (and budget degradation) from leaking between tests"""
+    from app.services.ai_service import usage_meter
+    usage_meter.reset()
+    yield
+    usage_meter.reset()
+
+
+@pytest.fixture(autouse=True)
+def clear_identity_cache():
+    """Keep cached page / account lookups from leaking between tests"""
+    from app.services.identity_cache import invalidate_identities
+    invalidate_identities()
+    yield
+    invalidate_identities()
+
+
+@pytest.fixture(autouse=True)
+def clear_client_pool():
+    """Keep pooled Twitter / Reddit clients from leaking between tests"""
+    from app.clients.pool import client_pool
+    client_pool.clear()
+    yield
+    client_pool.clear()
+
+
+@pytest.fixture(autouse=True)
+def media_store(tmp_path):
+    """Give every test its own media store and uploads dir, so generated images never land in uploads/"""
+    from app.config import settings
+    from app.services.media_store import MediaStore
+    store = MediaStore(tmp_path / "uploads" / "media", tmp_path / "media_index.sqlite3")
+    with patch('app.services.media_store._store', store), \
+         patch.object(settings, 'UPLOAD_DIR', tmp_path / "uploads"), \
+         patch.object(settings, 'MEDIA_STORE_DIR', tmp_path / "uploads" / "media"), \
+         patch.object(settings, 'MEDIA_INDEX_FILE', tmp_path / "media_index.sqlite3"), \
+         patch.object(settings, 'IMAGE_DERIVATIVES_DIR', tmp_path / "uploads" / "derivatives"):
+        yield store
+
+
 @pytest.fixture
 def mock_openai_response():
     """Mock OpenAI API response"""
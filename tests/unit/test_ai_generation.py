@@ -244,3 +244,909 @@ class TestPromptEnhancement:
             assert "enhanced_content_prompt" in result
             assert "enhanced_image_prompt" in result
 
+
+class TestConcurrentGeneration:
+    """Test concurrent per-platform caption generation"""
+    
+    @staticmethod
+    def _completion(text):
+        return MagicMock(choices=[MagicMock(message=MagicMock(content=text))])
+    
+    @pytest.mark.asyncio
+    async def test_platforms_generated_concurrently(self):
+        """All four platform completions should overlap instead of running back-to-back"""
+        import asyncio
+        import time
+        from app.services.ai_service import generate_platform_content
+        
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.2)
+            return self._completion("Generated post")
+        
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = slow_create
+            
+            started = time.perf_counter()
+            result = await generate_platform_content(
+                topic="Test",
+                generate_image=False,
+                use_prompt_enhancer=False
+            )
+            elapsed = time.perf_counter() - started
+        
+        assert set(result["platforms"]) == {"facebook", "instagram", "twitter", "reddit"}
+        assert all(data["success"] for data in result["platforms"].values())
+        assert elapsed < 0.6
+    
+    @pytest.mark.asyncio
+    async def test_platform_timeout_is_isolated(self):
+        """A platform that exceeds the timeout fails alone without sinking the others"""
+        import asyncio
+        from app.services.ai_service import generate_platform_content
+        
+        async def create(**kwargs):
+            if "TWITTER" in kwargs["messages"][1]["content"]:
+                await asyncio.sleep(5)
+            return self._completion("Generated post")
+        
+        with patch('app.services.ai_service.client') as mock_client, \
+             patch('app.services.ai_service.settings.AI_PLATFORM_TIMEOUT', 0.1):
+            mock_client.chat.completions.create = create
+            
+            result = await generate_platform_content(
+                topic="Test",
+                generate_image=False,
+                use_prompt_enhancer=False
+            )
+        
+        assert result["platforms"]["twitter"]["success"] is False
+        assert "timed out" in result["platforms"]["twitter"]["error"]
+        assert result["platforms"]["facebook"]["success"] is True
+
+
+class TestBatchedGeneration:
+    """Test single-call multi-platform generation"""
+    
+    @pytest.mark.asyncio
+    async def test_batched_falls_back_per_platform(self):
+        """Missing or over-limit platforms are regenerated individually"""
+        from app.services.ai_service import generate_platform_content
+        
+        calls = []
+        
+        async def create(**kwargs):
+            calls.append(kwargs)
+            if "response_format" in kwargs:
+                content = json.dumps({
+                    "facebook": "Batched Facebook post",
+                    "instagram": "Batched Instagram caption",
+                    "twitter": "x" * 400,
+                    "reddit": ""
+                })
+            else:
+                content = "Individual post"
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+        
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = create
+            
+            result = await generate_platform_content(
+                topic="Test",
+                generate_image=False,
+                use_prompt_enhancer=False,
+                generation_mode="batched"
+            )
+        
+        platforms = result["platforms"]
+        assert list(platforms) == ["facebook", "instagram", "twitter", "reddit"]
+        assert platforms["facebook"]["content"] == "Batched Facebook post"
+        assert platforms["twitter"]["content"] == "Individual post"
+        assert platforms["reddit"]["content"] == "Individual post"
+        assert len(calls) == 3
+        assert result["generation_mode"] == "batched"
+
+
+class TestGenerationPipeline:
+    """Test overlapping image generation with caption generation"""
+    
+    @pytest.mark.asyncio
+    async def test_enhanced_image_overlaps_captions(self):
+        """With an enhanced image prompt the image starts before captions finish"""
+        import asyncio
+        import time
+        from app.services.ai_service import generate_platform_content
+        
+        async def slow_create(**kwargs):
+            await asyncio.sleep(0.3)
+            return MagicMock(choices=[MagicMock(message=MagicMock(content="Generated post"))])
+        
+        async def slow_image(*args, **kwargs):
+            await asyncio.sleep(0.3)
+            return {"success": True, "image_url": "https://example.com/image.png", "content_context": kwargs.get("content_context")}
+        
+        enhanced = {
+            "content_prompt": "Enhanced content",
+            "image_prompt": "Enhanced image",
+            "original_prompt": "Test",
+            "enhanced": True
+        }
+        
+        with patch('app.services.ai_service.client') as mock_client, \
+             patch('app.services.ai_service.enhance_user_prompt', AsyncMock(return_value=enhanced)), \
+             patch('app.services.ai_service.generate_image_with_dalle', slow_image):
+            mock_client.chat.completions.create = slow_create
+            
+            started = time.perf_counter()
+            result = await generate_platform_content(topic="Test", image_provider="dalle")
+            elapsed = time.perf_counter() - started
+        
+        assert result["image"]["success"] is True
+        assert result["image"]["content_context"] is None
+        assert elapsed < 0.55
+
+
+class TestResponseCache:
+    """Test the AI response cache"""
+    
+    def test_key_normalizes_whitespace_and_case(self):
+        """Equivalent prompts share a key, different models do not"""
+        from app.services.ai.cache import make_cache_key
+        
+        key = make_cache_key("generate", model="gpt-4o-mini", topic="AI  in Healthcare ", tone="casual")
+        assert key == make_cache_key("generate", model="gpt-4o-mini", topic="ai in healthcare", tone="casual")
+        assert key != make_cache_key("generate", model="gpt-4o", topic="ai in healthcare", tone="casual")
+        assert key.startswith("generate:")
+    
+    def test_key_keeps_case_of_content_being_rewritten(self):
+        """Refine inputs only collapse whitespace; their case changes the output"""
+        from app.services.ai.cache import make_cache_key
+        
+        key = make_cache_key("refine", model="gpt-4o-mini", original_content="Hello  World", platform="twitter", instructions="Shorter")
+        assert key == make_cache_key("refine", model="gpt-4o-mini", original_content="Hello World ", platform="twitter", instructions="Shorter")
+        assert key != make_cache_key("refine", model="gpt-4o-mini", original_content="hello world", platform="twitter", instructions="Shorter")
+        assert key != make_cache_key("refine", model="gpt-4o-mini", original_content="Hello World", platform="twitter", instructions="shorter")
+    
+    def test_memory_cache_lru_and_ttl(self):
+        """Oldest entries are evicted and expired entries miss"""
+        from app.services.ai.cache import MemoryCache, ResponseCache
+        
+        cache = ResponseCache(MemoryCache(max_entries=2), ttl=60)
+        cache.set("a:1", {"value": 1})
+        cache.set("a:2", {"value": 2})
+        assert cache.get("a:1") == {"value": 1}
+        cache.set("a:3", {"value": 3})
+        
+        assert cache.get("a:2") is None
+        assert cache.get("a:3") == {"value": 3}
+        
+        cache.set("a:4", {"value": 4}, ttl=-1)
+        assert cache.get("a:4") is None
+        
+        stats = cache.stats()
+        assert stats["totals"]["hits"] == 2
+        assert stats["totals"]["misses"] == 2
+    
+    def test_sqlite_cache_persists(self, tmp_path):
+        """Entries survive reopening the database"""
+        from app.services.ai.cache import SQLiteCache, ResponseCache
+        
+        path = tmp_path / "cache.sqlite3"
+        ResponseCache(SQLiteCache(path), ttl=60).set("refine:1", {"content": "cached"})
+        
+        cache = ResponseCache(SQLiteCache(path), ttl=60)
+        assert cache.get("refine:1") == {"content": "cached"}
+        assert cache.get("refine:1", bypass=True) is None
+        assert cache.stats()["totals"]["bypasses"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_repeat_generation_served_from_cache(self):
+        """An identical repeat request does not call OpenAI again unless bypassed"""
+        from app.services.ai.cache import MemoryCache, ResponseCache
+        from app.services.ai_service import generate_platform_content
+        
+        create = AsyncMock(return_value=MagicMock(choices=[MagicMock(message=MagicMock(content="Generated post"))]))
+        
+        with patch('app.services.ai_service.client') as mock_client, \
+             patch('app.services.ai_service.response_cache', ResponseCache(MemoryCache())):
+            mock_client.chat.completions.create = create
+            kwargs = dict(topic="Coffee", generate_image=False, use_prompt_enhancer=False)
+            
+            first = await generate_platform_content(**kwargs)
+            second = await generate_platform_content(**kwargs)
+            assert second == first
+            assert create.await_count == 4
+            
+            await generate_platform_content(**kwargs, bypass_cache=True)
+            assert create.await_count == 8
+
+
+class TestFalProvider:
+    """Test the non-blocking fal.ai queue integration"""
+    
+    def _handle(self, statuses):
+        handle = MagicMock(request_id="req-1")
+        handle.status = AsyncMock(side_effect=statuses)
+        handle.get = AsyncMock(return_value={"images": [{"url": "https://example.com/nano.png"}]})
+        handle.cancel = AsyncMock()
+        return handle
+    
+    @pytest.mark.asyncio
+    async def test_submit_then_poll_until_completed(self):
+        """The request is submitted once and polled until fal.ai reports completion"""
+        import fal_client
+        from app.services.ai_service import _run_fal_request
+        
+        handle = self._handle([
+            fal_client.Queued(position=1),
+            fal_client.InProgress(logs=None),
+            fal_client.Completed(logs=None, metrics={})
+        ])
+        fal = MagicMock()
+        fal.submit = AsyncMock(return_value=handle)
+        
+        with patch('app.services.ai_service._get_fal_client', return_value=fal), \
+             patch('app.services.ai_service.settings.FAL_POLL_INITIAL_INTERVAL', 0.01):
+            result = await _run_fal_request("fal-ai/nano-banana", {"prompt": "test"})
+        
+        assert result["images"][0]["url"] == "https://example.com/nano.png"
+        fal.submit.assert_awaited_once()
+        assert handle.status.await_count == 3
+        handle.cancel.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_cancellation_cancels_queued_request(self):
+        """Cancelling the caller also cancels the request on fal.ai"""
+        import asyncio
+        import fal_client
+        from app.services.ai_service import _run_fal_request
+        
+        handle = self._handle(lambda **kwargs: fal_client.Queued(position=3))
+        fal = MagicMock()
+        fal.submit = AsyncMock(return_value=handle)
+        
+        with patch('app.services.ai_service._get_fal_client', return_value=fal), \
+             patch('app.services.ai_service.settings.FAL_POLL_INITIAL_INTERVAL', 0.01):
+            task = asyncio.create_task(_run_fal_request("fal-ai/nano-banana", {"prompt": "test"}))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        handle.cancel.assert_awaited_once()
+        handle.get.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_close_only_closes_a_built_http_client(self):
+        """Shutdown closes the fal.ai HTTP pool if one was opened, and never opens one just to close it"""
+        import fal_client
+        from app.services import ai_service
+        
+        unused = fal_client.AsyncClient(key="test")
+        with patch.object(ai_service, '_fal_client', unused):
+            await ai_service.close_ai_clients()
+            assert ai_service._fal_client is None
+        assert "_client" not in unused.__dict__
+        
+        used = fal_client.AsyncClient(key="test")
+        http_client = used._client
+        with patch.object(ai_service, '_fal_client', used):
+            await ai_service.close_ai_clients()
+        assert http_client.is_closed
+    
+    @pytest.mark.asyncio
+    async def test_client_disconnect_is_not_a_server_error(self):
+        """A client that disconnects mid-generation gets 499, not the endpoint's generic 500"""
+        import asyncio
+        from fastapi import HTTPException
+        from app.routes.ai_content import GenerateRequest, generate_content
+        
+        cancelled = asyncio.Event()
+        
+        async def slow_generation(**kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        http_request = MagicMock()
+        http_request.is_disconnected = AsyncMock(return_value=True)
+        with patch('app.routes.ai_content.generate_platform_content', slow_generation), \
+             patch('app.routes.ai_content.DISCONNECT_POLL_INTERVAL', 0.01):
+            with pytest.raises(HTTPException) as exc_info:
+                # Undecorated endpoint (the rate limiter needs a real request)
+                await generate_content.__wrapped__(GenerateRequest(topic="Test"), http_request)
+        
+        assert exc_info.value.status_code == 499
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+
+class TestStreamingGeneration:
+    """Test the generation event stream"""
+    
+    @pytest.mark.asyncio
+    async def test_stream_yields_deltas_captions_and_complete(self):
+        """Captions are token-streamed and every stage is reported before the final result"""
+        from app.services.ai_service import stream_platform_content
+        
+        async def fake_stream(**kwargs):
+            assert kwargs["stream"] is True
+            
+            async def chunks():
+                for text in ["Hello", " world"]:
+                    yield MagicMock(choices=[MagicMock(delta=MagicMock(content=text))])
+            return chunks()
+        
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = fake_stream
+            events = [
+                (event, data) async for event, data in stream_platform_content(
+                    topic="Test", generate_image=False, use_prompt_enhancer=False
+                )
+            ]
+        
+        names = [event for event, _ in events]
+        assert names[-1] == "complete"
+        assert names.count("caption") == 4
+        assert names.count("caption_delta") == 8
+        
+        captions = {data["platform"]: data for event, data in events if event == "caption"}
+        assert captions["twitter"]["content"] == "Hello world"
+        assert events[-1][1]["platforms"]["reddit"]["content"] == "Hello world"
+    
+    @pytest.mark.asyncio
+    async def test_stream_reports_errors(self):
+        """A failed generation ends the stream with an error event"""
+        from app.services.ai_service import stream_platform_content
+        
+        with patch('app.services.ai_service.client', None):
+            events = [event async for event in stream_platform_content(topic="Test")]
+        
+        assert events == [("error", {"detail": "OpenAI API key not configured"})]
+
+
+class TestHedgedImageGeneration:
+    """Test racing image providers"""
+    
+    @pytest.mark.asyncio
+    async def test_fast_provider_wins_and_loser_is_cancelled(self):
+        """The first successful provider wins and the slower one is cancelled"""
+        import asyncio
+        from app.services.ai_service import _generate_image_with_fallback, image_provider_stats
+        
+        dalle_cancelled = asyncio.Event()
+        
+        async def slow_dalle(*args, **kwargs):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                dalle_cancelled.set()
+                raise
+        
+        async def fast_fal(*args, **kwargs):
+            await asyncio.sleep(0.1)
+            return {"success": True, "image_url": "https://example.com/nano.png"}
+        
+        with patch('app.services.ai_service.generate_image_with_dalle', slow_dalle), \
+             patch('app.services.ai_service.generate_image_with_fal', fast_fal), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_PRIMARY', 'dalle'), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_DELAY', 0.05):
+            result = await _generate_image_with_fallback("hedged", "style", "topic")
+            await asyncio.sleep(0)
+        
+        assert result["image_url"] == "https://example.com/nano.png"
+        assert dalle_cancelled.is_set()
+        
+        stats = image_provider_stats.snapshot()
+        assert stats["nano-banana"]["wins"] == 1
+        assert stats["nano-banana"]["win_rate"] == 1.0
+        assert stats["dalle"]["cancelled"] == 1
+        assert stats["dalle"]["races"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_providers_never_started_are_not_counted_as_racing(self):
+        """A primary that wins inside the hedge delay races alone"""
+        from app.services.ai_service import _generate_image_with_fallback, image_provider_stats
+        
+        async def dalle(*args, **kwargs):
+            return {"success": True, "image_url": "https://example.com/dalle.png"}
+        
+        fal = AsyncMock()
+        with patch('app.services.ai_service.generate_image_with_dalle', dalle), \
+             patch('app.services.ai_service.generate_image_with_fal', fal), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_PRIMARY', 'dalle'), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_DELAY', 10):
+            await _generate_image_with_fallback("hedged", "style", "topic")
+        
+        stats = image_provider_stats.snapshot()
+        fal.assert_not_called()
+        assert stats["dalle"]["races"] == 1 and stats["dalle"]["wins"] == 1
+        assert stats.get("nano-banana", {}).get("races", 0) == 0
+    
+    @pytest.mark.asyncio
+    async def test_primary_failure_starts_secondary_immediately(self):
+        """A failed primary doesn't wait out the hedge delay"""
+        import time
+        from app.services.ai_service import _generate_image_with_fallback, image_provider_stats
+        
+        async def failing_fal(*args, **kwargs):
+            raise Exception("fal unavailable")
+        
+        async def dalle(*args, **kwargs):
+            return {"success": True, "image_url": "https://example.com/dalle.png"}
+        
+        with patch('app.services.ai_service.generate_image_with_dalle', dalle), \
+             patch('app.services.ai_service.generate_image_with_fal', failing_fal), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_PRIMARY', 'nano-banana'), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_DELAY', 10):
+            started = time.perf_counter()
+            result = await _generate_image_with_fallback("hedged", "style", "topic")
+            elapsed = time.perf_counter() - started
+        
+        assert result["image_url"] == "https://example.com/dalle.png"
+        assert elapsed < 1
+        assert image_provider_stats.snapshot()["nano-banana"]["failures"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_both_providers_failing_raises(self):
+        """The race fails only when every provider has failed"""
+        from fastapi import HTTPException
+        from app.services.ai_service import _generate_image_with_fallback
+        
+        async def dalle(*args, **kwargs):
+            return {"success": False, "error": "content policy"}
+        
+        async def fal(*args, **kwargs):
+            raise Exception("fal unavailable")
+        
+        with patch('app.services.ai_service.generate_image_with_dalle', dalle), \
+             patch('app.services.ai_service.generate_image_with_fal', fal), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_DELAY', 0):
+            with pytest.raises(HTTPException) as exc_info:
+                await _generate_image_with_fallback("hedged", "style", "topic")
+        
+        assert "content policy" in exc_info.value.detail
+        assert "fal unavailable" in exc_info.value.detail
+
+
+class TestProviderRouting:
+    """Test adaptive provider selection and circuit breaking"""
+    
+    def test_circuit_opens_after_consecutive_failures_and_half_opens(self):
+        """A failing provider is skipped until the reset timeout, then gets one trial call"""
+        import time
+        from app.services.ai.provider_router import ProviderRouter
+        
+        router = ProviderRouter(failure_threshold=2, reset_timeout=0.05)
+        router.record("dalle", 1.0, success=False)
+        assert router.available("dalle")
+        router.record("dalle", 1.0, success=False)
+        assert not router.available("dalle")
+        
+        time.sleep(0.06)
+        assert router.allow("dalle")
+        assert not router.allow("dalle")  # Only one trial at a time
+        router.record("dalle", 0.5, success=True)
+        assert router.snapshot()["dalle"]["circuit"] == "closed"
+    
+    def test_rank_prefers_fast_reliable_providers(self):
+        """Ranking uses median latency inflated by the error rate"""
+        from app.services.ai.provider_router import ProviderRouter
+        
+        router = ProviderRouter()
+        for _ in range(5):
+            router.record("dalle", 12.0, success=True)
+            router.record("nano-banana", 2.0, success=True)
+        assert router.rank(["dalle", "nano-banana"]) == ["nano-banana", "dalle"]
+        
+        for _ in range(40):
+            router.record("nano-banana", 2.0, success=False)
+        assert router.rank(["dalle", "nano-banana"]) == ["dalle", "nano-banana"]
+    
+    @pytest.mark.asyncio
+    async def test_open_circuit_skips_provider_without_calling_it(self):
+        """A provider with an open circuit isn't called, even when it was selected"""
+        from app.services.ai_service import _generate_image_with_fallback, image_router
+        
+        fal = AsyncMock(return_value={"success": True, "image_url": "https://example.com/nano.png"})
+        dalle = AsyncMock(return_value={"success": True, "image_url": "https://example.com/dalle.png"})
+        for _ in range(image_router.failure_threshold):
+            image_router.record("dalle", 1.0, success=False)
+        
+        with patch('app.services.ai_service.generate_image_with_dalle', dalle), \
+             patch('app.services.ai_service.generate_image_with_fal', fal):
+            result = await _generate_image_with_fallback("dalle", "style", "topic")
+        
+        assert result["image_url"] == "https://example.com/nano.png"
+        dalle.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_auto_uses_fastest_provider(self):
+        """image_provider="auto" starts with the provider that has been fastest"""
+        from app.services.ai_service import _generate_image_with_fallback, image_router
+        
+        for _ in range(5):
+            image_router.record("dalle", 1.0, success=True)
+            image_router.record("nano-banana", 8.0, success=True)
+        
+        fal = AsyncMock(return_value={"success": True, "image_url": "https://example.com/nano.png"})
+        dalle = AsyncMock(return_value={"success": True, "image_url": "https://example.com/dalle.png"})
+        with patch('app.services.ai_service.generate_image_with_dalle', dalle), \
+             patch('app.services.ai_service.generate_image_with_fal', fal):
+            result = await _generate_image_with_fallback("auto", "style", "topic")
+        
+        assert result["image_url"] == "https://example.com/dalle.png"
+        fal.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_open_text_circuit_fails_fast(self):
+        """Caption generation doesn't call OpenAI while its circuit is open"""
+        from app.services.ai_service import _create_chat_completion, text_router
+        from fastapi import HTTPException
+        
+        for _ in range(text_router.failure_threshold):
+            text_router.record("openai", 1.0, success=False)
+        
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock()
+            with pytest.raises(HTTPException) as exc_info:
+                await _create_chat_completion(model="gpt-4o-mini", messages=[])
+        
+        assert exc_info.value.status_code == 503
+        mock_client.chat.completions.create.assert_not_awaited()
+    
+    @pytest.mark.asyncio
+    async def test_hung_openai_opens_text_circuit(self):
+        """Timeouts count as failures (not caller cancellations), so a hung endpoint trips the breaker"""
+        import asyncio
+        from app.services.ai_service import _create_chat_completion, _stream_chat_completion, text_router
+        
+        async def hang(**kwargs):
+            await asyncio.sleep(5)
+        
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = hang
+            for _ in range(text_router.failure_threshold - 1):
+                with pytest.raises(asyncio.TimeoutError):
+                    await _create_chat_completion(timeout=0.05, model="gpt-4o-mini", messages=[])
+            with pytest.raises(asyncio.TimeoutError):
+                async for _ in _stream_chat_completion(timeout=0.05, model="gpt-4o-mini", messages=[]):
+                    pass
+        
+        snapshot = text_router.snapshot()["openai"]
+        assert snapshot["circuit"] == "open"
+        assert snapshot["cancelled"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_wait_gives_back_half_open_trial(self):
+        """A caller cancelled while waiting for a slot or rate-limit token doesn't keep the circuit's trial"""
+        import asyncio
+        from app.services.ai_service import _create_chat_completion, _generate_image_with_provider, text_router, image_router
+        
+        async def never(provider):
+            await asyncio.Event().wait()
+        
+        for router, provider in ((text_router, "openai"), (image_router, "dalle")):
+            for _ in range(router.failure_threshold):
+                router.record(provider, 1.0, success=False)
+            router._breaker(provider).opened_at -= router.reset_timeout
+        
+        with patch('app.services.ai_service._openai_slots', asyncio.Semaphore(0)), \
+             patch('app.services.ai_service.throttle', never):
+            for call in (
+                _create_chat_completion(model="gpt-4o-mini", messages=[]),
+                _generate_image_with_provider("dalle", "style", "topic")
+            ):
+                task = asyncio.ensure_future(call)
+                await asyncio.sleep(0.01)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+        
+        assert text_router.available("openai")
+        assert image_router.available("dalle")
+
+
+class TestPromptTemplates:
+    """Test the precompiled prompt template registry"""
+    
+    def test_prompts_are_precompiled(self):
+        """Every platform/tone caption prompt is built once and only the topic is filled in"""
+        from app.services.ai.templates import PromptTemplates
+        
+        templates = PromptTemplates.build()
+        system, prompt = templates.caption_prompt("twitter", "corporate", "Product launch")
+        
+        assert ("twitter", "corporate") in templates.captions
+        assert "twitter" in system.lower()
+        assert "Product launch" in prompt
+        assert "100 characters" in prompt
+        assert templates.image_prompt_style("casual", "anime").startswith("Japanese anime art style")
+    
+    def test_templates_are_read_only(self):
+        """Shared templates can't be mutated by a request"""
+        from app.services.ai.templates import PromptTemplates
+        
+        templates = PromptTemplates.build()
+        with pytest.raises(TypeError):
+            templates.platforms("casual")["twitter"]["max_length"] = 1000
+    
+    def test_registry_reloads_changed_file(self, tmp_path):
+        """Editing the overrides file swaps in new templates with a new version"""
+        import json
+        import os
+        from app.services.ai.templates import TemplateRegistry
+        
+        path = tmp_path / "prompt_templates.json"
+        registry = TemplateRegistry(path, check_interval=0)
+        default_version = registry.get().version
+        
+        path.write_text(json.dumps({"platform_briefs": {"default": {"twitter": {"max_length": 200}}}}))
+        os.utime(path, (1, 1))
+        templates = registry.get()
+        
+        assert templates.version != default_version
+        assert templates.platforms("casual")["twitter"]["max_length"] == 200
+        assert templates.platforms("casual")["twitter"]["style"] == "concise and punchy"
+        assert "200 characters" in templates.caption_prompt("twitter", "casual", "topic")[1]
+    
+    def test_invalid_file_keeps_last_good_templates(self, tmp_path):
+        """A broken overrides file doesn't take generation down"""
+        import os
+        from app.services.ai.templates import TemplateRegistry
+        
+        path = tmp_path / "prompt_templates.json"
+        registry = TemplateRegistry(path, check_interval=0)
+        good = registry.get()
+        
+        path.write_text("{not json")
+        os.utime(path, (2, 2))
+        
+        assert registry.get() is good
+
+
+class TestUsageMetering:
+    """Test token accounting and daily budgets"""
+    
+    @pytest.mark.asyncio
+    async def test_usage_is_recorded_per_platform(self):
+        """Every caption's token usage is attributed to its endpoint, tone and platform"""
+        from app.services.ai_service import generate_platform_content, usage_meter
+        
+        response = MagicMock(
+            choices=[MagicMock(message=MagicMock(content="Post"))],
+            usage=MagicMock(prompt_tokens=100, completion_tokens=20)
+        )
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock(return_value=response)
+            await generate_platform_content(topic="Test", tone="funny", generate_image=False, use_prompt_enhancer=False)
+        
+        day = next(iter(usage_meter.snapshot()["days"].values()))
+        assert day["totals"]["total_tokens"] == 480
+        twitter = [row for row in day["breakdown"] if row["platform"] == "twitter"]
+        assert twitter[0]["endpoint"] == "generate"
+        assert twitter[0]["tone"] == "funny"
+        assert twitter[0]["prompt_tokens"] == 100
+    
+    @pytest.mark.asyncio
+    async def test_streamed_usage_comes_from_final_chunk(self):
+        """Streaming asks for usage and records it from the last chunk"""
+        from app.services.ai_service import _stream_chat_completion, usage_meter
+        
+        async def fake_stream(**kwargs):
+            assert kwargs["stream_options"] == {"include_usage": True}
+            
+            async def chunks():
+                yield MagicMock(choices=[MagicMock(delta=MagicMock(content="Hi"))], usage=None)
+                yield MagicMock(choices=[], usage=MagicMock(prompt_tokens=50, completion_tokens=5))
+            return chunks()
+        
+        with patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = fake_stream
+            deltas = [delta async for delta in _stream_chat_completion(model="gpt-4o-mini", messages=[])]
+        
+        assert deltas == ["Hi"]
+        assert usage_meter.usage_today()["total_tokens"] == 55
+    
+    @pytest.mark.asyncio
+    async def test_budget_degrades_instead_of_failing(self):
+        """Past the token budget generation uses the fallback model, one batched call and no enhancer"""
+        from app.services.ai_service import generate_platform_content, usage_meter
+        
+        models = []
+        
+        async def fake_create(**kwargs):
+            models.append(kwargs["model"])
+            return MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps({
+                "facebook": "FB", "instagram": "IG", "twitter": "TW", "reddit": "RD"
+            })))])
+        
+        with patch.object(usage_meter, 'token_budget', 1000), \
+             patch.object(usage_meter, 'image_budget', 1), \
+             patch.object(usage_meter, 'fallback_model', 'gpt-cheap'), \
+             patch('app.services.ai_service.client') as mock_client:
+            usage_meter.record("gpt-4o-mini", prompt_tokens=1000)
+            usage_meter.record("dall-e-3", images=1)
+            mock_client.chat.completions.create = fake_create
+            result = await generate_platform_content(topic="Test", generate_image=True, use_prompt_enhancer=True)
+        
+        assert models == ["gpt-cheap"]
+        assert result["budget_level"] == "exhausted"
+        assert result["generation_mode"] == "batched"
+        assert result["enhanced_prompts"] is None
+        assert result["image"]["skipped"] is True
+        assert result["platforms"]["twitter"]["content"] == "TW"
+
+    def test_fallback_equal_to_primary_model_is_ignored(self):
+        """A fallback that is missing or the same as the primary model keeps the primary model"""
+        from app.services.ai.metering import UsageMeter
+
+        for fallback in (None, "", "gpt-4o-mini"):
+            meter = UsageMeter("gpt-4o-mini", fallback_model=fallback, token_budget=100)
+            meter.record("gpt-4o-mini", prompt_tokens=90)
+            policy = meter.policy()
+            assert meter.fallback_model is None
+            assert policy["level"] == "economy"
+            assert policy["model"] == "gpt-4o-mini"
+            assert policy["use_prompt_enhancer"] is False
+
+        meter = UsageMeter("gpt-4o", fallback_model="gpt-4o-mini", token_budget=100)
+        meter.record("gpt-4o", prompt_tokens=90)
+        assert meter.policy()["model"] == "gpt-4o-mini"
+
+
+class TestSingleFlight:
+    """Test deduplication of identical concurrent requests"""
+    
+    @pytest.mark.asyncio
+    async def test_identical_requests_share_one_call(self):
+        """Two identical regenerations make one provider call and both get the image"""
+        import asyncio
+        from app.services.ai_service import regenerate_image
+        
+        async def slow_image(*args, **kwargs):
+            await asyncio.sleep(0.05)
+            return {"success": True, "image_url": "https://example.com/dalle.png"}
+        
+        dalle = AsyncMock(side_effect=slow_image)
+        with patch('app.services.ai_service.generate_image_with_dalle', dalle):
+            first, second = await asyncio.gather(
+                regenerate_image("Coffee  shop", image_provider="dalle"),
+                regenerate_image("coffee shop", image_provider="dalle")
+            )
+        
+        assert dalle.await_count == 1
+        assert first == second
+        assert first is not second
+    
+    @pytest.mark.asyncio
+    async def test_call_survives_until_last_waiter_cancels(self):
+        """Cancelling one waiter keeps the shared call running; cancelling all cancels it"""
+        import asyncio
+        from app.services.ai.singleflight import SingleFlight
+        
+        flight = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+        
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+        
+        first = asyncio.create_task(flight.run("key", work))
+        second = asyncio.create_task(flight.run("key", work))
+        await started.wait()
+        
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not cancelled.is_set()
+        assert flight.in_flight() == 1
+        
+        second.cancel()
+        await asyncio.sleep(0.01)
+        assert cancelled.is_set()
+        assert flight.in_flight() == 0
+
+
+class TestSemanticCache:
+    """Test near-duplicate reuse of prompt enhancements"""
+    
+    def test_near_duplicates_match_within_partition(self):
+        """Reworded topics match; different topics and other tones/styles don't"""
+        from app.services.ai.semantic_cache import SemanticCache
+        
+        cache = SemanticCache(threshold=0.9)
+        cache.set("AI in healthcare", "casual/realistic", {"content_prompt": "enhanced"})
+        
+        assert cache.get("ai in health care!", "casual/realistic") == {"content_prompt": "enhanced"}
+        assert cache.get("AI in education", "casual/realistic") is None
+        assert cache.get("AI in healthcare", "funny/anime") is None
+    
+    def test_eviction_keeps_frequently_used_entries(self):
+        """Over capacity, entries that were never reused go first"""
+        from app.services.ai.semantic_cache import SemanticCache
+        
+        cache = SemanticCache(max_entries=3)
+        cache.set("summer sale", "p", {"n": 1})
+        cache.set("coffee shop opening", "p", {"n": 2})
+        cache.set("product launch party", "p", {"n": 3})
+        assert cache.get("Summer sale!", "p") is not None
+        
+        cache.set("team building tips", "p", {"n": 4})
+        
+        assert len(cache) == 3
+        assert cache.get("summer sale", "p") == {"n": 1}
+        assert cache.stats()["evictions"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_enhancer_reuses_similar_topic(self):
+        """A reworded topic gets the stored enhancement without another OpenAI call"""
+        from app.services.ai.semantic_cache import SemanticCache
+        from app.services.ai_service import enhance_user_prompt
+        
+        response = MagicMock(choices=[MagicMock(message=MagicMock(content=json.dumps({
+            "content_prompt": "Enhanced content", "image_prompt": "Enhanced image"
+        })))])
+        with patch('app.services.ai_service.semantic_cache', SemanticCache()), \
+             patch('app.services.ai_service.client') as mock_client:
+            mock_client.chat.completions.create = AsyncMock(return_value=response)
+            await enhance_user_prompt("AI in healthcare", "casual", "realistic")
+            result = await enhance_user_prompt("ai in health care!", "casual", "realistic")
+        
+        assert mock_client.chat.completions.create.await_count == 1
+        assert result["content_prompt"] == "Enhanced content"
+        assert result["original_prompt"] == "ai in health care!"
+
+
+class TestImageDownload:
+    """Test streaming provider images to disk"""
+    
+    @staticmethod
+    def _client(body: bytes, content_type: str = "image/png"):
+        import httpx
+        
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": content_type}, content=body)
+        return lambda name: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    
+    @pytest.mark.asyncio
+    async def test_download_streams_and_hashes(self, tmp_path):
+        """The image lands under its final name with its size and sha256"""
+        import hashlib
+        from app.services.ai.downloads import download_image
+        
+        directory = tmp_path / "images"
+        directory.mkdir()
+        body = b"\x89PNG" + b"x" * 200000
+        with patch('app.services.ai.downloads.get_http_client', self._client(body)):
+            artifact = await download_image("https://img.test/a.png", directory, "a.png", max_bytes=10**6)
+        
+        assert (directory / "a.png").read_bytes() == body
+        assert artifact["size_bytes"] == len(body)
+        assert artifact["sha256"] == hashlib.sha256(body).hexdigest()
+        assert list(directory.iterdir()) == [directory / "a.png"]
+    
+    @pytest.mark.asyncio
+    async def test_oversized_download_is_aborted(self, tmp_path):
+        """Images over the limit raise and leave nothing behind"""
+        from app.services.ai.downloads import download_image
+        
+        directory = tmp_path / "images"
+        directory.mkdir()
+        with patch('app.services.ai.downloads.get_http_client', self._client(b"x" * 5000)):
+            with pytest.raises(ValueError):
+                await download_image("https://img.test/a.png", directory, "a.png", max_bytes=1000)
+        
+        assert list(directory.iterdir()) == []
+    
+    @pytest.mark.asyncio
+    async def test_non_image_response_is_rejected(self, tmp_path):
+        from app.services.ai.downloads import download_image
+        
+        with patch('app.services.ai.downloads.get_http_client', self._client(b"<html>", "text/html")):
+            with pytest.raises(ValueError):
+                await download_image("https://img.test/a.png", tmp_path, "a.png", max_bytes=1000)
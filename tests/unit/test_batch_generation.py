@@ -0,0 +1,239 @@
+"""
+Unit tests for batch content generation
+"""
+import pytest
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock, patch
+
+
+@pytest.fixture
+def batch_dir(tmp_path):
+    """Store batch jobs in a temporary directory, with fresh worker slots and no rate limits"""
+    import asyncio
+    from app.services.ai.rate_limit import ProviderRateLimiter
+    
+    with patch('app.services.batch_service.settings.BATCH_JOBS_DIR', tmp_path / "batch_jobs"), \
+         patch('app.services.batch_service._batch_slots', asyncio.Semaphore(3)), \
+         patch('app.services.batch_service.rate_limiter', ProviderRateLimiter({})):
+        yield tmp_path / "batch_jobs"
+
+
+def _result(topic):
+    return {
+        "success": True,
+        "platforms": {
+            "facebook": {"content": f"FB {topic}", "success": True, "character_count": 10},
+            "twitter": {"content": f"Tweet {topic}", "success": True, "character_count": 10}
+        },
+        "image": {"success": True, "local_path": f"uploads/ai_generated/{topic}.png"},
+        "topic": topic
+    }
+
+
+class TestTokenBucket:
+    """Test provider rate limiting"""
+
+    @pytest.mark.asyncio
+    async def test_bucket_paces_after_burst(self):
+        """Requests beyond the burst capacity wait for refill"""
+        import time
+        from app.services.ai.rate_limit import TokenBucket
+
+        bucket = TokenBucket(per_minute=600, capacity=2)  # 10 tokens per second
+        started = time.perf_counter()
+        for _ in range(4):
+            await bucket.acquire()
+        elapsed = time.perf_counter() - started
+
+        assert 0.15 < elapsed < 0.5
+
+    @pytest.mark.asyncio
+    async def test_unlimited_provider_passes_through(self):
+        """Providers without a limit are not throttled"""
+        from app.services.ai.rate_limit import ProviderRateLimiter
+
+        limiter = ProviderRateLimiter({"dalle": 0})
+        await limiter.acquire("dalle")
+        await limiter.acquire("unknown")
+        assert limiter.buckets == {}
+
+
+    @pytest.mark.asyncio
+    async def test_batch_items_pay_per_provider_call(self, batch_dir):
+        """Each OpenAI call and each image provider actually called takes a token"""
+        from app.services import ai_service
+        from app.services.ai.rate_limit import ProviderRateLimiter
+        from app.services.batch_service import create_batch_job, run_batch_job
+
+        class CountingLimiter(ProviderRateLimiter):
+            def __init__(self):
+                super().__init__({})
+                self.calls = []
+
+            async def acquire(self, provider, tokens=1.0):
+                self.calls.append(provider)
+
+        async def failing_fal(*args, **kwargs):
+            raise Exception("fal unavailable")
+
+        async def dalle(*args, **kwargs):
+            return {"success": True, "image_url": "https://example.com/dalle.png"}
+
+        async def fake_generate(**kwargs):
+            # enhance + four per-platform captions, then a hedged image whose primary fails
+            for _ in range(5):
+                await ai_service._create_chat_completion(model="gpt-4o-mini", messages=[])
+            return {"image": await ai_service._generate_image_with_fallback(kwargs["image_provider"], "style", kwargs["topic"])}
+
+        limiter = CountingLimiter()
+        with patch('app.services.batch_service.rate_limiter', limiter), \
+             patch('app.services.batch_service.generate_platform_content', fake_generate), \
+             patch('app.services.ai_service.client') as mock_client, \
+             patch('app.services.ai_service.generate_image_with_fal', failing_fal), \
+             patch('app.services.ai_service.generate_image_with_dalle', dalle), \
+             patch('app.services.ai_service.settings.AI_IMAGE_HEDGE_PRIMARY', 'nano-banana'):
+            mock_client.chat.completions.create = AsyncMock(return_value=MagicMock(usage=None))
+            job = create_batch_job([{"topic": "monday", "generate_image": True, "image_provider": "hedged"}])
+            await run_batch_job(job["id"])
+
+            assert sorted(limiter.calls) == ["dalle", "nano-banana"] + ["openai"] * 5
+
+            # Interactive requests outside a batch are not throttled
+            await ai_service._create_chat_completion(model="gpt-4o-mini", messages=[])
+        assert len(limiter.calls) == 7
+
+
+class TestBatchJobs:
+    """Test batch job execution and persistence"""
+
+    @pytest.mark.asyncio
+    async def test_job_runs_items_and_persists_results(self, batch_dir):
+        """Every item is generated and the job file records the results"""
+        from app.services.batch_service import create_batch_job, run_batch_job, get_batch_job
+
+        async def fake_generate(**kwargs):
+            if kwargs["topic"] == "broken":
+                raise Exception("OpenAI unavailable")
+            return _result(kwargs["topic"])
+
+        with patch('app.services.batch_service.generate_platform_content', fake_generate):
+            job = create_batch_job([
+                {"topic": "monday", "generate_image": True, "image_provider": "nano-banana"},
+                {"topic": "broken", "generate_image": False},
+                {"topic": "wednesday", "generate_image": True, "image_provider": "nano-banana"}
+            ])
+            await run_batch_job(job["id"])
+
+        saved = get_batch_job(job["id"])
+        assert saved["status"] == "completed"
+        assert saved["completed"] == 2
+        assert saved["failed"] == 1
+        assert [item["status"] for item in saved["items"]] == ["completed", "failed", "completed"]
+        assert saved["items"][2]["result"]["platforms"]["facebook"]["content"] == "FB wednesday"
+        assert saved["items"][1]["error"] == "OpenAI unavailable"
+
+    @pytest.mark.asyncio
+    async def test_worker_pool_is_bounded(self, batch_dir):
+        """No more than BATCH_WORKERS generations run at once"""
+        import asyncio
+        from app.services import batch_service
+
+        running = 0
+        peak = 0
+
+        async def fake_generate(**kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.05)
+            running -= 1
+            return _result(kwargs["topic"])
+
+        with patch('app.services.batch_service.generate_platform_content', fake_generate), \
+             patch.object(batch_service, '_batch_slots', asyncio.Semaphore(2)):
+            job = batch_service.create_batch_job([{"topic": f"day {i}", "generate_image": False} for i in range(6)])
+            await batch_service.run_batch_job(job["id"])
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_outputs_are_scheduled(self, batch_dir):
+        """With a schedule, each output becomes a scheduled post one interval apart"""
+        from app.services.batch_service import create_batch_job, run_batch_job
+
+        stored = []
+        mock_scheduler = MagicMock()
+
+        with patch('app.services.batch_service.generate_platform_content', AsyncMock(side_effect=lambda **kw: _result(kw["topic"]))), \
+             patch('app.services.batch_service.scheduler', mock_scheduler), \
+             patch('app.services.batch_service.load_scheduled_posts', return_value=stored), \
+             patch('app.services.batch_service.save_scheduled_posts'):
+            job = create_batch_job(
+                [{"topic": "monday", "generate_image": False}, {"topic": "tuesday", "generate_image": False}],
+                schedule={"start": datetime(2030, 1, 6, 9, 0), "interval_minutes": 1440, "platforms": {"facebook": True}}
+            )
+            job = await run_batch_job(job["id"])
+
+        assert [post["scheduled_time"] for post in stored] == ["2030-01-06T09:00:00", "2030-01-07T09:00:00"]
+        assert stored[1]["caption"] == "FB tuesday"
+        assert job["items"][0]["scheduled_post_id"] == stored[0]["id"]
+        assert mock_scheduler.add_job.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_scheduled_outputs_hold_the_image_in_local_time(self, batch_dir, media_store):
+        """An aware start is stored as naive local time and each post takes a reference on its image"""
+        from datetime import timezone
+        from app.services.batch_service import create_batch_job, run_batch_job
+
+        image = media_store.put_bytes(b"generated image", "generated")
+        result = dict(_result("launch"), image={"success": True, "local_path": image["local_path"]})
+        stored = []
+        mock_scheduler = MagicMock()
+        start = datetime(2030, 1, 6, 9, 0, tzinfo=timezone.utc)
+
+        with patch('app.services.batch_service.generate_platform_content', AsyncMock(return_value=result)), \
+             patch('app.services.batch_service.scheduler', mock_scheduler), \
+             patch('app.services.batch_service.load_scheduled_posts', return_value=stored), \
+             patch('app.services.batch_service.save_scheduled_posts'):
+            job = create_batch_job(
+                [{"topic": "launch", "generate_image": True}],
+                schedule={"start": start, "interval_minutes": 60, "platforms": {"facebook": True}}
+            )
+            await run_batch_job(job["id"])
+
+        local = start.astimezone().replace(tzinfo=None)
+        assert stored[0]["scheduled_time"] == local.isoformat()
+        assert mock_scheduler.add_job.call_args.kwargs["trigger"].run_date.replace(tzinfo=None) == local
+        assert media_store.refcount(image["sha256"]) == 2
+        assert datetime.fromisoformat(stored[0]["scheduled_time"]) > datetime.now()
+
+    def test_resume_only_takes_over_orphaned_jobs(self, batch_dir):
+        """Jobs another live worker is running are left alone; crashed or stale ones are claimed"""
+        import json
+        import os
+        import socket
+        import subprocess
+        import sys
+        import time
+        from app.services.batch_service import create_batch_job, get_batch_job, resume_batch_jobs
+
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        owners = {
+            "worker": {"pid": os.getppid(), "host": socket.gethostname()},  # alive, e.g. another uvicorn worker
+            "crashed": {"pid": exited.pid, "host": socket.gethostname()},
+            "remote-stale": {"pid": 1, "host": "other-host"}
+        }
+        job_ids = {}
+        for name, owner in owners.items():
+            job = create_batch_job([{"topic": name}])
+            job.update(status="running", owner=owner, heartbeat_at=time.time() - (600 if name == "remote-stale" else 0))
+            (batch_dir / f"{job['id']}.json").write_text(json.dumps(job))
+            job_ids[job["id"]] = name
+
+        started = []
+        with patch('app.services.batch_service.start_batch_job', started.append):
+            resume_batch_jobs()
+
+        assert sorted(job_ids[job_id] for job_id in started) == ["crashed", "remote-stale"]
+        assert all(get_batch_job(job_id)["owner"]["pid"] == os.getpid() for job_id in started)
@@ -0,0 +1,62 @@
+"""
+Unit tests for the benchmark harness
+"""
+import asyncio
+import time
+import pytest
+
+
+class TestBenchmarkHarness:
+    """Test load generation, measurement and result comparison"""
+
+    def test_percentile_nearest_rank(self):
+        from benchmarks.harness import percentile
+        samples = [float(value) for value in range(1, 101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 95) == 95.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile([], 99) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_run_level_counts_requests_and_errors(self):
+        """Every index runs once, failures and exceptions count as errors"""
+        from benchmarks.harness import run_level
+        seen = []
+
+        async def call(index):
+            seen.append(index)
+            await asyncio.sleep(0.01)
+            if index == 12:
+                raise RuntimeError("boom")
+            return index % 5 != 0
+
+        level = await run_level(call, concurrency=4, requests=20, first_index=10)
+
+        assert sorted(seen) == list(range(10, 30))
+        assert level["errors"] == 5  # 10, 15, 20, 25 fail, 12 raises
+        assert level["latency_ms"]["p50"] >= 10
+        assert level["throughput_rps"] > 0
+
+    @pytest.mark.asyncio
+    async def test_loop_lag_detects_blocking(self):
+        """A call that blocks the event loop shows up as loop lag"""
+        from benchmarks.harness import run_level
+
+        async def blocking(index):
+            time.sleep(0.05)
+            return True
+
+        level = await run_level(blocking, concurrency=1, requests=3)
+        assert level["loop_lag_ms"]["max"] >= 40
+
+    def test_compare_flags_regressions(self):
+        from benchmarks.compare import compare
+
+        def report(throughput, p95):
+            return {"scenarios": [{"scenario": "post", "levels": [
+                {"concurrency": 4, "throughput_rps": throughput, "latency_ms": {"p95": p95}, "errors": 0}
+            ]}]}
+
+        assert not compare(report(10, 100), report(9.5, 105), threshold=10)[0]["regression"]
+        assert compare(report(10, 100), report(8, 100), threshold=10)[0]["regression"]
+        assert compare(report(10, 100), report(10, 130), threshold=10)[0]["regression"]
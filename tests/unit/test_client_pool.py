@@ -0,0 +1,85 @@
+"""
+Unit tests for the pooled Twitter and Reddit clients
+"""
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+TWITTER = {"api_key": "k", "api_secret": "s", "access_token": "t", "access_token_secret": "ts"}
+REDDIT = {"client_id": "id", "client_secret": "secret", "username": "u", "password": "p", "user_agent": "tests"}
+
+
+class TestClientPool:
+    """Test clients reused per credential set"""
+
+    def test_twitter_clients_are_reused_until_credentials_change(self, tmp_path):
+        from app.services import credentials_service
+        from app.clients import get_twitter_v1_client, get_twitter_v2_client
+
+        credentials_file = tmp_path / "credentials.json"
+        credentials_file.write_text("{}")
+        with patch.object(credentials_service, 'get_credentials_file_path', return_value=str(credentials_file)):
+            credentials_service.update_platform_credentials("twitter", TWITTER)
+            with patch.object(credentials_service, 'load_credentials', wraps=credentials_service.load_credentials) as load:
+                api, client = get_twitter_v1_client(), get_twitter_v2_client()
+                assert get_twitter_v1_client() is api
+                assert get_twitter_v2_client() is client
+            assert load.call_count == 1  # the file is read once, not per lookup
+
+            with patch.object(client.session, 'close') as close:
+                credentials_service.update_platform_credentials("twitter", dict(TWITTER, access_token="rotated"))
+            close.assert_called_once()
+            assert get_twitter_v2_client() is not client
+            assert get_twitter_v2_client().access_token == "rotated"
+
+    def test_credentials_changed_by_another_process_are_picked_up(self, tmp_path):
+        import json
+        import os
+        from app.services import credentials_service
+        from app.clients import get_reddit_client
+
+        credentials_file = tmp_path / "credentials.json"
+        credentials_file.write_text(json.dumps({"reddit": REDDIT}))
+        with patch.object(credentials_service, 'get_credentials_file_path', return_value=str(credentials_file)):
+            reddit = get_reddit_client()
+            assert get_reddit_client() is reddit
+
+            # Written by the bot process: no invalidate() here, only a newer file
+            credentials_file.write_text(json.dumps({"reddit": dict(REDDIT, password="new")}))
+            stat = os.stat(credentials_file)
+            os.utime(credentials_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert get_reddit_client() is not reddit
+
+    def test_reddit_client_is_shared_across_threads(self):
+        from app.clients import get_reddit_client
+
+        with patch('app.services.credentials_service.get_platform_credentials', return_value=REDDIT):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                clients = list(executor.map(lambda _: get_reddit_client(), range(32)))
+
+        assert len({id(client) for client in clients}) == 1
+
+    def test_failed_builds_are_not_pooled(self):
+        from app.clients.pool import ClientPool
+
+        pool = ClientPool()
+        credentials = ("id",)
+        assert pool.get("reddit", "reddit", credentials, lambda: None) is None
+        assert len(pool) == 0
+        client = object()
+        assert pool.get("reddit", "reddit", credentials, lambda: client) is client
+        assert pool.get("reddit", "reddit", credentials, lambda: object()) is client
+        pool.invalidate("reddit")
+        assert len(pool) == 0
+
+    def test_get_survives_invalidate_after_credentials(self):
+        """Credentials invalidated on another thread between credentials() and get() don't break get()"""
+        from app.clients.pool import ClientPool
+
+        pool = ClientPool()
+        with patch('app.services.credentials_service.credentials_version', return_value=1):
+            credentials = pool.credentials("reddit", lambda: ("id",))
+        pool.invalidate("reddit")
+
+        client = object()
+        assert pool.get("reddit", "reddit", credentials, lambda: client) is client
+        assert pool.get("reddit", "reddit", ("rotated",), lambda: "rebuilt") == "rebuilt"
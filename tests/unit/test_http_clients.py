@@ -0,0 +1,75 @@
+"""
+Unit tests for the shared HTTP client registry
+"""
+import asyncio
+import threading
+import pytest
+import httpx
+from unittest.mock import patch
+
+
+class TestHttpClients:
+    """Test pooled clients shared per event loop"""
+
+    @pytest.mark.asyncio
+    async def test_client_is_shared_and_reopened_after_close(self):
+        from app.clients.http import get_http_client, close_http_clients
+
+        graph = get_http_client("graph")
+        assert get_http_client("graph") is graph
+        assert get_http_client("downloads") is not graph
+
+        await close_http_clients()
+        assert graph.is_closed
+        reopened = get_http_client("graph")
+        assert reopened is not graph and not reopened.is_closed
+        await close_http_clients()
+
+    def test_each_event_loop_gets_its_own_client(self):
+        from app.clients.http import get_http_client, close_http_clients
+
+        async def open_client():
+            http_client = get_http_client("graph")
+            await close_http_clients()
+            return http_client
+
+        clients = []
+        thread = threading.Thread(target=lambda: clients.append(asyncio.run(open_client())))
+        thread.start()
+        thread.join()
+        clients.append(asyncio.run(open_client()))
+
+        assert clients[0] is not clients[1]
+
+    @pytest.mark.asyncio
+    async def test_graph_calls_reuse_one_client(self):
+        from app.clients.http import close_http_clients
+        from app.services.facebook_service import get_facebook_page_id
+
+        opened = []
+
+        def create(**kwargs):
+            opened.append(kwargs)
+            return httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"id": "page-1"})))
+
+        with patch('app.clients.http.create_async_client', create), \
+             patch('app.services.credentials_service.get_platform_credentials', return_value={"access_token": "token"}):
+            assert [await get_facebook_page_id() for _ in range(3)] == ["page-1"] * 3
+        await close_http_clients()
+
+        assert len(opened) == 1
+        assert opened[0]["limits"].max_keepalive_connections > 0
+
+    def test_scheduler_job_closes_its_clients(self):
+        from app.clients.http import get_http_client
+        from app.scheduler.scheduler import run_async_in_thread
+
+        async def job():
+            return get_http_client("graph")
+
+        clients = []
+        thread = threading.Thread(target=lambda: clients.append(run_async_in_thread(job())))
+        thread.start()
+        thread.join()
+
+        assert clients[0].is_closed
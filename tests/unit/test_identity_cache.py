@@ -0,0 +1,78 @@
+"""
+Unit tests for the platform identity cache
+"""
+import pytest
+import httpx
+from unittest.mock import patch
+from fastapi import HTTPException
+
+
+def _graph(status: int = 200, body: dict = None, calls: list = None):
+    """Stand-in for get_http_client answering every Graph call with one response"""
+    def handler(request):
+        if calls is not None:
+            calls.append(str(request.url))
+        return httpx.Response(status, json=body or {})
+    return lambda name: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestIdentityCache:
+    """Test page / account lookups cached per token"""
+
+    @pytest.mark.asyncio
+    async def test_page_id_is_fetched_once_per_token(self):
+        from app.services.facebook_service import get_facebook_page_id
+
+        calls = []
+        credentials = {"access_token": "token-a"}
+        with patch('app.services.facebook_service.get_http_client', _graph(body={"id": "page-1"}, calls=calls)), \
+             patch('app.services.credentials_service.get_platform_credentials', side_effect=lambda platform: credentials):
+            assert await get_facebook_page_id() == "page-1"
+            assert await get_facebook_page_id() == "page-1"
+            credentials["access_token"] = "token-b"
+            assert await get_facebook_page_id() == "page-1"
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_rejected_tokens_are_cached_briefly_and_errors_are_not(self):
+        from app.services.facebook_service import get_facebook_page_id
+
+        calls = []
+        with patch('app.services.credentials_service.get_platform_credentials', return_value={"access_token": "bad"}):
+            with patch('app.services.facebook_service.get_http_client', _graph(status=401, calls=calls)):
+                for _ in range(3):
+                    with pytest.raises(HTTPException) as error:
+                        await get_facebook_page_id()
+                    assert error.value.status_code == 401
+            assert len(calls) == 1
+
+        with patch('app.services.credentials_service.get_platform_credentials', return_value={"access_token": "flaky"}):
+            with patch('app.services.facebook_service.get_http_client', _graph(status=503, calls=calls)):
+                for _ in range(2):
+                    with pytest.raises(HTTPException):
+                        await get_facebook_page_id()
+            assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_updating_credentials_drops_the_platform_entries(self, tmp_path):
+        from app.services import credentials_service
+        from app.services.instagram_service import get_instagram_account_info
+
+        calls = []
+        credentials_file = tmp_path / "credentials.json"
+        credentials_file.write_text("{}")
+        with patch.object(credentials_service, 'get_credentials_file_path', return_value=str(credentials_file)), \
+             patch('app.services.instagram_service.get_http_client', _graph(body={"username": "brand"}, calls=calls)):
+            credentials_service.update_platform_credentials("instagram", {"access_token": "t", "account_id": "1"})
+            assert await get_instagram_account_info() == ("1", "brand")
+            assert await get_instagram_account_info() == ("1", "brand")
+            assert len(calls) == 1
+
+            credentials_service.update_platform_credentials("facebook", {"access_token": "other"})
+            await get_instagram_account_info()
+            assert len(calls) == 1
+
+            credentials_service.update_platform_credentials("instagram", {"access_token": "t", "account_id": "1", "note": "renamed"})
+            await get_instagram_account_info()
+            assert len(calls) == 2
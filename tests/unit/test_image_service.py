@@ -0,0 +1,80 @@
+"""
+Unit tests for per-platform image derivatives
+"""
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def derivatives_dir(tmp_path):
+    """Render derivatives into a temp dir on threads instead of worker processes"""
+    with patch('app.services.image_service.settings.IMAGE_DERIVATIVES_DIR', tmp_path / "derivatives"), \
+         patch('app.services.image_service._get_pool', return_value=ThreadPoolExecutor(2)):
+        yield tmp_path / "derivatives"
+
+
+def _image(path, size, mode="RGB"):
+    image = Image.new(mode, size, (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30))
+    image.save(path)
+    return str(path)
+
+
+class TestImageDerivatives:
+    """Test platform-optimal image preparation"""
+
+    def test_render_resizes_flattens_and_strips_metadata(self, tmp_path):
+        """Derivatives fit the spec, are RGB JPEGs and carry no EXIF"""
+        from app.utils.images import render_derivative
+
+        source = tmp_path / "source.jpg"
+        exif = Image.Exif()
+        exif[0x010F] = "PhoneMaker"  # camera make
+        Image.new("RGB", (4000, 3000), (10, 20, 30)).save(source, exif=exif)
+
+        output = render_derivative(str(source), str(tmp_path / "out.jpg"), {"format": "JPEG", "max_side": 2048, "quality": 85})
+
+        with Image.open(output) as result:
+            assert result.size == (2048, 1536)
+            assert result.format == "JPEG"
+            assert not result.getexif()
+
+    def test_render_crops_to_allowed_aspect(self, tmp_path):
+        from app.utils.images import render_derivative
+
+        source = _image(tmp_path / "wide.png", (3000, 1000), mode="RGBA")
+        output = render_derivative(source, str(tmp_path / "out.jpg"), {"format": "JPEG", "max_side": 1080, "quality": 85, "aspect": (0.8, 1.91)})
+
+        with Image.open(output) as result:
+            assert result.mode == "RGB"
+            assert result.size == (1080, 565)
+
+    @pytest.mark.asyncio
+    async def test_derivatives_are_shared_and_cached(self, tmp_path, derivatives_dir):
+        """Platforms with the same spec share one file, and a second post reuses it"""
+        from app.services.image_service import prepare_platform_images
+
+        source = _image(tmp_path / "post.png", (1024, 1024))
+        first = await prepare_platform_images(source, ["facebook", "twitter", "reddit", "instagram"])
+        files = sorted(derivatives_dir.iterdir())
+
+        with patch('app.services.image_service._derivative_future') as render:
+            second = await prepare_platform_images(source, ["facebook", "instagram"])
+
+        assert first["facebook"] == first["twitter"] == first["reddit"] != first["instagram"]
+        assert len(files) == 2
+        assert render.call_count == 0
+        assert second == {"facebook": first["facebook"], "instagram": first["instagram"]}
+
+    @pytest.mark.asyncio
+    async def test_unreadable_image_falls_back_to_original(self, tmp_path, derivatives_dir):
+        from app.services.image_service import prepare_platform_images
+
+        source = tmp_path / "broken.png"
+        source.write_bytes(b"not an image")
+
+        paths = await prepare_platform_images(str(source), ["facebook", "telegram"])
+
+        assert paths == {"facebook": str(source), "telegram": str(source)}
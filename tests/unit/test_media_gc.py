@@ -0,0 +1,131 @@
+"""
+Unit tests for the media garbage collector
+"""
+import json
+import os
+import time
+import pytest
+from unittest.mock import patch
+
+HOURS_AGO = time.time() - 48 * 3600
+
+
+@pytest.fixture
+def uploads(tmp_path, media_store):
+    """Uploads dir with a scheduled posts file, collecting anything unused for an hour"""
+    from app.config import settings
+
+    scheduled_file = tmp_path / "scheduled_posts.json"
+    scheduled_file.write_text("[]")
+    with patch.object(settings, 'SCHEDULED_POSTS_FILE', scheduled_file), \
+         patch.object(settings, 'PUBLISH_JOBS_DIR', tmp_path / "publish_jobs"), \
+         patch.object(settings, 'IMAGE_DERIVATIVES_DIR', tmp_path / "uploads" / "derivatives"), \
+         patch.object(settings, 'MEDIA_GC_RETENTION_HOURS', 1), \
+         patch.object(settings, 'MEDIA_GC_QUOTA_MB', 0):
+        yield tmp_path / "uploads"
+
+
+def _file(path, size=100, mtime=HOURS_AGO):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _blob(store, data, ref, last_used=HOURS_AGO):
+    stored = store.put_bytes(data, ref)
+    store._conn.execute("UPDATE media SET last_used = ? WHERE sha256 = ?", (last_used, stored["sha256"]))
+    return stored
+
+
+class TestMediaGC:
+    """Test mark-and-sweep of uploads"""
+
+    def test_sweeps_old_unreferenced_media_only(self, uploads, media_store):
+        from app.config import settings
+        from app.services.media_gc import collect_garbage
+
+        scheduled = _blob(media_store, b"scheduled image", "scheduled:1")
+        posted = _blob(media_store, b"posted image", "scheduled:2")
+        settings.SCHEDULED_POSTS_FILE.write_text(json.dumps([
+            {"id": "1", "image_path": scheduled["local_path"], "status": "scheduled"},
+            {"id": "2", "image_path": posted["local_path"], "status": "posted"}
+        ]))
+        temp = _file(uploads / "telegram_temp_1234.png")
+        recent = _file(uploads / "ai_generated" / "ai_generated_new.png", mtime=time.time())
+        derivative = _file(uploads / "derivatives" / f"{scheduled['sha256']}-abc.jpg")
+
+        report = collect_garbage(dry_run=True)
+        swept = {entry["path"] for entry in report["deleted"]}
+        assert swept == {str(temp.resolve()), str(os.path.realpath(posted["local_path"]))}
+        assert report["live_files"] == 2  # the scheduled image and its derivative
+        assert temp.exists() and os.path.exists(posted["local_path"])
+
+        report = collect_garbage()
+        assert report["deleted_count"] == 2
+        assert not temp.exists() and not os.path.exists(posted["local_path"])
+        assert os.path.exists(scheduled["local_path"]) and recent.exists() and derivative.exists()
+        assert media_store.stats()["blobs"] == 1
+
+    def test_blobs_with_held_references_are_kept(self, uploads, media_store):
+        from app.config import settings
+        from app.services.media_gc import collect_garbage
+
+        settings.PUBLISH_JOBS_DIR.mkdir()
+        for job_id, status in (("running", "running"), ("done", "completed")):
+            (settings.PUBLISH_JOBS_DIR / f"{job_id}.json").write_text(json.dumps({
+                "id": job_id, "status": status, "created_at": "2024-01-01T00:00:00"
+            }))
+
+        # The bot runs in another process, so its sessions can't be checked
+        held = [
+            _blob(media_store, b"publishing", "post:running"),
+            _blob(media_store, b"in a chat", "telegram:42"),
+            _blob(media_store, b"unknown owner", "export:1")
+        ]
+        mixed = _blob(media_store, b"posted, still in a chat", "post:done")
+        media_store.acquire(mixed["sha256"], "telegram:42")
+        stale = _blob(media_store, b"posted", "post:done")
+        media_store.acquire(stale["sha256"], "generated")
+        media_store.acquire(stale["sha256"], "scheduled:gone")
+        media_store._conn.execute("UPDATE media SET last_used = ?", (HOURS_AGO,))
+
+        report = collect_garbage()
+
+        assert [entry["path"] for entry in report["deleted"]] == [os.path.realpath(stale["local_path"])]
+        for blob in held + [mixed]:
+            assert os.path.exists(blob["local_path"])
+        assert media_store.refcount(mixed["sha256"]) == 2
+
+    def test_quota_evicts_least_recently_used_first(self, uploads, media_store):
+        from app.config import settings
+        from app.services.media_gc import collect_garbage
+
+        now = time.time()
+        files = [_file(uploads / f"upload_{i}.jpg", size=400 * 1024, mtime=now - 60 * (5 - i)) for i in range(5)]
+        live = _blob(media_store, os.urandom(400 * 1024), "scheduled:1", last_used=now - 3000)
+        settings.SCHEDULED_POSTS_FILE.write_text(json.dumps([
+            {"id": "1", "image_path": live["local_path"], "status": "scheduled"}
+        ]))
+
+        with patch.object(settings, 'MEDIA_GC_QUOTA_MB', 2), patch.object(settings, 'MEDIA_GC_LOW_WATERMARK', 0.8):
+            report = collect_garbage()
+
+        assert [entry["reason"] for entry in report["deleted"]] == ["quota", "quota"]
+        assert [f.exists() for f in files] == [False, False, True, True, True]
+        assert os.path.exists(live["local_path"])
+        assert not report["over_quota"]
+
+    @pytest.mark.asyncio
+    async def test_report_endpoint_is_a_dry_run(self, uploads):
+        import httpx
+        from app.main import app
+
+        temp = _file(uploads / "telegram_temp_1234.png")
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            response = await client.get("/api/media/gc")
+
+        assert response.status_code == 200
+        assert response.json()["dry_run"] is True
+        assert response.json()["deleted_count"] == 1
+        assert temp.exists()
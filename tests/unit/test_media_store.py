@@ -0,0 +1,83 @@
+"""
+Unit tests for the content-addressed media store
+"""
+import hashlib
+import pytest
+from unittest.mock import patch
+
+
+class TestMediaStore:
+    """Test deduplication and reference counting of stored images"""
+
+    def test_identical_bytes_are_stored_once(self, media_store):
+        body = b"\x89PNG" + b"x" * 1000
+
+        first = media_store.put_bytes(body, "post:1", extension=".png")
+        second = media_store.put_bytes(body, "scheduled:2", extension=".jpg")
+
+        digest = hashlib.sha256(body).hexdigest()
+        assert first["local_path"] == second["local_path"]
+        assert first["local_path"].endswith(f"{digest[:2]}/{digest[2:4]}/{digest}.png")
+        assert not first["deduplicated"] and second["deduplicated"]
+        assert media_store.refcount(digest) == 2
+        assert media_store.stats() == {"blobs": 1, "references": 2, "stored_bytes": len(body), "saved_bytes": len(body)}
+
+    def test_blob_is_deleted_with_its_last_reference(self, media_store):
+        from pathlib import Path
+
+        stored = media_store.put_bytes(b"image", "post:1")
+        media_store.acquire(stored["sha256"], "scheduled:2")
+        media_store.acquire(stored["sha256"], "scheduled:2")  # same ref twice counts once
+
+        assert not media_store.release(stored["sha256"], "post:1")
+        assert Path(stored["local_path"]).exists()
+        assert media_store.release(stored["sha256"], "scheduled:2")
+        assert not Path(stored["local_path"]).exists()
+        assert media_store.stats()["blobs"] == 0
+
+    def test_put_file_consumes_the_source(self, media_store):
+        from pathlib import Path
+
+        existing = media_store.put_bytes(b"same", "generated")
+        source = media_store.incoming_dir / "download.tmp"
+        source.write_bytes(b"same")
+
+        stored = media_store.put_file(source, "telegram:7", extension=".png")
+
+        assert stored["local_path"] == existing["local_path"]
+        assert stored["deduplicated"]
+        assert not source.exists()
+        assert Path(stored["local_path"]).read_bytes() == b"same"
+
+    def test_discard_handles_stored_and_legacy_files(self, media_store, tmp_path):
+        from pathlib import Path
+        from app.services.media_store import acquire_path, discard
+
+        stored = media_store.put_bytes(b"image", "telegram:7")
+        assert acquire_path(stored["local_path"], "scheduled:1")
+        discard(stored["local_path"], "telegram:7")
+        assert Path(stored["local_path"]).exists()
+
+        legacy = tmp_path / "uploads" / "20240101_old.jpg"
+        legacy.write_bytes(b"old")
+        assert not acquire_path(str(legacy), "scheduled:2")
+        discard(str(legacy), "scheduled:2")
+        assert not legacy.exists()
+
+    @pytest.mark.asyncio
+    async def test_generated_images_land_in_the_store(self, media_store):
+        """Downloads move into the store and get a servable web path"""
+        import httpx
+        from app.services.ai_service import _download_generated_image
+
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "image/png"}, content=b"\x89PNG generated")
+
+        client = lambda name: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.services.ai.downloads.get_http_client', client):
+            first = await _download_generated_image("https://img.test/a.png")
+            second = await _download_generated_image("https://img.test/b.png")
+
+        assert first["local_path"] == second["local_path"]
+        assert first["web_path"] == f"/uploads/media/{first['sha256'][:2]}/{first['sha256'][2:4]}/{first['sha256']}.png"
+        assert list(media_store.incoming_dir.iterdir()) == []
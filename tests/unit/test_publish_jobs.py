@@ -0,0 +1,154 @@
+"""
+Unit tests for background publish jobs
+"""
+import asyncio
+import json
+import pytest
+from unittest.mock import patch
+
+
+def _publisher(result=None, error=None, calls=None):
+    async def post(image_path, caption):
+        if calls is not None:
+            calls.append(caption)
+        await asyncio.sleep(0.01)
+        if error:
+            raise error
+        return result or {"id": "123"}
+    return post
+
+
+@pytest.fixture
+def jobs_dir(tmp_path):
+    """Persist jobs in a temp dir and upload originals (no derivative rendering)"""
+    from app.config import settings
+
+    async def prepare(image_path, platforms):
+        return {platform: image_path for platform in platforms}
+
+    with patch.object(settings, 'PUBLISH_JOBS_DIR', tmp_path / "publish_jobs"), \
+         patch('app.services.publish_service.prepare_platform_images', prepare):
+        yield tmp_path / "publish_jobs"
+
+
+class TestPublishJobs:
+    """Test durable publish jobs and their status API"""
+
+    @pytest.mark.asyncio
+    async def test_job_records_progress_and_releases_media(self, jobs_dir, media_store):
+        from pathlib import Path
+        from app.services.publish_jobs import create_publish_job, start_publish_job, watch_publish_job
+        from app.services.publish_service import PUBLISHERS
+
+        stored = media_store.put_bytes(b"photo", "post:job-1")
+        publishers = {"facebook": _publisher(), "twitter": _publisher(error=RuntimeError("boom"))}
+        with patch.dict(PUBLISHERS, publishers):
+            job = create_publish_job(stored["local_path"], "Hello", ["facebook", "twitter"], media_ref="post:job-1", job_id="job-1")
+            start_publish_job(job["id"])
+            snapshots = [snapshot async for snapshot in watch_publish_job(job["id"], interval=0.01)]
+
+        final = snapshots[-1]
+        assert final["status"] == "completed"
+        assert (final["completed"], final["failed"]) == (1, 1)
+        assert final["platforms"]["twitter"]["error"] == "boom"
+        assert json.loads((jobs_dir / "job-1.json").read_text())["status"] == "completed"
+        assert not Path(stored["local_path"]).exists()
+
+    @pytest.mark.asyncio
+    async def test_resumed_job_skips_finished_platforms(self, jobs_dir):
+        from app.services.publish_jobs import create_publish_job, run_publish_job, _jobs
+        from app.services.publish_service import PUBLISHERS
+
+        job = create_publish_job("photo.jpg", "Hello", ["facebook", "reddit"])
+        job["status"] = "running"
+        job["completed"] = 1
+        job["platforms"]["facebook"] = {"status": "completed", "success": True, "result": {"id": "1"}, "error": None}
+        (jobs_dir / f"{job['id']}.json").write_text(json.dumps(job))
+        _jobs.pop(job["id"])  # as after a restart
+
+        calls = []
+        with patch.dict(PUBLISHERS, {"facebook": _publisher(calls=calls), "reddit": _publisher(calls=calls)}):
+            final = await run_publish_job(job["id"])
+
+        assert calls == ["Hello"]
+        assert final["completed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_post_returns_202_and_status_reports_results(self, jobs_dir):
+        import httpx
+        from app.main import app
+        from app.routes import posts
+        from app.services.publish_service import PUBLISHERS
+
+        posts.limiter.enabled = False
+        publishers = {platform: _publisher({"id": f"{platform}-1", "url": "https://reddit.test/1"}) for platform in PUBLISHERS}
+        try:
+            with patch.dict(PUBLISHERS, publishers):
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    response = await client.post(
+                        "/api/post",
+                        data={"caption": "Hi", "platforms": '{"facebook": true, "reddit": true}'},
+                        files={"photo": ("a.png", b"\x89PNG data", "image/png")}
+                    )
+                    assert response.status_code == 202
+                    async with client.stream("GET", response.json()["events_url"]) as events:
+                        body = "".join([chunk async for chunk in events.aiter_text()])
+                    status = (await client.get(response.json()["status_url"])).json()
+        finally:
+            posts.limiter.enabled = True
+
+        assert "event: complete" in body
+        assert status["status"] == "completed"
+        assert status["message"] == "🎉 Photo posted successfully to all platforms!"
+        assert status["results"]["reddit"] == {"success": True, "postId": "reddit-1", "postUrl": "https://reddit.test/1", "status": "completed"}
+        assert set(status["results"]) == {"facebook", "reddit"}
+
+    def test_resume_only_takes_over_orphaned_jobs(self, jobs_dir):
+        import os
+        import socket
+        import subprocess
+        import sys
+        import time
+        from app.services.publish_jobs import create_publish_job, resume_publish_jobs, _jobs
+
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        owners = {
+            "bot": {"pid": os.getppid(), "host": socket.gethostname()},  # alive, e.g. the bot process
+            "crashed": {"pid": exited.pid, "host": socket.gethostname()},
+            "remote-stale": {"pid": 1, "host": "other-host"}
+        }
+        for job_id, owner in owners.items():
+            job = create_publish_job("photo.jpg", "Hello", ["facebook"], job_id=job_id)
+            job.update(status="running", owner=owner, heartbeat_at=time.time() - (600 if job_id == "remote-stale" else 0))
+            (jobs_dir / f"{job_id}.json").write_text(json.dumps(job))
+            _jobs.pop(job_id)
+
+        started = []
+        with patch('app.services.publish_jobs.start_publish_job', started.append):
+            resume_publish_jobs()
+
+        assert sorted(started) == ["crashed", "remote-stale"]
+        assert _jobs["crashed"]["owner"]["pid"] == os.getpid()
+        _jobs.pop("crashed")
+        _jobs.pop("remote-stale")
+
+    @pytest.mark.asyncio
+    async def test_platforms_interrupted_mid_request_are_not_reposted(self, jobs_dir):
+        from app.services.publish_jobs import INTERRUPTED_ERROR, create_publish_job, run_publish_job, _jobs
+        from app.services.publish_service import PUBLISHERS
+
+        job = create_publish_job("photo.jpg", "Hello", ["facebook", "reddit"])
+        job["status"] = "running"
+        job["platforms"]["facebook"] = {"status": "running"}
+        (jobs_dir / f"{job['id']}.json").write_text(json.dumps(job))
+        _jobs.pop(job["id"])
+
+        calls = []
+        with patch.dict(PUBLISHERS, {"facebook": _publisher(calls=calls), "reddit": _publisher(calls=calls)}):
+            final = await run_publish_job(job["id"])
+
+        assert calls == ["Hello"]  # reddit only
+        assert final["platforms"]["facebook"]["outcome_unknown"]
+        assert final["platforms"]["facebook"]["error"] == INTERRUPTED_ERROR
+        assert (final["completed"], final["failed"]) == (1, 1)
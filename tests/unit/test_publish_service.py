@@ -0,0 +1,136 @@
+"""
+Unit tests for the publish orchestrator
+"""
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+
+
+def _publisher(delay: float = 0.1, result: dict = None, error: Exception = None, calls: list = None):
+    async def post(image_path, caption):
+        if calls is not None:
+            calls.append((image_path, caption))
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result or {"id": "123"}
+    return post
+
+
+@pytest.fixture
+def originals():
+    """Upload the original image (no derivative rendering)"""
+    async def prepare(image_path, platforms):
+        return {platform: image_path for platform in platforms}
+    with patch('app.services.publish_service.prepare_platform_images', prepare):
+        yield
+
+
+class TestPublishPost:
+    """Test concurrent fan-out to platforms"""
+
+    @pytest.mark.asyncio
+    async def test_platforms_are_posted_concurrently(self, originals):
+        from app.services.publish_service import publish_post, PUBLISHERS
+
+        publishers = {platform: _publisher(0.2) for platform in PUBLISHERS}
+        with patch.dict(PUBLISHERS, publishers):
+            started = time.perf_counter()
+            outcomes = await publish_post("photo.jpg", "Hello", ["facebook", "instagram", "twitter", "reddit"])
+            elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.5  # the slowest platform, not the sum
+        assert all(outcome["success"] for outcome in outcomes.values())
+        assert list(outcomes) == ["facebook", "instagram", "twitter", "reddit"]
+
+    @pytest.mark.asyncio
+    async def test_failures_and_timeouts_are_isolated(self, originals):
+        from app.config import settings
+        from app.services.publish_service import publish_post, PUBLISHERS
+
+        publishers = {
+            "facebook": _publisher(error=HTTPException(status_code=400, detail="Invalid token")),
+            "instagram": _publisher(delay=5),
+            "twitter": _publisher(error=RuntimeError("boom")),
+            "reddit": _publisher(result={"id": "r1", "url": "https://reddit.test/r1"})
+        }
+        with patch.dict(PUBLISHERS, publishers), patch.object(settings, 'INSTAGRAM_PUBLISH_TIMEOUT', 0.2):
+            outcomes = await publish_post("photo.jpg", "Hello", list(publishers))
+
+        assert outcomes["facebook"]["error"] == "Invalid token"
+        assert outcomes["instagram"]["timed_out"] and outcomes["instagram"]["error"] == "Request timeout (0.2s)"
+        assert outcomes["twitter"]["error"] == "boom"
+        assert outcomes["reddit"]["success"] and outcomes["reddit"]["result"]["url"] == "https://reddit.test/r1"
+
+    @pytest.mark.asyncio
+    async def test_per_platform_captions_and_progress(self, originals):
+        from app.services.publish_service import publish_post, PUBLISHERS
+
+        calls = []
+        finished = []
+
+        async def on_result(platform, outcome):
+            finished.append(platform)
+
+        publishers = {"facebook": _publisher(0.1, calls=calls), "twitter": _publisher(0.01, calls=calls)}
+        with patch.dict(PUBLISHERS, publishers):
+            outcomes = await publish_post(
+                "photo.jpg",
+                {"facebook": "Long post", "twitter": "Short"},
+                ["facebook", "twitter", "telegram"],
+                on_result=on_result
+            )
+
+        assert sorted(calls) == [("photo.jpg", "Long post"), ("photo.jpg", "Short")]
+        assert finished == ["twitter", "facebook"]
+        assert outcomes["telegram"] == {"success": False, "result": None, "error": "Platform not supported", "timed_out": False, "duration_ms": 0.0}
+
+    @pytest.mark.asyncio
+    async def test_missing_image_fails_without_posting(self, originals):
+        from app.services.publish_service import publish_post, PUBLISHERS
+
+        calls = []
+        with patch.dict(PUBLISHERS, {"facebook": _publisher(calls=calls)}):
+            outcomes = await publish_post(None, "Hello", ["facebook"])
+
+        assert outcomes["facebook"]["error"] == "Missing image"
+        assert calls == []
+
+    @pytest.mark.asyncio
+    async def test_blocking_sdk_calls_run_concurrently_and_time_out(self, originals):
+        """tweepy, praw and Cloudinary block; they must not serialize the fan-out or outlive the timeout"""
+        from types import SimpleNamespace
+        from unittest.mock import MagicMock
+        from app.config import settings
+        from app.services.publish_service import publish_post
+
+        def blocking(seconds, result):
+            def call(*args, **kwargs):
+                time.sleep(seconds)
+                return result
+            return call
+
+        api_v1 = MagicMock(media_upload=blocking(0.3, SimpleNamespace(media_id_string="m1")))
+        client_v2 = MagicMock(create_tweet=blocking(0.3, SimpleNamespace(data={"id": "t1"})))
+        reddit = MagicMock()
+        reddit.subreddit.return_value.submit_image = blocking(0.3, SimpleNamespace(id="r1", url="https://reddit.test/r1"))
+
+        with patch('app.services.twitter_service.get_twitter_v1_client', return_value=api_v1), \
+             patch('app.services.twitter_service.get_twitter_v2_client', return_value=client_v2), \
+             patch('app.services.reddit_service.get_reddit_client', return_value=reddit):
+            started = time.perf_counter()
+            outcomes = await publish_post("photo.jpg", "Hello", ["twitter", "reddit"])
+            elapsed = time.perf_counter() - started
+
+            assert outcomes["twitter"]["success"] and outcomes["reddit"]["success"]
+            assert elapsed < 0.75  # twitter's two calls, with reddit alongside
+            assert outcomes["reddit"]["duration_ms"] < 500
+
+            reddit.subreddit.return_value.submit_image = blocking(2, None)
+            with patch.object(settings, 'PUBLISH_TIMEOUT', 0.2):
+                started = time.perf_counter()
+                outcomes = await publish_post("photo.jpg", "Hello", ["reddit"])
+            assert outcomes["reddit"]["timed_out"]
+            assert time.perf_counter() - started < 1
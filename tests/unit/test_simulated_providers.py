@@ -0,0 +1,106 @@
+"""
+Unit tests for the simulated provider backend
+"""
+import json
+import pytest
+import httpx
+from unittest.mock import patch
+
+
+def _backend(**kwargs):
+    from app.clients.simulated import SimulatedBackend
+    return SimulatedBackend(latency_scale=0, seed=1, **kwargs)
+
+
+def _openai_client(backend):
+    from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+    from app.clients.simulated import SimulatedTransport
+    return AsyncOpenAI(
+        api_key="simulated",
+        http_client=DefaultAsyncHttpxClient(transport=SimulatedTransport(backend)),
+        max_retries=0
+    )
+
+
+class TestSimulatedProviders:
+    """Test the local stand-ins used for offline load testing"""
+
+    def test_draws_are_reproducible(self):
+        """The same seed gives the same latencies and failures"""
+        from app.clients.simulated import SimulatedBackend
+        first = SimulatedBackend(seed=7, error_rate=0.3)
+        second = SimulatedBackend(seed=7, error_rate=0.3)
+        assert [first.draw("openai-chat") for _ in range(20)] == [second.draw("openai-chat") for _ in range(20)]
+        assert first.stats()["openai-chat"]["calls"] == 20
+
+    @pytest.mark.asyncio
+    async def test_openai_sdk_structured_output(self):
+        """The real OpenAI client parses simulated JSON-schema completions"""
+        client = _openai_client(_backend())
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Write posts"}],
+            response_format={"type": "json_schema", "json_schema": {"name": "posts", "schema": {
+                "type": "object",
+                "properties": {"facebook": {"type": "string"}, "twitter": {"type": "string"}}
+            }}}
+        )
+        content = json.loads(response.choices[0].message.content)
+        assert set(content) == {"facebook", "twitter"}
+        assert response.usage.total_tokens > 0
+
+    @pytest.mark.asyncio
+    async def test_openai_sdk_streaming_reports_usage(self):
+        """Streamed completions end with a usage chunk when include_usage is set"""
+        client = _openai_client(_backend())
+        stream = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Write a caption"}],
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+        text, usage = "", None
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                text += chunk.choices[0].delta.content
+            if chunk.usage:
+                usage = chunk.usage
+        assert text
+        assert usage.completion_tokens > 0
+
+    @pytest.mark.asyncio
+    async def test_graph_api_rate_limit(self):
+        """Rate-limited Graph calls answer 429 with the Graph error shape"""
+        from app.clients.simulated import SimulatedTransport
+        async with httpx.AsyncClient(transport=SimulatedTransport(_backend(rate_limit_rate=1.0))) as client:
+            response = await client.post("https://graph.facebook.com/v18.0/123/photos", data={"message": "hi"})
+        assert response.status_code == 429
+        assert response.json()["error"]["code"] == 4
+
+    @pytest.mark.asyncio
+    async def test_unknown_hosts_never_reach_the_network(self):
+        """Requests outside the simulated providers get a local 404"""
+        from app.clients.simulated import SimulatedTransport
+        async with httpx.AsyncClient(transport=SimulatedTransport(_backend())) as client:
+            response = await client.get("https://example.com/anything")
+        assert response.status_code == 404
+
+    def test_client_factories_return_stand_ins(self):
+        """With PROVIDER_BACKEND=simulated the Twitter and Reddit factories return stand-ins"""
+        from app.clients import get_twitter_v2_client, get_reddit_client
+        from app.clients.simulated import SimulatedTwitterClient, SimulatedReddit
+
+        credentials = {
+            "api_key": "k", "api_secret": "s", "access_token": "t", "access_token_secret": "ts",
+            "client_id": "id", "client_secret": "secret", "username": "u", "password": "p"
+        }
+        with patch('app.config.settings.PROVIDER_BACKEND', "simulated"), \
+             patch('app.clients.simulated._backend', _backend()), \
+             patch('app.services.credentials_service.get_platform_credentials', return_value=credentials):
+            twitter = get_twitter_v2_client()
+            reddit = get_reddit_client()
+            tweet = twitter.create_tweet(text="hello")
+
+        assert isinstance(twitter, SimulatedTwitterClient)
+        assert isinstance(reddit, SimulatedReddit)
+        assert tweet.data["text"] == "hello"